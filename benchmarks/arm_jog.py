@@ -0,0 +1,130 @@
+"""
+Manual arm control while a slider is dragged: one move per message vs jog mode.
+
+Usage:
+    python -m benchmarks.arm_jog [--seconds 2] [--rate 60]
+
+A simulated slider sends --rate targets per second for --seconds to an
+emulated arm (no hardware needed). "per_message" handles every target with
+move_robotic_arm in order, as listen_for_web_commands used to; "jog" uses
+src/arm_jog.py. Reports commands sent, dropped targets, control latency
+(target received -> command acknowledged) and how long after the drag ended
+the arm reached the final target.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from src.arm_jog import ArmJogController
+from src.hardware_controller import HardwareManager
+from src.hardware_emulator import start_kiosks
+
+
+def _targets(seconds, rate):
+    count = int(seconds * rate)
+    return [
+        (2400 + round(1600 * i / max(count - 1, 1)), 600, 3000) for i in range(count)
+    ]
+
+
+def _percentiles(latencies):
+    latencies = sorted(latencies)
+    return {
+        "latency_p50_ms": round(1000 * latencies[len(latencies) // 2], 1),
+        "latency_p95_ms": round(1000 * latencies[int(0.95 * (len(latencies) - 1))], 1),
+        "latency_max_ms": round(1000 * latencies[-1], 1),
+    }
+
+
+async def _drag(targets, rate, handle):
+    for target in targets:
+        handle(target)
+        await asyncio.sleep(1 / rate)
+    return time.monotonic()
+
+
+async def _settled(arm, target, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while list(arm.position) != list(target) or arm.moving:
+        if time.monotonic() > deadline:
+            return None
+        await asyncio.sleep(0.005)
+    return time.monotonic()
+
+
+async def per_message(hardware, arm, targets, rate):
+    queue = asyncio.Queue()
+    latencies = []
+
+    async def consume():
+        while True:
+            target, received = await queue.get()
+            await hardware.move_robotic_arm(*target)
+            latencies.append(time.monotonic() - received)
+            queue.task_done()
+
+    consumer = asyncio.create_task(consume())
+    drag_ended = await _drag(
+        targets, rate, lambda target: queue.put_nowait((target, time.monotonic()))
+    )
+    await queue.join()
+    settled = await _settled(arm, targets[-1])
+    consumer.cancel()
+    return {
+        "commands_sent": len(latencies),
+        "targets_dropped": 0,
+        **_percentiles(latencies),
+        "settle_after_drag_ms": round(1000 * (settled - drag_ended), 1)
+        if settled
+        else None,
+    }
+
+
+async def jog(hardware, arm, targets, rate):
+    async def ignore_telemetry(message):
+        pass
+
+    controller = ArmJogController(hardware, ignore_telemetry)
+    drag_ended = await _drag(targets, rate, controller.set_target)
+    settled = await _settled(arm, targets[-1])
+    await controller.stop()
+    stats = controller.stats()
+    return {
+        "commands_sent": stats["commands_sent"],
+        "targets_dropped": stats["targets_dropped"],
+        **_percentiles(controller.latencies),
+        "settle_after_drag_ms": round(1000 * (settled - drag_ended), 1)
+        if settled
+        else None,
+    }
+
+
+async def run(seconds, rate):
+    targets = _targets(seconds, rate)
+    results = {"targets": len(targets)}
+    for name, mode in (("per_message", per_message), ("jog", jog)):
+        (kiosk,) = await start_kiosks(1)
+        hardware = HardwareManager(**kiosk.ports)
+        await hardware.connect_all()
+        try:
+            results[name] = await mode(hardware, kiosk.arm, targets, rate)
+        finally:
+            await hardware.close_all_ports()
+            kiosk.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--rate", type=float, default=60.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    print(json.dumps(asyncio.run(run(args.seconds, args.rate)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
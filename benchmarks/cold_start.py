@@ -0,0 +1,169 @@
+"""
+Cold-start time of the director: from a fresh interpreter to "ready".
+
+Usage:
+    python -m benchmarks.cold_start [--runs 5] [--time-scale 1.0] [--missing-arm]
+
+Each run starts a new Python process, so module imports are cold (apart
+from the OS file cache). The child imports src.live_director, then runs
+AumDirectorApp with the local Gemini stand-in (its scripted connect
+latency), an in-process EmulatedKiosk and a silent audio device until the
+startup plan reports ready (see src/startup.py).
+
+Reported per run and as the median over --runs:
+    process_to_ready_s   process spawn -> ready (what a power cycle waits)
+    import_s             importing src.live_director
+    ready_s              AumDirectorApp.run() -> ready
+    denoiser_s           run() -> noisereduce/SciPy imported (after ready)
+    sum_of_phases_s      the phases one after another (the serial startup)
+--missing-arm points the arm at a port that never appears, to show that
+ready does not wait for PORT_WAIT_TIMEOUT.
+"""
+
+import argparse
+import array
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+
+class _SilentStream:
+    def __init__(self, rate):
+        self.rate = rate
+
+    def read(self, frames, exception_on_overflow=True):
+        time.sleep(frames / self.rate)
+        # Faint noise: the denoiser turns pure silence into NaNs.
+        return array.array(
+            "h", (random.randint(-64, 64) for _ in range(frames))
+        ).tobytes()
+
+    def write(self, data):
+        time.sleep(len(data) / 2 / self.rate)
+
+
+class SilentAudio:
+    """Stands in for pyaudio.PyAudio so the director runs without sound devices."""
+
+    def get_format_from_width(self, width):
+        return width
+
+    def open(self, rate, **kwargs):
+        return _SilentStream(rate)
+
+    def terminate(self):
+        pass
+
+
+async def _start_director(director_class, time_scale, missing_arm):
+    from src import startup
+    from src.hardware_controller import HardwareManager
+    from src.hardware_emulator import EmulatedKiosk, load_profiles
+    from src.live_director import DENOISE_MODULES
+    from src.local_genai import LocalGenaiClient, load_script
+    from src.orchestrator import StatefulOrchestrator
+
+    script = load_script()
+    script["time_scale"] = time_scale
+    client = LocalGenaiClient(script)
+    kiosk = EmulatedKiosk(load_profiles())
+    kiosk.start()
+    ports = dict(kiosk.ports)
+    if missing_arm:
+        ports["arm_port"] = os.path.join(os.getcwd(), "missing_arm_port")
+    hardware = HardwareManager(**ports)
+    director = director_class(
+        orchestrator=StatefulOrchestrator(hardware=hardware, client=client),
+        client=client,
+    )
+    director.pya = SilentAudio()
+    director_task = asyncio.create_task(director.run())
+    try:
+        await director.ready.wait()
+        ready_at = time.time()
+        # Let the denoiser import finish so its phase is in the report.
+        await startup.import_modules(*DENOISE_MODULES)
+        await asyncio.sleep(0)
+    finally:
+        director_task.cancel()
+        await asyncio.gather(director_task, return_exceptions=True)
+        kiosk.close()
+    return ready_at, director.startup_plan.report()
+
+
+def child(time_scale, missing_arm):
+    """Runs in the spawned process; prints one JSON line with its timings."""
+    started = time.perf_counter()
+    from src.live_director import AumDirectorApp
+
+    import_s = time.perf_counter() - started
+
+    class BenchmarkDirector(AumDirectorApp):
+        async def listen_for_web_commands(self):
+            await asyncio.Event().wait()
+
+    ready_at, report = asyncio.run(
+        _start_director(BenchmarkDirector, time_scale, missing_arm)
+    )
+    print(json.dumps({"import_s": import_s, "ready_at": ready_at, "report": report}))
+
+
+def run_once(time_scale, missing_arm):
+    command = [sys.executable, "-m", "benchmarks.cold_start", "--child"]
+    command += ["--time-scale", str(time_scale)]
+    if missing_arm:
+        command.append("--missing-arm")
+    spawned_at = time.time()
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    report = result["report"]
+    (imports,) = [phase for phase in report["phases"] if phase["name"] == "imports"]
+    return {
+        "process_to_ready_s": round(result["ready_at"] - spawned_at, 3),
+        "import_s": round(result["import_s"], 3),
+        "ready_s": report["ready_s"],
+        "sum_of_phases_s": round(
+            sum(phase["seconds"] for phase in report["phases"]), 3
+        ),
+        "denoiser_s": round(imports["started_s"] + imports["seconds"], 3),
+        "critical_path": report["critical_path"],
+        "phases": {phase["name"]: phase["seconds"] for phase in report["phases"]},
+        "pending": report["pending"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    parser.add_argument("--missing-arm", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    os.environ.setdefault("AUM_PORT_DISCOVERY", "off")
+    os.environ.setdefault("AUM_TRACING", "0")
+
+    if args.child:
+        child(args.time_scale, args.missing_arm)
+        return
+
+    runs = [run_once(args.time_scale, args.missing_arm) for _ in range(args.runs)]
+    median = {
+        key: round(statistics.median(run[key] for run in runs), 3)
+        for key in (
+            "process_to_ready_s",
+            "import_s",
+            "ready_s",
+            "denoiser_s",
+            "sum_of_phases_s",
+        )
+    }
+    print(json.dumps({"runs": len(runs), "median": median, "each": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
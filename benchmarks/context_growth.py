@@ -0,0 +1,162 @@
+"""
+Context growth of the Live session over a day of visitors: the prompt tokens
+of each model turn, with and without compression and a fresh context.
+
+Usage:
+    python -m benchmarks.context_growth [--visitors 20] [--idle-s 120]
+                                        [--speech-s 3]
+
+Drives LiveSessionManager over the local Gemini stand-in, which counts the
+session context from the audio and text it is sent (see src/local_genai.py).
+Each visitor has the scripted conversation: every answer follows --speech-s
+of microphone audio, and --idle-s of audio from the empty room goes to the
+session between visitors. No real time passes, so only token counts are
+reported; the stand-in does not slow down with a larger context.
+
+Configurations:
+    none           one session, no compression (the old setup)
+    compression    sliding-window compression (AUM_LIVE_COMPRESSION_*)
+    fresh_context  compression, and a fresh session per visitor (the default)
+
+Reported per configuration, after the sliding window's settings: the
+prompt tokens of each visitor's first turn, the peak and the final turn's
+prompt tokens, and the number of session switches.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+
+from google.genai import types
+
+from src import live_session
+from src.live_session import LiveSessionManager
+from src.live_director import SEND_SAMPLE_RATE, SYSTEM_PROMPT_PATH
+from src.local_genai import LocalGenaiClient, load_script
+
+CONFIGURATIONS = {
+    # name: (compression, fresh_context)
+    "none": (False, False),
+    "compression": (True, False),
+    "fresh_context": (True, True),
+}
+ANSWERS = [
+    "I love going to the market on Sundays.",
+    "There is a stall that sells fresh bread.",
+    "My grandmother used to take me there.",
+    "We would sit by the pool afterwards.",
+]
+NARRATIVE = "That sounds lovely. Can you tell me more about it?"
+
+
+def _audio(seconds):
+    return {
+        "data": bytes(int(2 * SEND_SAMPLE_RATE * seconds)),
+        "mime_type": "audio/pcm",
+    }
+
+
+async def _turn(manager, session, finished):
+    """Answers the next scripted tool call and reads Bob's reply; returns the command."""
+    command = None
+    async for message in session.receive():
+        manager.on_message(session, message)
+        if message.tool_call:
+            call = message.tool_call.function_calls[0]
+            command = call.args["command"]
+            await session.send_tool_response(
+                function_responses=[
+                    types.FunctionResponse(
+                        id=call.id,
+                        name=call.name,
+                        response={
+                            "narrative": NARRATIVE,
+                            "is_story_finished": finished(command),
+                        },
+                    )
+                ]
+            )
+            if finished(command):
+                manager.fresh_context(session)
+    return command
+
+
+async def run_configuration(name, visitors, idle_s, speech_s, system_prompt):
+    compression, fresh_context = CONFIGURATIONS[name]
+    script = load_script()
+    conversation = ["START_CONVERSATION"] + ANSWERS + ["stop"]
+    script["utterances"] = conversation * visitors
+    script["time_scale"] = 0
+    config = types.LiveConnectConfig(
+        response_modalities=["AUDIO"],
+        context_window_compression=(
+            live_session.context_window_compression() if compression else None
+        ),
+    )
+    manager = LiveSessionManager(
+        LocalGenaiClient(script),
+        config,
+        standby=fresh_context,
+        resumption=False,
+        fresh_context=fresh_context,
+    )
+    manager.system_prompt = system_prompt
+    prompts = []
+    visitor_start = []
+    try:
+        await manager.begin(await manager.open())
+        for _ in range(visitors):
+            if fresh_context:
+                while manager.standby is None:
+                    await asyncio.sleep(0.01)
+            for turn in range(len(conversation)):
+                session = manager.session
+                await _turn(manager, session, lambda command: command == "stop")
+                prompts.append(manager.context_tokens)
+                if turn == 0:
+                    visitor_start.append(manager.context_tokens)
+                if turn < len(conversation) - 1:
+                    await session.send_realtime_input(audio=_audio(speech_s))
+            while fresh_context and manager.session is session:
+                await asyncio.sleep(0.01)
+            await manager.session.send_realtime_input(audio=_audio(idle_s))
+    finally:
+        await manager.close()
+    return {
+        "visitor_start_tokens": visitor_start,
+        "peak_tokens": max(prompts),
+        "final_tokens": prompts[-1],
+        "switches": len(manager.switches),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--visitors", type=int, default=20)
+    parser.add_argument("--idle-s", type=float, default=120.0)
+    parser.add_argument("--speech-s", type=float, default=3.0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    with open(SYSTEM_PROMPT_PATH, "r") as f:
+        system_prompt = f.read()
+    window = live_session.context_window_compression()
+    report = {
+        "window": {
+            "trigger_tokens": window.trigger_tokens if window else 0,
+            "target_tokens": window.sliding_window.target_tokens if window else 0,
+        }
+    }
+    for name in CONFIGURATIONS:
+        report[name] = asyncio.run(
+            run_configuration(
+                name, args.visitors, args.idle_s, args.speech_s, system_prompt
+            )
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
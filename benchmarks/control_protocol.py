@@ -0,0 +1,104 @@
+"""
+Per-message cost of routing and handling control messages.
+
+Usage:
+    python -m benchmarks.control_protocol [--messages 100000]
+
+"before" is the old path: the web server json.loads every message to route
+it, then the director json.loads it again and walks an if/elif chain.
+"after" is src/control_protocol.py: the server only peeks at the type and
+the director decodes once through the compiled decoders and dispatch table.
+Handlers do nothing, so the numbers are protocol overhead only.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from src.control_protocol import (
+    Dispatcher,
+    MoveRoboticArm,
+    ResetConversation,
+    TriggerScene,
+    encode,
+    peek_type,
+)
+
+MESSAGES = [
+    encode(MoveRoboticArm(p1=2048, p2=1024, p3=3000)),
+    encode(TriggerScene(scene_name="SCENE_WELCOME")),
+    encode(ResetConversation()),
+]
+
+
+async def _noop(*args, **kwargs):
+    pass
+
+
+async def before(messages):
+    routed = 0
+    for text in messages:
+        # web/server.py
+        message = json.loads(text)
+        if isinstance(message, dict) and message.get("type"):
+            routed += 1
+        # listen_for_web_commands
+        data = json.loads(text)
+        if data.get("type") == "trigger_scene":
+            await _noop(data.get("scene_name"))
+        elif data.get("type") == "move_robotic_arm":
+            await _noop(**data.get("params", {}))
+        elif data.get("type") == "reset_conversation":
+            await _noop()
+    return routed
+
+
+async def after(messages):
+    dispatcher = Dispatcher(
+        {TriggerScene: _noop, MoveRoboticArm: _noop, ResetConversation: _noop}
+    )
+    routed = 0
+    for text in messages:
+        if peek_type(text):
+            routed += 1
+        await dispatcher.dispatch(text)
+    return routed
+
+
+def _measure(handler, messages):
+    started = time.perf_counter()
+    asyncio.run(handler(messages))
+    return round(1e6 * (time.perf_counter() - started) / len(messages), 3)
+
+
+def _route_only(messages):
+    results = {}
+    for name, route in (("json_loads", json.loads), ("peek_type", peek_type)):
+        started = time.perf_counter()
+        for text in messages:
+            route(text)
+        results[name] = round(1e6 * (time.perf_counter() - started) / len(messages), 3)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=100000)
+    args = parser.parse_args()
+    messages = [MESSAGES[i % len(MESSAGES)] for i in range(args.messages)]
+    print(
+        json.dumps(
+            {
+                "messages": args.messages,
+                "server_route_us": _route_only(messages),
+                "before_us_per_message": _measure(before, messages),
+                "after_us_per_message": _measure(after, messages),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Load run: N emulated kiosks in one process, each driven by its own HardwareManager.
+
+Usage:
+    python -m benchmarks.emulator_load [--kiosks 8] [--commands 20]
+
+Reports kiosk startup time, host connect time, per-device throughput and
+latency, and how many simulated arm moves completed or were cut short by the
+next command. No socat or physical hardware is needed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from src.hardware_controller import HardwareManager
+from src.hardware_emulator import start_kiosks
+
+
+async def drive_kiosk(kiosk, commands):
+    """Connects a HardwareManager to one kiosk and alternates scene/arm commands."""
+    hardware = HardwareManager(**kiosk.ports)
+    connect_started = time.perf_counter()
+    await hardware.connect_all()
+    connect_ms = (time.perf_counter() - connect_started) * 1000
+    try:
+        for i in range(commands):
+            await asyncio.gather(
+                hardware.trigger_diorama_scene(1 + i % 12),
+                hardware.move_robotic_arm(1000 + i, 2000, 3000),
+            )
+    finally:
+        await hardware.close_all_ports()
+    return connect_ms, hardware.action_stats()
+
+
+async def run(kiosk_count, commands):
+    started = time.perf_counter()
+    kiosks = await start_kiosks(kiosk_count)
+    startup_ms = (time.perf_counter() - started) * 1000
+    try:
+        run_started = time.perf_counter()
+        results = await asyncio.gather(
+            *(drive_kiosk(kiosk, commands) for kiosk in kiosks)
+        )
+        run_s = time.perf_counter() - run_started
+        kiosk_stats = [kiosk.stats() for kiosk in kiosks]
+    finally:
+        for kiosk in kiosks:
+            kiosk.close()
+
+    total_commands = sum(
+        device["commands_handled"] for stats in kiosk_stats for device in stats.values()
+    )
+    return {
+        "kiosks": kiosk_count,
+        "startup_ms": round(startup_ms, 2),
+        "connect_ms_max": round(max(connect_ms for connect_ms, _ in results), 2),
+        "run_s": round(run_s, 3),
+        "total_commands_per_s": round(total_commands / run_s, 1),
+        "arm_moves_completed": sum(
+            s["ARM_EMU"]["moves_completed"] for s in kiosk_stats
+        ),
+        "arm_moves_preempted": sum(
+            s["ARM_EMU"]["moves_preempted"] for s in kiosk_stats
+        ),
+        "per_kiosk": [
+            {"emulator": stats, "host": host_stats["devices"]}
+            for stats, (_, host_stats) in zip(kiosk_stats, results)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--kiosks", type=int, default=8)
+    parser.add_argument("--commands", type=int, default=20)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    report = asyncio.run(run(args.kiosks, args.commands))
+    if not args.verbose:
+        report.pop("per_kiosk")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Throughput of the offline log analytics tool on a synthetic exhibition week.
+
+Usage:
+    python -m benchmarks.log_analytics [--days 7] [--hours 10] [--turn-interval 30]
+                                       [--noise 40] [--files 8]
+
+Writes --days of director logs (a turn every --turn-interval seconds during
+--hours per day, each with its Storyteller call, scene, serial and ADB lines,
+plus --noise unrelated lines per turn) as python-json-logger records split
+over --files rotated files, all but the newest gzipped. Then times
+src/log_analytics.py over them and reports lines per second and peak memory.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from src.log_analytics import analyze
+
+SCENES = ["MARKET", "HOME", "REFLECTION_POOL", "SPORTS_GROUND", "INTERNET_CAFE"]
+
+
+def _record(timestamp, message, level="INFO"):
+    asctime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+    asctime += f",{int(timestamp * 1000) % 1000:03d}"
+    return json.dumps(
+        {"asctime": asctime, "name": "root", "levelname": level, "message": message}
+    )
+
+
+def _turn(rng, t, noise):
+    lines = [_record(t, '[DIRECTOR] ---> User speech detected: "tell me more"')]
+    t += 0.05
+    lines.append(_record(t, "[ORCHESTRATOR] ---> Calling Gemini API."))
+    storyteller = rng.lognormvariate(0.2, 0.4)
+    t += storyteller
+    lines.append(
+        _record(
+            t,
+            f"[ORCHESTRATOR] <--- Storyteller replied in {1000 * storyteller:.0f} ms.",
+        )
+    )
+    scene = rng.choice(SCENES)
+    lines.append(
+        _record(t, f"[ORCHESTRATOR] ---> Executing actions for scene '{scene}'...")
+    )
+    scene_started = t
+    for _ in range(3):
+        rtt = rng.uniform(0.1, 0.2)
+        lines.append(_record(t, '[HARDWARE] ---> Sent to Robotic Arm Controller: "4"'))
+        t += rtt
+        lines.append(
+            _record(t, '[HARDWARE] <--- Received from Robotic Arm Controller: "ok"')
+        )
+        lines.append(
+            _record(
+                t,
+                f"[HARDWARE] Action move_robotic_arm on arm ok in {1000 * rtt:.0f} ms.",
+            )
+        )
+    adb = rng.uniform(0.5, 1.5)
+    lines.append(
+        _record(t, "[HARDWARE] ---> Executing ADB command: adb shell am start")
+    )
+    t += adb
+    if rng.random() < 0.02:
+        lines.append(
+            _record(t, "[HARDWARE] ERROR: ADB command failed with code 1: x", "ERROR")
+        )
+        lines.append(
+            _record(
+                t,
+                f"[HARDWARE] Action play_video on tablet failed (error) in {1000 * adb:.0f} ms (attempt 1/1).",
+                "WARNING",
+            )
+        )
+    else:
+        lines.append(_record(t, "[HARDWARE] <--- ADB command successful: Starting"))
+        lines.append(
+            _record(
+                t, f"[HARDWARE] Action play_video on tablet ok in {1000 * adb:.0f} ms."
+            )
+        )
+    lines.append(
+        _record(
+            t,
+            f"[ORCHESTRATOR] <--- Scene '{scene}' done in {1000 * (t - scene_started):.0f} ms.",
+        )
+    )
+    for i in range(noise):
+        lines.append(
+            _record(
+                t + 0.01 * i,
+                f"[WEB_SERVER] Broadcasting 'arm_telemetry' to all UIs. {i}",
+            )
+        )
+    return lines
+
+
+def write_week(directory, days, hours, turn_interval, noise, files, seed=7):
+    """Writes the synthetic logs; returns (paths, lines, bytes)."""
+    rng = random.Random(seed)
+    start = time.mktime((2026, 10, 12, 9, 0, 0, 0, 0, -1))
+    turn_times = [
+        start + day * 86400 + offset
+        for day in range(days)
+        for offset in range(0, hours * 3600, turn_interval)
+    ]
+    per_file = -(-len(turn_times) // files)
+    paths, lines_written = [], 0
+    for index in range(files):
+        chunk = turn_times[index * per_file : (index + 1) * per_file]
+        newest = index == files - 1
+        name = "app.log" if newest else f"app.log.{files - 1 - index}.gz"
+        path = os.path.join(directory, name)
+        opener = open if newest else gzip.open
+        with opener(path, "wt") as f:
+            for t in chunk:
+                lines = _turn(rng, t, noise)
+                lines_written += len(lines)
+                f.write("\n".join(lines) + "\n")
+        os.utime(path, (chunk[-1] if chunk else start, chunk[-1] if chunk else start))
+        paths.append(path)
+    return paths, lines_written, sum(os.path.getsize(p) for p in paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--hours", type=int, default=10)
+    parser.add_argument("--turn-interval", type=int, default=30)
+    parser.add_argument("--noise", type=int, default=40)
+    parser.add_argument("--files", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths, lines, size = write_week(
+            directory, args.days, args.hours, args.turn_interval, args.noise, args.files
+        )
+        turns = 0
+
+        def count_turn(turn):
+            nonlocal turns
+            turns += 1
+
+        started = time.perf_counter()
+        report = analyze(paths, on_turn=count_turn)
+        elapsed = time.perf_counter() - started
+        # A second, slower pass under tracemalloc for the peak memory.
+        tracemalloc.start()
+        analyze(paths)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(
+        json.dumps(
+            {
+                "lines": lines,
+                "compressed_bytes": size,
+                "turns": turns,
+                "seconds": round(elapsed, 2),
+                "lines_per_second": round(lines / elapsed),
+                "peak_memory_kb": round(peak / 1024),
+                "turn_latency": report["latency"]["turn"],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Event-loop lag caused by logging: synchronous handlers vs the queued pipeline.
+
+Usage:
+    python -m benchmarks.logging_overhead [--rate 2000] [--seconds 3]
+
+A producer task logs [HARDWARE]-style records at --rate per second while a
+probe task measures how late a 5 ms sleep wakes up. The records go to a real
+file and to stdout (redirected to /dev/null), first through plain
+FileHandler/StreamHandler, then through src.log_pipeline.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+from pythonjsonlogger import jsonlogger
+
+from src.log_pipeline import LogPipeline, rotating_file_handler
+
+PROBE_INTERVAL = 0.005
+
+
+def _handlers(log_path, devnull):
+    formatter = jsonlogger.JsonFormatter(
+        "%(asctime)s %(name)s %(levelname)s %(message)s"
+    )
+    file_handler = rotating_file_handler(log_path)
+    console_handler = logging.StreamHandler(devnull)
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+    return [file_handler, console_handler]
+
+
+async def _probe(lags, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def _produce(logger, rate, seconds, stop):
+    # Log in 10 ms bursts, like a busy send_command/tool-call loop.
+    per_burst = max(1, int(rate / 100))
+    deadline = time.monotonic() + seconds
+    count = 0
+    while time.monotonic() < deadline:
+        for _ in range(per_burst):
+            logger.info(f'[HARDWARE] ---> Sent to Robotic Arm Controller: "3 {count}"')
+            count += 1
+        await asyncio.sleep(0.01)
+    stop.set()
+    return count
+
+
+async def measure(logger, rate, seconds):
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, stop))
+    count = await _produce(logger, rate, seconds, stop)
+    await probe
+    lags.sort()
+    return {
+        "records": count,
+        "lag_p50_ms": round(1000 * lags[len(lags) // 2], 3),
+        "lag_p99_ms": round(1000 * lags[int(0.99 * (len(lags) - 1))], 3),
+        "lag_max_ms": round(1000 * lags[-1], 3),
+    }
+
+
+def run(rate, seconds):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, "w") as devnull:
+        logger = logging.getLogger("logging_overhead")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+
+        handlers = _handlers(os.path.join(tmp_dir, "sync.log"), devnull)
+        for handler in handlers:
+            logger.addHandler(handler)
+        results["sync"] = asyncio.run(measure(logger, rate, seconds))
+        for handler in handlers:
+            logger.removeHandler(handler)
+            handler.close()
+
+        # No rate limit here, so both runs write the same records.
+        pipeline = LogPipeline(
+            _handlers(os.path.join(tmp_dir, "queued.log"), devnull), rate_limits={}
+        )
+        logger.addHandler(pipeline.handler)
+        pipeline.start()
+        results["queued"] = asyncio.run(measure(logger, rate, seconds))
+        pipeline.stop()
+        logger.removeHandler(pipeline.handler)
+        results["queued"]["pipeline"] = pipeline.stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rate, args.seconds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Overhead of the event-loop monitor and sampling profiler on a busy loop.
+
+Usage:
+    python -m benchmarks.loop_monitor [--steps 20000] [--tasks 8] [--rounds 3]
+
+Runs a loop-bound workload (--tasks coroutines doing a little CPU work per
+step, like audio chunk handling) with no monitor, with src/loop_monitor.py
+running, and with the profiler sampling at its default rate. Reports the
+best wall time of --rounds runs and the overhead against no monitor.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+
+from src.loop_monitor import LoopMonitor
+
+
+def _chunk_work():
+    total = 0
+    for i in range(200):
+        total += i * i
+    return total
+
+
+async def _workload(steps, tasks):
+    async def worker():
+        for _ in range(steps // tasks):
+            _chunk_work()
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(worker() for _ in range(tasks)))
+
+
+async def _run(mode, steps, tasks, profile_dir):
+    monitor = None
+    if mode != "off":
+        monitor = LoopMonitor(profile_dir=profile_dir)
+        monitor.start()
+        if mode == "profiling":
+            monitor.start_profiler()
+    started = time.perf_counter()
+    await _workload(steps, tasks)
+    elapsed = time.perf_counter() - started
+    samples = 0
+    if monitor:
+        samples = monitor.profiler.sample_count if monitor.profiler else 0
+        await monitor.stop()
+    return elapsed, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--tasks", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    modes = ("off", "monitor", "profiling")
+    runs = {mode: [] for mode in modes}
+    with tempfile.TemporaryDirectory() as profile_dir:
+        # Interleave the modes so machine noise affects them alike.
+        for _ in range(args.rounds):
+            for mode in modes:
+                runs[mode].append(
+                    asyncio.run(_run(mode, args.steps, args.tasks, profile_dir))
+                )
+    results = {"steps": args.steps, "tasks": args.tasks}
+    for mode in modes:
+        elapsed, samples = min(runs[mode])
+        results[mode] = {"wall_ms": round(1000 * elapsed, 1)}
+        if mode == "profiling":
+            results[mode]["samples"] = samples
+    for mode in ("monitor", "profiling"):
+        results[mode]["overhead_pct"] = round(
+            100 * (results[mode]["wall_ms"] / results["off"]["wall_ms"] - 1), 1
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Reconnect gap of the Live session: how long the director is left without a
+usable session when the connection drops mid-conversation.
+
+Usage:
+    python -m benchmarks.reconnect_gap [--drops 3] [--time-scale 1.0]
+                                       [--scenarios standby,resume,reconnect,go_away]
+
+Runs AumDirectorApp with the local Gemini stand-in (its scripted connect
+latency), an in-process EmulatedKiosk and a silent audio device, and drops
+the active session --drops times per scenario, at a random point of a turn:
+    standby    the standby session is promoted (the default setup)
+    resume     no standby: the session is resumed from its latest handle
+    reconnect  neither: a new session is connected and sent the system
+               prompt (the old director also slept 5 s before this)
+    go_away    the server sends GoAway and drops the connection 10 s later
+
+Reported per scenario: the gap p50/max in ms as src/live_session.py measures
+it, how the new session learned the conversation (server, recap, kickoff or
+fresh), and the time from the drop to the visitor's next words reaching the
+orchestrator, which includes the scripted visitor speech.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import time
+
+from benchmarks.cold_start import SilentAudio
+from src.hardware_controller import HardwareManager
+from src.hardware_emulator import EmulatedKiosk, load_profiles
+from src.live_director import AumDirectorApp
+from src.local_genai import LocalGenaiClient, load_script
+from src.orchestrator import StatefulOrchestrator
+
+SCENARIOS = {
+    # name: (standby, resumption, event)
+    "standby": (True, True, "drop"),
+    "resume": (False, True, "drop"),
+    "reconnect": (False, False, "drop"),
+    "go_away": (True, True, "go_away"),
+}
+GO_AWAY_TIME_LEFT = 10.0
+ANSWERS = [
+    "I love going to the market on Sundays.",
+    "There is a stall that sells fresh bread.",
+    "My grandmother used to take me there.",
+    "We would sit by the pool afterwards.",
+]
+WAIT_TIMEOUT = 60.0
+
+
+class BenchmarkDirector(AumDirectorApp):
+    """The director with silent audio and no web control connection."""
+
+    async def listen_for_web_commands(self):
+        await asyncio.Event().wait()
+
+
+async def _until(condition, timeout=WAIT_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("benchmark condition not reached")
+        await asyncio.sleep(0.01)
+
+
+async def run_scenario(name, drops, time_scale, rng):
+    standby, resumption, event = SCENARIOS[name]
+    os.environ["AUM_LIVE_STANDBY"] = "1" if standby else "0"
+    os.environ["AUM_LIVE_RESUMPTION"] = "1" if resumption else "0"
+    # Only the drops should switch sessions, not the end of each story.
+    os.environ["AUM_LIVE_FRESH_CONTEXT"] = "0"
+
+    script = load_script()
+    script["utterances"] = ["START_CONVERSATION"] + ANSWERS * (2 * drops + 2)
+    script["time_scale"] = time_scale
+    client = LocalGenaiClient(script)
+    kiosk = EmulatedKiosk(load_profiles())
+    kiosk.start()
+    orchestrator = StatefulOrchestrator(
+        hardware=HardwareManager(**kiosk.ports), client=client
+    )
+    calls = []
+    process_user_input = orchestrator.process_user_input
+
+    async def timed_process_user_input(command, director):
+        calls.append(time.monotonic())
+        return await process_user_input(command, director)
+
+    orchestrator.process_user_input = timed_process_user_input
+    director = BenchmarkDirector(orchestrator=orchestrator, client=client)
+    director.pya = SilentAudio()
+    director_task = asyncio.create_task(director.run())
+    results = []
+    try:
+        await director.ready.wait()
+        for _ in range(drops):
+            seen = len(calls)
+            await _until(lambda: len(calls) > seen)
+            live = director.live
+            if standby:
+                await _until(lambda: live.standby is not None)
+            elif resumption:
+                await _until(lambda: live.handle is not None)
+            await asyncio.sleep(rng.uniform(0.2, 2.0) * time_scale)
+
+            switches = len(live.switches)
+            seen = len(calls)
+            dropped_at = time.monotonic()
+            if event == "go_away":
+                director.session.go_away(GO_AWAY_TIME_LEFT * time_scale)
+            else:
+                director.session.drop()
+            await _until(lambda: len(live.switches) > switches)
+            switch = live.switches[-1]
+            await _until(lambda: len(calls) > seen)
+            results.append(
+                {
+                    "gap_ms": 1000 * switch.gap_s,
+                    "via": switch.via,
+                    "context": switch.context,
+                    "next_words_ms": 1000 * (calls[seen] - dropped_at),
+                }
+            )
+    finally:
+        director_task.cancel()
+        await asyncio.gather(director_task, return_exceptions=True)
+        kiosk.close()
+
+    gaps = [result["gap_ms"] for result in results]
+    next_words = [result["next_words_ms"] for result in results]
+    return {
+        "drops": len(results),
+        "gap_p50_ms": round(statistics.median(gaps), 1),
+        "gap_max_ms": round(max(gaps), 1),
+        "next_words_p50_ms": round(statistics.median(next_words), 1),
+        "via": sorted({result["via"] for result in results}),
+        "context": sorted({result["context"] for result in results}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drops", type=int, default=3)
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    os.environ.setdefault("AUM_PORT_DISCOVERY", "off")
+
+    rng = random.Random(args.seed)
+    report = {"time_scale": args.time_scale}
+    for name in args.scenarios.split(","):
+        report[name] = asyncio.run(run_scenario(name, args.drops, args.time_scale, rng))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
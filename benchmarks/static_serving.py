@@ -0,0 +1,107 @@
+"""
+Bytes and time to serve the admin page and static assets, before and after caching.
+
+Usage:
+    python -m benchmarks.static_serving [--requests 200]
+
+"before" reads web/index.html on every request and serves context/ with the
+plain StaticFiles mount; "after" uses web/static_cache.py. Each path is
+fetched --requests times as a first visit (Accept-Encoding: gzip, br) and
+once more as a repeat visit that sends back the ETag it was given.
+"""
+
+import argparse
+import json
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.testclient import TestClient
+
+from web.static_cache import CachedPage, CompressedStaticFiles
+
+HTML_PATH = "web/index.html"
+STATIC_DIRECTORY = "context"
+PATHS = [
+    "/",
+    "/static/STORY_SCRIPT.md",
+    "/static/new_architecture_diagram.svg",
+    "/static/aums_web_admin.png",
+]
+FIRST_VISIT = {"Accept-Encoding": "gzip, br"}
+
+
+def before_app():
+    app = FastAPI()
+    app.mount("/static", StaticFiles(directory=STATIC_DIRECTORY), name="static")
+
+    @app.get("/")
+    async def get_main():
+        with open(HTML_PATH) as f:
+            return HTMLResponse(f.read())
+
+    return app
+
+
+def after_app():
+    app = FastAPI()
+    page = CachedPage(HTML_PATH, reload=False)
+    static_files = CompressedStaticFiles(directory=STATIC_DIRECTORY, reload=False)
+    static_files.precompress()
+    app.mount("/static", static_files, name="static")
+
+    @app.get("/")
+    async def get_main(request: Request):
+        return page.response(request.headers)
+
+    return app
+
+
+def _wire_bytes(response):
+    # The encoded body as sent; httpx decodes response.content for us.
+    return int(response.headers.get("content-length", len(response.content)))
+
+
+def measure(app, requests):
+    results = {}
+    with TestClient(app) as client:
+        for path in PATHS:
+            client.get(path, headers=FIRST_VISIT)  # Warm up
+            started = time.perf_counter()
+            for _ in range(requests):
+                response = client.get(path, headers=FIRST_VISIT)
+            elapsed = time.perf_counter() - started
+            etag = response.headers.get("etag")
+            repeat = client.get(
+                path,
+                headers={**FIRST_VISIT, **({"If-None-Match": etag} if etag else {})},
+            )
+            results[path] = {
+                "bytes": _wire_bytes(response),
+                "encoding": response.headers.get("content-encoding", "identity"),
+                "mean_ms": round(1000 * elapsed / requests, 3),
+                "repeat_status": repeat.status_code,
+                "repeat_bytes": len(repeat.content) if repeat.status_code == 200 else 0,
+                "cache_control": response.headers.get("cache-control"),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    results = {
+        "before": measure(before_app(), args.requests),
+        "after": measure(after_app(), args.requests),
+    }
+    results["total_bytes"] = {
+        name: sum(path["bytes"] for path in results[name].values())
+        for name in ("before", "after")
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
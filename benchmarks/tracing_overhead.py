@@ -0,0 +1,87 @@
+"""
+Cost of a tracing span (src/tracing.py) on the event loop thread.
+
+Usage:
+    python -m benchmarks.tracing_overhead [--spans 100000]
+
+"no_trace" opens spans outside a turn (the no-op path taken by jog
+commands and idle audio). "traced" opens nested spans inside a turn with
+the file exporter running. Times are per span on the calling thread; the
+JSON encoding and file writes happen on the exporter thread, and
+"export_ms" is how long that thread then took to catch up.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from src import tracing
+
+
+def _bare(count):
+    started = time.perf_counter()
+    for _ in range(count):
+        pass
+    return time.perf_counter() - started
+
+
+def _no_trace(count):
+    started = time.perf_counter()
+    for _ in range(count):
+        with tracing.span("serial.send_command", device="Arm"):
+            pass
+    return time.perf_counter() - started
+
+
+def _traced(count):
+    # Turns of 10 spans each: turn -> 9 nested children, like a real turn.
+    started = time.perf_counter()
+    for _ in range(count // 10):
+        with tracing.start_trace("turn", command="benchmark"):
+            with tracing.span("process_user_input", turn=1):
+                for _ in range(8):
+                    with tracing.span("serial.send_command", device="Arm"):
+                        pass
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spans", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "traces.jsonl")
+        previous = tracing.set_exporter(tracing.TraceExporter(path))
+        try:
+            bare = _bare(args.spans)
+            no_trace = _no_trace(args.spans)
+            traced = _traced(args.spans)
+            flush_started = time.perf_counter()
+            tracing.flush()
+            export = time.perf_counter() - flush_started
+            file_bytes = os.path.getsize(path)
+        finally:
+            tracing.set_exporter(previous)
+
+    def per_span(elapsed):
+        return round(1e6 * (elapsed - bare) / args.spans, 3)
+
+    print(
+        json.dumps(
+            {
+                "spans": args.spans,
+                "no_trace_us_per_span": per_span(no_trace),
+                "traced_us_per_span": per_span(traced),
+                "export_ms": round(1000 * export, 1),
+                "bytes_per_span": round(file_bytes / args.spans, 1),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+End-to-end turn latency: from the end of a visitor's utterance to each stage
+of Bob's reaction.
+
+Usage:
+    python -m benchmarks.turn_latency [--conversations 2] [--time-scale 1.0]
+                                      [--seed 7] [--save-baseline]
+                                      [--tolerance 0.2]
+
+Runs the scripted conversation of the local Gemini stand-in through the real
+AumDirectorApp, StatefulOrchestrator and HardwareManager, with an in-process
+EmulatedKiosk as the hardware and a silent audio device. No network or
+hardware is needed. The stand-in's latencies, the emulator's jitter and the
+microphone noise are drawn from `random` and `np.random`, both seeded with
+--seed, so two runs of the same code sample the same delays.
+
+Every stage is reported as p50/p95/p99 milliseconds after the utterance end:
+    tool_call_received   the director hands the command to the orchestrator
+    storyteller_reply    generate_content returned
+    first_serial_write   first command written to any board this turn
+    first_arm_write      first command written to the robotic arm this turn
+    serial_ack           first non-empty board response this turn
+    first_audio_out      Bob's first audio chunk reaches the speaker
+
+The result is compared with benchmarks/baselines/turn_latency.json. The run
+fails (exit code 1) when a stage's p50 is slower than the baseline by more
+than --tolerance. With about a dozen turns, p95 is a single sample, too
+noisy to gate on; it is reported but not compared.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from src.hardware_controller import HardwareManager
+from src.hardware_emulator import EmulatedKiosk, load_profiles
+from src.live_director import AumDirectorApp
+from src.local_genai import LocalGenaiClient, load_script
+from src.orchestrator import StatefulOrchestrator
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(__file__), "baselines", "turn_latency.json"
+)
+STAGES = (
+    "tool_call_received",
+    "storyteller_reply",
+    "first_serial_write",
+    "first_arm_write",
+    "serial_ack",
+    "first_audio_out",
+)
+SETTLE_S = 1.0  # Time left for trailing scene actions after the last turn
+
+
+class TurnRecorder:
+    """Collects the first timestamp of every stage, per turn."""
+
+    def __init__(self):
+        self.turn = -1
+        self.marks = {}
+
+    def next_turn(self):
+        self.turn += 1
+
+    def mark(self, stage, turn=None):
+        turn = self.turn if turn is None else turn
+        if turn >= 0:
+            self.marks.setdefault(turn, {}).setdefault(stage, time.monotonic())
+
+    # The HardwareJournal interface, so the recorder can sit on the controllers.
+    def record_command(self, device, command):
+        self.mark("first_serial_write")
+        if device == "Robotic Arm Controller":
+            self.mark("first_arm_write")
+
+    def record_response(self, device, response):
+        if response.strip():
+            self.mark("serial_ack")
+
+    def close(self):
+        pass
+
+
+class _SilentStream:
+    """A PyAudio stream that paces reads and writes in real (scaled) time."""
+
+    def __init__(self, rate, recorder, time_scale):
+        self.rate = rate
+        self.recorder = recorder
+        self.time_scale = time_scale
+
+    def read(self, frames, exception_on_overflow=True):
+        time.sleep(frames / self.rate * self.time_scale)
+        return np.random.randint(-64, 64, frames, dtype=np.int16).tobytes()
+
+    def write(self, data):
+        self.recorder.mark("first_audio_out")
+        time.sleep(len(data) / 2 / self.rate * self.time_scale)
+
+
+class SilentAudio:
+    """Stands in for pyaudio.PyAudio so the director runs without sound devices."""
+
+    def __init__(self, recorder, time_scale):
+        self.recorder = recorder
+        self.time_scale = time_scale
+
+    def get_format_from_width(self, width):
+        return width
+
+    def open(self, rate, **kwargs):
+        return _SilentStream(rate, self.recorder, self.time_scale)
+
+    def terminate(self):
+        pass
+
+
+class BenchmarkDirector(AumDirectorApp):
+    """The director with silent audio and no web control connection."""
+
+    def __init__(self, recorder, time_scale, **kwargs):
+        super().__init__(**kwargs)
+        self.pya = SilentAudio(recorder, time_scale)
+
+    async def listen_for_web_commands(self):
+        await asyncio.Event().wait()
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def summarize(samples):
+    """Returns count and p50/p95/p99 in ms for each stage's samples (seconds)."""
+    summary = {}
+    for stage in STAGES:
+        values = samples.get(stage, [])
+        if not values:
+            continue
+        summary[stage] = {
+            "count": len(values),
+            **{
+                f"p{p}_ms": round(1000 * _percentile(values, p / 100), 1)
+                for p in (50, 95, 99)
+            },
+        }
+    return summary
+
+
+def compare(summary, baseline, tolerance):
+    """Returns (stage, baseline p50, current p50) for every stage that regressed."""
+    regressions = []
+    for stage, stats in summary.items():
+        reference = baseline.get("stages", {}).get(stage)
+        if reference and stats["p50_ms"] > reference["p50_ms"] * (1 + tolerance):
+            regressions.append((stage, reference["p50_ms"], stats["p50_ms"]))
+    return regressions
+
+
+async def run(conversations, time_scale):
+    script = load_script()
+    script["utterances"] = script["utterances"] * conversations
+    script["time_scale"] = time_scale
+    client = LocalGenaiClient(script)
+    recorder = TurnRecorder()
+
+    kiosk = EmulatedKiosk(load_profiles())
+    kiosk.start()
+    hardware = HardwareManager(**kiosk.ports)
+    hardware.main_scene_controller.journal = recorder
+    hardware.robotic_arm_controller.journal = recorder
+    orchestrator = StatefulOrchestrator(hardware=hardware, client=client)
+
+    # Each tool call starts a new turn; Storyteller replies belong to it.
+    process_user_input = orchestrator.process_user_input
+
+    async def timed_process_user_input(command, director):
+        recorder.next_turn()
+        recorder.mark("tool_call_received")
+        return await process_user_input(command, director)
+
+    orchestrator.process_user_input = timed_process_user_input
+    generate_content = client.models.generate_content
+
+    def timed_generate_content(*args, **kwargs):
+        turn = recorder.turn
+        response = generate_content(*args, **kwargs)
+        recorder.mark("storyteller_reply", turn)
+        return response
+
+    client.models.generate_content = timed_generate_content
+
+    director = BenchmarkDirector(
+        recorder, time_scale, orchestrator=orchestrator, client=client
+    )
+    started = time.perf_counter()
+    director_task = asyncio.create_task(director.run())
+    try:
+        while not client.sessions:
+            await asyncio.sleep(0.01)
+        await client.sessions[0].finished.wait()
+        await asyncio.sleep(SETTLE_S * time_scale)
+    finally:
+        director_task.cancel()
+        await asyncio.gather(director_task, return_exceptions=True)
+        kiosk.close()
+    elapsed = time.perf_counter() - started
+
+    utterance_ends = {
+        turn: at
+        for turn, stage, at in client.sessions[0].timeline
+        if stage == "utterance_end"
+    }
+    samples = {}
+    for turn, marks in recorder.marks.items():
+        if turn not in utterance_ends:
+            continue
+        for stage, at in marks.items():
+            samples.setdefault(stage, []).append(at - utterance_ends[turn])
+    return {
+        "turns": len(utterance_ends),
+        "time_scale": time_scale,
+        "run_s": round(elapsed, 2),
+        "stages": summarize(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conversations", type=int, default=2)
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    os.environ.setdefault("AUM_PORT_DISCOVERY", "off")
+    # The scripted conversations run on one session, so keep it after each story.
+    os.environ["AUM_LIVE_FRESH_CONTEXT"] = "0"
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    report = asyncio.run(run(args.conversations, args.time_scale))
+    report["seed"] = args.seed
+    print(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        return
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    recorded_with = (baseline.get("time_scale"), baseline.get("seed"))
+    if recorded_with != (report["time_scale"], report["seed"]):
+        print("Baseline was recorded with another --time-scale or --seed; skipping.")
+        return
+    regressions = compare(report["stages"], baseline, args.tolerance)
+    for stage, before, after in regressions:
+        print(f"REGRESSION {stage}: p50 {before} ms -> {after} ms")
+    if regressions:
+        sys.exit(1)
+    print(f"No stage regressed more than {args.tolerance:.0%} against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
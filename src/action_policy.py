@@ -0,0 +1,272 @@
+import asyncio
+import collections
+import functools
+import logging
+import os
+import time
+
+from . import metrics, tracing
+
+# --- Default Action Policies ---
+# deadline: seconds before an attempt is abandoned.
+# retries: extra attempts after a failure. Only idempotent actions get retries.
+# Both can be overridden per action with AUM_ACTION_DEADLINE_<ACTION> and
+# AUM_ACTION_RETRIES_<ACTION> (e.g. AUM_ACTION_DEADLINE_PLAY_VIDEO=15).
+ACTION_POLICIES = {
+    # A retry after a lost reply would play the scene twice.
+    "trigger_diorama_scene": {"device": "main_scene", "deadline": 3.0, "retries": 0},
+    "move_robotic_arm": {"device": "robotic_arm", "deadline": 3.0, "retries": 2},
+    "play_video": {"device": "tablet", "deadline": 10.0, "retries": 0},
+}
+DEFAULT_POLICY = {"device": "unknown", "deadline": 5.0, "retries": 0}
+RETRY_DELAY = 0.2  # Seconds, multiplied by the attempt number
+
+# --- Circuit Breaker Settings ---
+BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failures before a device is cut off
+BREAKER_RESET_TIMEOUT = 30.0  # Seconds before a single probe is let through
+
+# Result prefixes returned by HardwareManager that mean the device failed.
+DEVICE_ERROR_PREFIXES = ("[HARDWARE] ERROR", "Error", "An unexpected error")
+VALIDATION_ERROR_PREFIX = "[HARDWARE] VALIDATION_ERROR"
+MOCK_RESULT_PREFIX = "Mock command"
+
+# --- Metrics ---
+# play_video's latency is the ADB round trip.
+ACTION_SECONDS = metrics.histogram(
+    "aum_hardware_action_seconds",
+    "Duration of each hardware action attempt.",
+    labelnames=("action",),
+)
+ACTION_OUTCOMES = metrics.counter(
+    "aum_hardware_actions_total",
+    "Hardware action attempts by outcome.",
+    labelnames=("action", "outcome"),
+)
+
+
+def get_policy(action):
+    """Returns the policy for an action with any environment overrides applied."""
+    policy = dict(ACTION_POLICIES.get(action, DEFAULT_POLICY))
+    suffix = action.upper()
+    deadline = os.getenv(f"AUM_ACTION_DEADLINE_{suffix}")
+    retries = os.getenv(f"AUM_ACTION_RETRIES_{suffix}")
+    try:
+        if deadline is not None:
+            policy["deadline"] = float(deadline)
+        if retries is not None:
+            policy["retries"] = int(retries)
+    except ValueError:
+        logging.error(f"[HARDWARE] ERROR: Invalid policy override for '{action}'.")
+    return policy
+
+
+def classify_result(result):
+    """Maps a HardwareManager return value onto an outcome name."""
+    if isinstance(result, str):
+        if result.startswith(VALIDATION_ERROR_PREFIX):
+            return "invalid"
+        if result.startswith(DEVICE_ERROR_PREFIXES):
+            return "error"
+        if result.startswith(MOCK_RESULT_PREFIX):
+            return "mocked"
+    return "ok"
+
+
+class CircuitBreaker:
+    """Fails fast for a device after repeated failures, probing again after a cool-off."""
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=BREAKER_RESET_TIMEOUT,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def allow(self):
+        """Returns True if a call may go through to the device."""
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            logging.info(f"[HARDWARE] Circuit for {self.name} is half-open. Probing.")
+        # Half-open: let exactly one probe through.
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        if self.state != "closed":
+            logging.info(f"[HARDWARE] Circuit for {self.name} closed again.")
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def release(self):
+        """Ends a probe that neither proved nor disproved the device's health."""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        if (
+            self.state == "half_open"
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != "open":
+                logging.error(
+                    f"[HARDWARE] ERROR: Circuit for {self.name} opened after "
+                    f"{self.consecutive_failures} consecutive failures."
+                )
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class ActionStats:
+    """Outcome counts and latencies for one action or device."""
+
+    def __init__(self, window=200):
+        self.outcomes = collections.Counter()
+        self.count = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.recent = collections.deque(maxlen=window)
+
+    def record(self, outcome, latency):
+        self.outcomes[outcome] += 1
+        self.count += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.recent.append(latency)
+
+    def summary(self):
+        recent = sorted(self.recent)
+        p95 = recent[int(0.95 * (len(recent) - 1))] if recent else 0.0
+        return {
+            "count": self.count,
+            "outcomes": dict(self.outcomes),
+            "mean_ms": round(1000 * self.total_latency / self.count, 1)
+            if self.count
+            else 0.0,
+            "p95_ms": round(1000 * p95, 1),
+            "max_ms": round(1000 * self.max_latency, 1),
+        }
+
+
+class ActionRunner:
+    """Runs hardware actions under a deadline, retry policy and per-device breaker."""
+
+    def __init__(self):
+        self.breakers = {}
+        self.action_stats = collections.defaultdict(ActionStats)
+        self.device_stats = collections.defaultdict(ActionStats)
+
+    def breaker_for(self, device):
+        if device not in self.breakers:
+            self.breakers[device] = CircuitBreaker(device)
+        return self.breakers[device]
+
+    def _record(self, action, device, outcome, latency):
+        self.action_stats[action].record(outcome, latency)
+        self.device_stats[device].record(outcome, latency)
+        ACTION_OUTCOMES.labels(action, outcome).inc()
+        if outcome != "rejected":
+            ACTION_SECONDS.labels(action).observe(latency)
+
+    async def run(self, action, func, *args, **kwargs):
+        policy = get_policy(action)
+        device = policy["device"]
+        breaker = self.breaker_for(device)
+        attempts = 1 + max(0, policy["retries"])
+
+        result = None
+        for attempt in range(1, attempts + 1):
+            if not breaker.allow():
+                self._record(action, device, "rejected", 0.0)
+                return f"[HARDWARE] ERROR: {device} is unavailable (circuit open). Skipped {action}."
+
+            started = time.perf_counter()
+            outcome = None
+            try:
+                with tracing.span(
+                    f"action.{action}", device=device, attempt=attempt
+                ) as span:
+                    result = await asyncio.wait_for(
+                        func(*args, **kwargs), timeout=policy["deadline"]
+                    )
+                    outcome = classify_result(result)
+                    span.set("outcome", outcome)
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                result = (
+                    f"[HARDWARE] ERROR: {action} timed out after {policy['deadline']}s."
+                )
+            except Exception:
+                # Unexpected errors still count against the device, then surface.
+                self._record(action, device, "error", time.perf_counter() - started)
+                breaker.record_failure()
+                raise
+            finally:
+                if outcome is None:
+                    # Cancelled: says nothing about the device, but a half-open
+                    # probe must not stay in flight or the device stays cut off.
+                    breaker.release()
+            latency = time.perf_counter() - started
+            self._record(action, device, outcome, latency)
+
+            if outcome in ("error", "timeout"):
+                breaker.record_failure()
+                logging.warning(
+                    f"[HARDWARE] Action {action} on {device} failed ({outcome}) "
+                    f"in {latency * 1000:.0f} ms (attempt {attempt}/{attempts})."
+                )
+                if attempt < attempts:
+                    await asyncio.sleep(RETRY_DELAY * attempt)
+                continue
+
+            if outcome in ("invalid", "mocked"):
+                # Nothing reached the device: a mocked send (port down) must
+                # not close the circuit as if the board had answered.
+                breaker.release()
+            else:
+                breaker.record_success()
+            logging.info(
+                f"[HARDWARE] Action {action} on {device} {outcome} in {latency * 1000:.0f} ms."
+            )
+            return result
+        return result
+
+    def summary(self):
+        """Returns per-device and per-action outcome counts and latencies."""
+        return {
+            "devices": {
+                device: {
+                    **stats.summary(),
+                    "circuit": self.breaker_for(device).state,
+                }
+                for device, stats in self.device_stats.items()
+            },
+            "actions": {
+                action: stats.summary() for action, stats in self.action_stats.items()
+            },
+        }
+
+
+def hardware_action(func):
+    """Decorates a HardwareManager method so it runs through its ActionRunner."""
+    action = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        return await self.action_runner.run(action, func, self, *args, **kwargs)
+
+    return wrapper
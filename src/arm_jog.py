@@ -0,0 +1,140 @@
+"""
+Jog mode for manual arm control.
+
+The admin UI streams target positions (jog_arm messages) while a slider is
+dragged. Targets only overwrite the latest one; a control loop samples it at
+a fixed rate and sends the arm a "Move Position" command when it changed.
+Targets replaced before the loop got to them are counted as dropped. After
+each command the arm's position line is reported back to the UI
+(arm_telemetry) along with the control latency.
+"""
+
+import asyncio
+import collections
+import logging
+import math
+import os
+import time
+
+from . import control_protocol
+
+ARM_JOG_RATE = 20.0  # Commands per second; AUM_ARM_JOG_RATE overrides it
+ARM_JOG_IDLE_TIMEOUT = 5.0  # Seconds without targets before the loop stops
+LATENCY_WINDOW = 200  # Recent commands kept for the latency percentiles
+
+
+def parse_arm_position(line):
+    """Parses an "angle:p1|p2|p3" line from the arm; returns None otherwise."""
+    if not line or not line.startswith("angle:"):
+        return None
+    try:
+        return [int(value) for value in line[len("angle:") :].split("|")]
+    except ValueError:
+        return None
+
+
+def jog_rate(rate=None):
+    """Returns the jog rate: rate, else AUM_ARM_JOG_RATE, else ARM_JOG_RATE."""
+    if rate is None:
+        rate = os.getenv("AUM_ARM_JOG_RATE", str(ARM_JOG_RATE))
+    try:
+        rate = float(rate)
+    except ValueError:
+        rate = math.nan
+    if not (rate > 0 and math.isfinite(rate)):
+        logging.warning(
+            f"[ARM_JOG] Invalid jog rate '{rate}', using {ARM_JOG_RATE}/s instead."
+        )
+        return ARM_JOG_RATE
+    return rate
+
+
+class ArmJogController:
+    """Samples the latest jog target at a fixed rate and sends only changes."""
+
+    def __init__(self, hardware, send_telemetry, rate=None):
+        self.hardware = hardware
+        self.send_telemetry = send_telemetry
+        self.period = 1.0 / jog_rate(rate)
+        self.idle_timeout = ARM_JOG_IDLE_TIMEOUT
+        self._pending = None  # (target, seq, received_at)
+        self._wake = asyncio.Event()
+        self._task = None
+        self.last_sent = None
+        self.targets_received = 0
+        self.targets_dropped = 0
+        self.unchanged_skipped = 0
+        self.commands_sent = 0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def set_target(self, target, seq=0):
+        """Replaces the pending target and makes sure the control loop runs."""
+        if self._pending is not None:
+            self.targets_dropped += 1
+        self._pending = (tuple(target), seq, time.monotonic())
+        self.targets_received += 1
+        self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._control_loop())
+
+    async def _control_loop(self):
+        logging.info(
+            f"[ARM_JOG] Jog mode started ({1 / self.period:.0f} commands/s max)."
+        )
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                logging.info(f"[ARM_JOG] Jog mode idle. Stats: {self.stats()}")
+                return
+            self._wake.clear()
+            target, seq, received_at = self._pending
+            self._pending = None
+            if target == self.last_sent:
+                self.unchanged_skipped += 1
+                continue
+
+            started = time.monotonic()
+            await self.hardware.jog_robotic_arm(*target)
+            latency = time.monotonic() - received_at
+            self.last_sent = target
+            self.commands_sent += 1
+            self.latencies.append(latency)
+            response = self.hardware.robotic_arm_controller.last_response
+            await self.send_telemetry(
+                control_protocol.ArmTelemetry(
+                    seq=seq,
+                    target=list(target),
+                    position=parse_arm_position(response),
+                    latency_ms=round(1000 * latency, 2),
+                    dropped=self.targets_dropped,
+                )
+            )
+            # Hold the control rate: the next target waits out the period.
+            await asyncio.sleep(max(0.0, started + self.period - time.monotonic()))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        """Returns target/command counters and control latency percentiles."""
+        latencies = sorted(self.latencies)
+        stats = {
+            "targets_received": self.targets_received,
+            "targets_dropped": self.targets_dropped,
+            "unchanged_skipped": self.unchanged_skipped,
+            "commands_sent": self.commands_sent,
+        }
+        if latencies:
+            stats["latency_p50_ms"] = round(1000 * latencies[len(latencies) // 2], 2)
+            stats["latency_p95_ms"] = round(
+                1000 * latencies[int(0.95 * (len(latencies) - 1))], 2
+            )
+            stats["latency_max_ms"] = round(1000 * latencies[-1], 2)
+        return stats
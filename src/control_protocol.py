@@ -0,0 +1,286 @@
+"""
+The control protocol spoken on /ws/control by the web UI, the web server and
+the director.
+
+Every message is a JSON object whose first key is "type", followed by the
+protocol version "v" and the message's fields:
+
+    {"type": "move_robotic_arm", "v": 1, "params": {"p1": 2048, "p2": 1024, "p3": 3000}}
+
+Messages without "v" are treated as version 1. Each message type has a
+namedtuple and a decoder compiled once from its field list, so decoding is a
+dict lookup plus a fixed sequence of checks. The web server only needs the
+type to route a message, which `peek_type` reads without parsing the rest.
+"""
+
+import collections
+import json
+import logging
+import re
+import time
+
+PROTOCOL_VERSION = 1
+# Valid arm servo positions. Defined here rather than in hardware_controller
+# so the web server can validate messages without importing the serial stack.
+VALID_POSITION_RANGE = range(0, 4096)
+
+
+class ProtocolError(ValueError):
+    """A control message that is not valid JSON or does not match its schema."""
+
+
+# --- Messages ---
+Identify = collections.namedtuple("Identify", "client")
+DisplayQr = collections.namedtuple("DisplayQr", "")
+ResetConversation = collections.namedtuple("ResetConversation", "")
+TriggerScene = collections.namedtuple("TriggerScene", "scene_name")
+MoveRoboticArm = collections.namedtuple("MoveRoboticArm", "p1 p2 p3")
+CommandRejected = collections.namedtuple("CommandRejected", "command error")
+# Jog mode (src/arm_jog.py): the UI streams targets, the director reports back
+# the arm position it read after applying target `seq`.
+JogArm = collections.namedtuple("JogArm", "p1 p2 p3 seq")
+ArmTelemetry = collections.namedtuple(
+    "ArmTelemetry", "seq target position latency_ms dropped"
+)
+# A src/metrics snapshot pushed by the director for the web server's /metrics.
+MetricsSnapshot = collections.namedtuple("MetricsSnapshot", "metrics")
+# Sampling profiler on the director's event loop (src/loop_monitor.py).
+ProfilerControl = collections.namedtuple("ProfilerControl", "action")
+ProfilerStatus = collections.namedtuple(
+    "ProfilerStatus", "running samples path stalls max_lag_ms"
+)
+
+# A field: its name, the accepted type (or tuple of types) and an optional
+# value check that returns an error message (or None).
+Field = collections.namedtuple("Field", "name kind check", defaults=(None,))
+# A message type: its namedtuple, its fields and, if the fields are nested
+# under one key (like move_robotic_arm's "params"), that key.
+MessageSpec = collections.namedtuple(
+    "MessageSpec", "cls fields container decode", defaults=(None, None)
+)
+
+
+def _one_of(*choices):
+    def check(value):
+        return None if value in choices else f"must be one of {', '.join(choices)}"
+
+    return check
+
+
+def _not_empty(value):
+    return None if value else "must not be empty"
+
+
+def _arm_position(value):
+    if value in VALID_POSITION_RANGE:
+        return None
+    return (
+        f"must be between {VALID_POSITION_RANGE.start} "
+        f"and {VALID_POSITION_RANGE.stop - 1}"
+    )
+
+
+def _compile(message_type, cls, fields, container):
+    """Builds the decoder for one message type from its field list."""
+    checks = []
+    for field in fields:
+        kinds = field.kind if isinstance(field.kind, tuple) else (field.kind,)
+        kind_name = " or ".join(kind.__name__ for kind in kinds)
+        # bool is an int subclass, but True is not an arm position.
+        checks.append((field.name, kinds, kind_name, field.check, int in kinds))
+    where = f"'{message_type}'" + (f" {container}" if container else "")
+
+    def decode(data):
+        if container is not None:
+            data = data.get(container)
+            if not isinstance(data, dict):
+                raise ProtocolError(f"{where} must be an object.")
+        values = []
+        for name, kind, kind_name, check, reject_bool in checks:
+            try:
+                value = data[name]
+            except KeyError:
+                raise ProtocolError(f"{where} is missing '{name}'.") from None
+            if not isinstance(value, kind) or (reject_bool and isinstance(value, bool)):
+                raise ProtocolError(
+                    f"{where} field '{name}' must be {kind_name}, "
+                    f"got {type(value).__name__}."
+                )
+            if check is not None:
+                error = check(value)
+                if error:
+                    raise ProtocolError(
+                        f"{where} field '{name}' {error} (got {value!r})."
+                    )
+            values.append(value)
+        return cls(*values)
+
+    return decode
+
+
+MESSAGE_SPECS = {}
+_MESSAGE_TYPES = {}  # namedtuple class -> message type
+
+
+def register_message(message_type, cls, fields=(), container=None):
+    """Adds (or replaces) a message type and compiles its decoder."""
+    fields = tuple(fields)
+    MESSAGE_SPECS[message_type] = MessageSpec(
+        cls, fields, container, _compile(message_type, cls, fields, container)
+    )
+    _MESSAGE_TYPES[cls] = message_type
+
+
+register_message("identify", Identify, [Field("client", str, _one_of("director"))])
+register_message("display_qr", DisplayQr)
+register_message("reset_conversation", ResetConversation)
+register_message("trigger_scene", TriggerScene, [Field("scene_name", str, _not_empty)])
+register_message(
+    "move_robotic_arm",
+    MoveRoboticArm,
+    [Field(name, int, _arm_position) for name in ("p1", "p2", "p3")],
+    container="params",
+)
+register_message(
+    "command_rejected", CommandRejected, [Field("command", str), Field("error", str)]
+)
+register_message(
+    "jog_arm",
+    JogArm,
+    [Field(name, int, _arm_position) for name in ("p1", "p2", "p3")]
+    + [Field("seq", int)],
+)
+register_message(
+    "arm_telemetry",
+    ArmTelemetry,
+    [
+        Field("seq", int),
+        Field("target", list),
+        Field("position", (list, type(None))),
+        Field("latency_ms", (int, float)),
+        Field("dropped", int),
+    ],
+)
+register_message("metrics_snapshot", MetricsSnapshot, [Field("metrics", dict)])
+register_message(
+    "profiler_control",
+    ProfilerControl,
+    [Field("action", str, _one_of("start", "stop", "status"))],
+)
+register_message(
+    "profiler_status",
+    ProfilerStatus,
+    [
+        Field("running", bool),
+        Field("samples", int),
+        Field("path", (str, type(None))),
+        Field("stalls", int),
+        Field("max_lag_ms", (int, float)),
+    ],
+)
+
+# Matches the leading {"type": "..."} that encode() and the web UI produce.
+_TYPE_PREFIX = re.compile(r'\s*\{\s*"type"\s*:\s*"([A-Za-z0-9_]+)"')
+
+
+# --- Encoding and decoding ---
+def peek_type(text):
+    """
+    Returns a message's type without decoding the rest of it, or None if the
+    text isn't a JSON object with a string "type".
+    """
+    match = _TYPE_PREFIX.match(text)
+    if match:
+        return match.group(1)
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    message_type = data.get("type") if isinstance(data, dict) else None
+    return message_type if isinstance(message_type, str) else None
+
+
+def decode(text):
+    """Parses and validates a control message; raises ProtocolError."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ProtocolError(f"Control message is not valid JSON: {e}") from None
+    if not isinstance(data, dict):
+        raise ProtocolError("Control message must be a JSON object.")
+    message_type = data.get("type")
+    spec = MESSAGE_SPECS.get(message_type)
+    if spec is None:
+        raise ProtocolError(f"Unknown control message type {message_type!r}.")
+    version = data.get("v", 1)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(
+            f"Unsupported protocol version {version!r} for '{message_type}' "
+            f"(expected {PROTOCOL_VERSION})."
+        )
+    return spec.decode(data)
+
+
+def encode(message):
+    """Serializes a message namedtuple, with "type" first so peek_type is fast."""
+    message_type = _MESSAGE_TYPES[type(message)]
+    spec = MESSAGE_SPECS[message_type]
+    data = {"type": message_type, "v": PROTOCOL_VERSION}
+    fields = message._asdict()
+    if spec.container:
+        data[spec.container] = fields
+    else:
+        data.update(fields)
+    return json.dumps(data)
+
+
+# --- Dispatch ---
+class Dispatcher:
+    """
+    Decodes control messages and calls the handler registered for their
+    namedtuple class. Keeps per-type counts and the total decode time.
+    """
+
+    def __init__(self, handlers=None):
+        self.handlers = dict(handlers or {})
+        self.stats = {}
+
+    def register(self, cls, handler):
+        self.handlers[cls] = handler
+
+    async def dispatch(self, text):
+        """
+        Handles one raw message. Returns None on success, the ProtocolError for
+        a message that was rejected, or the exception its handler raised; a
+        failing handler is logged and never stops the caller's receive loop.
+        """
+        started = time.perf_counter()
+        try:
+            message = decode(text)
+        except ProtocolError as e:
+            self._count(peek_type(text) or "_invalid", "rejected")
+            return e
+        message_type = _MESSAGE_TYPES[type(message)]
+        handler = self.handlers.get(type(message))
+        if handler is None:
+            self._count(message_type, "unhandled")
+            logging.warning(f"[CONTROL] No handler for '{message_type}'. Ignoring.")
+            return None
+        stats = self._count(message_type, "handled")
+        stats["decode_us"] = stats.get("decode_us", 0.0) + 1e6 * (
+            time.perf_counter() - started
+        )
+        try:
+            await handler(message)
+        except Exception as e:
+            self._count(message_type, "failed")
+            logging.exception(
+                f"[CONTROL] ERROR: Handler for '{message_type}' failed: {e}"
+            )
+            return e
+        return None
+
+    def _count(self, message_type, counter):
+        stats = self.stats.setdefault(message_type, {})
+        stats[counter] = stats.get(counter, 0) + 1
+        return stats
@@ -1,16 +1,63 @@
 import asyncio
 import logging
 import os
+import random
 import serial
 import time
 
+from . import metrics, tracing
+from .action_policy import ActionRunner, hardware_action
+from .control_protocol import VALID_POSITION_RANGE
+from .hardware_journal import HardwareJournal
+from .port_discovery import PortDiscovery
+
 
 # --- Constants for Hardware Validation ---
 VALID_SCENE_IDS = set(range(1, 16))
-VALID_POSITION_RANGE = range(0, 4096)
 VALID_VELOCITY_RANGE = range(0, 1024)
 VALID_ACCELERATION_RANGE = range(0, 255)
 
+# --- Constants for Connection Supervision ---
+PORT_WAIT_TIMEOUT = 10  # Seconds to wait for a port on the initial connect
+PORT_WATCH_INTERVAL = 0.5  # Seconds between hot-plug checks
+RECONNECT_BASE_DELAY = 0.5  # First reconnect backoff ceiling, in seconds
+RECONNECT_MAX_DELAY = 30.0  # Upper bound for the reconnect backoff, in seconds
+
+# Seconds to wait after a command before reading the response line.
+COMMAND_SETTLE_TIME = 0.1
+
+# Device name used for ADB commands in the hardware journal.
+ADB_DEVICE_NAME = "Tablet (ADB)"
+
+# --- Metrics ---
+SERIAL_ROUND_TRIP = metrics.histogram(
+    "aum_serial_round_trip_seconds",
+    "Time from writing a serial command to reading its response line.",
+    labelnames=("device",),
+)
+SERIAL_ERRORS = metrics.counter(
+    "aum_serial_errors_total", "Serial commands that failed.", labelnames=("device",)
+)
+SERIAL_MOCKED = metrics.counter(
+    "aum_serial_mocked_total",
+    "Commands mocked because the port was not available.",
+    labelnames=("device",),
+)
+SERIAL_CONNECTED = metrics.gauge(
+    "aum_serial_connected",
+    "1 while the serial port is connected.",
+    labelnames=("device",),
+)
+SERIAL_DISCONNECTS = metrics.counter(
+    "aum_serial_disconnects_total", "Serial connections lost.", labelnames=("device",)
+)
+
+
+def _backoff_delay(attempt):
+    """Returns a 'full jitter' exponential backoff delay for a reconnect attempt."""
+    ceiling = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * (2**attempt))
+    return random.uniform(0, ceiling)
+
 
 class SerialCommunicator:
     """A class to handle serial communication with a microcontroller."""
@@ -22,6 +69,32 @@ class SerialCommunicator:
         self.ser = None
         # The connection will now be established asynchronously.
 
+        # --- Connection supervision state ---
+        self.state = "disconnected"
+        # The last state-setting command (scene ID, arm pose). It is replayed
+        # after a reconnect so the device picks up where it left off.
+        self.replay_command = None
+        self.disconnect_count = 0
+        self.reconnect_count = 0
+        self.total_downtime = 0.0
+        self.last_error = None
+        self._down_since = None  # Set while an established connection is down
+        self._was_connected = False
+        self._port_lost = asyncio.Event()
+        self._supervisor_task = None
+        # Optional HardwareJournal shared by all devices (see HardwareManager).
+        self.journal = None
+        # The line read back after the most recent command (None if not sent).
+        self.last_response = None
+        # One command at a time per port: a write and its response line must
+        # not interleave with another sender (scene actions, jog, retries).
+        self._lock = asyncio.Lock()
+        self._port_call = None  # The latest blocking call on the port's thread
+        self._round_trip = SERIAL_ROUND_TRIP.labels(name)
+        self._errors = SERIAL_ERRORS.labels(name)
+        self._mocked = SERIAL_MOCKED.labels(name)
+        self._connected = SERIAL_CONNECTED.labels(name)
+
     async def _connect(self):
         """Waits for and establishes the serial connection asynchronously."""
         logging.info(
@@ -29,68 +102,240 @@ class SerialCommunicator:
         )
         start_time = time.time()
         while not os.path.exists(self.port):
-            if time.time() - start_time > 10:  # 10-second timeout
+            if time.time() - start_time > PORT_WAIT_TIMEOUT:
                 logging.error(
-                    f"[HARDWARE] ERROR: Timed out waiting for port '{self.port}'."
+                    f"[HARDWARE] ERROR: Timed out waiting for port '{self.port}'. "
+                    "Commands will be mocked until it appears."
                 )
                 return
-            await asyncio.sleep(0.5)
+            await asyncio.sleep(PORT_WATCH_INTERVAL)
+        await self._open()
+
+    async def _open(self):
+        """Opens the serial port and replays the last known state on a reconnect."""
+        self.state = "connecting"
         try:
             # Run the blocking serial.Serial call in a separate thread
             self.ser = await asyncio.to_thread(
                 serial.Serial, self.port, self.baudrate, timeout=1
             )
-            logging.info(
-                f"[HARDWARE] Successfully connected to {self.name} on port: {self.port}"
-            )
-        except serial.SerialException as e:
+        except (serial.SerialException, OSError) as e:
+            self.state = "disconnected"
+            self.last_error = str(e)
             logging.error(
                 f"[HARDWARE] ERROR: Could not open port for {self.name}: {e}. Commands will be mocked."
             )
+            return False
 
-    async def send_command(self, command: str):
-        """Sends a command to the serial port asynchronously."""
-        if self.ser and self.ser.is_open:
-            try:
-                full_command = command + "\n"
-                # Run the blocking write call in a separate thread
-                await asyncio.to_thread(self.ser.write, full_command.encode("utf-8"))
-                logging.info(
-                    f'[HARDWARE] ---> Sent to {self.name}: "{full_command.strip()}"'
-                )
+        self._port_lost.clear()
+        self.state = "connected"
+        self._connected.set(1)
+        if self._was_connected:
+            downtime = time.monotonic() - self._down_since
+            self.total_downtime += downtime
+            self._down_since = None
+            self.reconnect_count += 1
+            logging.info(
+                f"[HARDWARE] Reconnected to {self.name} on port: {self.port} after {downtime:.1f}s downtime."
+            )
+            await self._replay_state()
+        else:
+            logging.info(
+                f"[HARDWARE] Successfully connected to {self.name} on port: {self.port}"
+            )
+        self._was_connected = True
+        return True
+
+    async def _replay_state(self):
+        """Resends the last state-setting command after a reconnect."""
+        if self.replay_command is None:
+            return
+        logging.info(
+            f'[HARDWARE] Replaying last known state to {self.name}: "{self.replay_command}"'
+        )
+        await self.send_command(self.replay_command)
+
+    async def _mark_disconnected(self, reason):
+        """Drops the current port handle and wakes the supervisor."""
+        if self.state != "connected":
+            return
+        logging.warning(
+            f"[HARDWARE] Lost connection to {self.name} on port '{self.port}': {reason}"
+        )
+        self.state = "disconnected"
+        self._connected.set(0)
+        SERIAL_DISCONNECTS.labels(self.name).inc()
+        self.last_error = str(reason)
+        self.disconnect_count += 1
+        self._down_since = time.monotonic()
+        ser, self.ser = self.ser, None
+        self._port_lost.set()
+        try:
+            if ser:
+                await asyncio.to_thread(ser.close)
+        except (serial.SerialException, OSError):
+            pass
 
-                # Always read a line back to prevent the buffer from filling up and blocking.
-                # The serial port has a timeout, so this won't block forever.
-                await asyncio.sleep(0.1)
-                response = await asyncio.to_thread(self.ser.readline)
-                response_str = response.decode("utf-8").strip()
-                if response_str:
-                    logging.info(
-                        f'[HARDWARE] <--- Received from {self.name}: "{response_str}"'
+    def start_supervisor(self):
+        """Starts the background task that keeps the port connected."""
+        if self._supervisor_task is None or self._supervisor_task.done():
+            self._supervisor_task = asyncio.create_task(self._supervise())
+
+    async def _supervise(self):
+        """
+        Watches the port for hot-unplug and hot-plug events and reconnects with
+        jittered exponential backoff. All blocking calls run in threads, so the
+        event loop is never held up.
+        """
+        attempt = 0
+        while True:
+            if self.state == "connected":
+                # Wait until a send fails or the device node disappears.
+                try:
+                    await asyncio.wait_for(
+                        self._port_lost.wait(), timeout=PORT_WATCH_INTERVAL
                     )
+                except asyncio.TimeoutError:
+                    if not os.path.exists(self.port):
+                        await self._mark_disconnected("device node removed")
+                attempt = 0
+                continue
 
-                return f"Command '{command}' sent to {self.name}."
-            except serial.SerialException as e:
-                return f"[HARDWARE] ERROR: Failed to send command to {self.name}: {e}"
-        else:
+            if not os.path.exists(self.port):
+                # Device is unplugged; wait for it to come back.
+                await asyncio.sleep(PORT_WATCH_INTERVAL)
+                continue
+
+            await asyncio.sleep(_backoff_delay(attempt))
+            if not await self._open():
+                attempt += 1
+
+    def connection_stats(self):
+        """Returns the connection state and downtime metrics for this device."""
+        current_downtime = (
+            time.monotonic() - self._down_since if self._down_since is not None else 0.0
+        )
+        return {
+            "name": self.name,
+            "port": self.port,
+            "state": self.state,
+            "disconnects": self.disconnect_count,
+            "reconnects": self.reconnect_count,
+            "current_downtime_s": round(current_downtime, 3),
+            "total_downtime_s": round(self.total_downtime + current_downtime, 3),
+            "last_error": self.last_error,
+        }
+
+    async def send_command(
+        self, command: str, settle=COMMAND_SETTLE_TIME, discard_stale=False
+    ):
+        """
+        Sends a command to the serial port asynchronously. With `discard_stale`
+        unread input (e.g. old arm telemetry) is dropped first, so the line read
+        back is the freshest one.
+        """
+        with tracing.span("serial.send_command", device=self.name, command=command):
+            return await self._send_command(command, settle, discard_stale)
+
+    async def _send_command(self, command, settle, discard_stale):
+        await self._lock.acquire()
+        self._port_call = None
+        # Cleared under the lock, so a queued command can't wipe the response
+        # of the one still running.
+        self.last_response = None
+        try:
+            # The supervisor may drop self.ser while a call is in a thread.
+            ser = self.ser
+            if ser and ser.is_open:
+                return await self._exchange(ser, command, settle, discard_stale)
+        finally:
+            self._unlock()
+        self._mocked.inc()
+        logging.info(
+            f'[HARDWARE] MOCK_ACTION: Port for {self.name} not available. Mock command: "{command}"'
+        )
+        return f"Mock command '{command}' executed for {self.name}."
+
+    def _unlock(self):
+        call = self._port_call
+        if call is None or call.done():
+            self._lock.release()
+            return
+
+        # Cancelled (e.g. at an action deadline) while a thread still reads the
+        # port: keep it locked until that call returns, so the next command
+        # (often the retry) does not race it for the response line.
+        def release(call):
+            if not call.cancelled():
+                call.exception()  # Nobody awaits it any more.
+            self._lock.release()
+
+        call.add_done_callback(release)
+
+    async def _in_thread(self, func, *args):
+        """Runs a blocking port call in a thread; cancelling does not abandon it."""
+        self._port_call = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        return await asyncio.shield(self._port_call)
+
+    async def _exchange(self, ser, command, settle, discard_stale):
+        """Writes a command to `ser` and reads its response line."""
+        try:
+            if discard_stale:
+                await self._in_thread(ser.reset_input_buffer)
+            full_command = command + "\n"
+            if self.journal:
+                self.journal.record_command(self.name, full_command)
+            started = time.perf_counter()
+            # Run the blocking write call in a separate thread
+            await self._in_thread(ser.write, full_command.encode("utf-8"))
             logging.info(
-                f'[HARDWARE] MOCK_ACTION: Port for {self.name} not available. Mock command: "{command}"'
+                f'[HARDWARE] ---> Sent to {self.name}: "{full_command.strip()}"'
             )
-            return f"Mock command '{command}' executed for {self.name}."
+
+            # Always read a line back to prevent the buffer from filling up and blocking.
+            # The serial port has a timeout, so this won't block forever.
+            if settle:
+                await asyncio.sleep(settle)
+            response = await self._in_thread(ser.readline)
+            self._round_trip.observe(time.perf_counter() - started)
+            if self.journal:
+                self.journal.record_response(self.name, response)
+            response_str = response.decode("utf-8").strip()
+            self.last_response = response_str
+            if response_str:
+                logging.info(
+                    f'[HARDWARE] <--- Received from {self.name}: "{response_str}"'
+                )
+
+            return f"Command '{command}' sent to {self.name}."
+        except (serial.SerialException, OSError) as e:
+            self._errors.inc()
+            if ser is self.ser:
+                await self._mark_disconnected(e)
+            return f"[HARDWARE] ERROR: Failed to send command to {self.name}: {e}"
 
     async def close(self):
-        if self.ser and self.ser.is_open:
-            await asyncio.to_thread(self.ser.close)
+        if self._supervisor_task:
+            self._supervisor_task.cancel()
+            self._supervisor_task = None
+        ser = self.ser
+        if ser and ser.is_open:
+            await asyncio.to_thread(ser.close)
             logging.info(f"[HARDWARE] Serial connection for {self.name} closed.")
 
 
 class HardwareManager:
     """A centralized class to manage all hardware controllers and tool functions."""
 
-    def __init__(self):
+    def __init__(self, main_port=None, arm_port=None, journal=True):
+        # journal=False ignores AUM_HARDWARE_JOURNAL (e.g. while replaying one).
         env = os.getenv("AUM_ENVIRONMENT", "prod")  # Default to production
+        explicit_ports = bool(main_port and arm_port)
 
-        if env == "dev":
+        if explicit_ports:
+            # Explicit ports, e.g. from an in-process EmulatedKiosk.
+            logging.info("[HARDWARE] Connecting to the given ports.")
+        elif env == "dev":
             logging.info(
                 "[HARDWARE] Running in DEV mode. Connecting to EMULATOR ports."
             )
@@ -105,10 +350,23 @@ class HardwareManager:
             main_port = os.getenv("MAIN_CONTROLLER_PORT")
             arm_port = os.getenv("ROBOTIC_ARM_PORT")
 
+        # Real boards can be found by their USB IDs when the configured port is
+        # missing or stale after a re-enumeration.
+        self.port_discovery_enabled = (
+            env != "dev"
+            and not explicit_ports
+            and os.getenv("AUM_PORT_DISCOVERY", "on") != "off"
+        )
+
         if not main_port or not arm_port:
-            logging.error(
-                "[HARDWARE] ERROR: Serial ports not defined in environment. Halting."
-            )
+            if self.port_discovery_enabled:
+                logging.warning(
+                    "[HARDWARE] Serial ports not defined in environment. Using USB discovery."
+                )
+            else:
+                logging.error(
+                    "[HARDWARE] ERROR: Serial ports not defined in environment. Halting."
+                )
             main_port = main_port or "./mock_main_port"
             arm_port = arm_port or "./mock_arm_port"
 
@@ -118,13 +376,62 @@ class HardwareManager:
         self.robotic_arm_controller = SerialCommunicator(
             port=arm_port, baudrate=57600, name="Robotic Arm Controller"
         )
+        # Deadlines, retries and per-device circuit breakers for every action.
+        self.action_runner = ActionRunner()
+
+        # Optional binary journal of every command and response, for replay.
+        self.journal = None
+        journal_path = os.getenv("AUM_HARDWARE_JOURNAL") if journal else None
+        if journal_path:
+            try:
+                self.journal = HardwareJournal(journal_path)
+            except OSError as e:
+                logging.error(f"[HARDWARE] ERROR: Could not open hardware journal: {e}")
+        self.main_scene_controller.journal = self.journal
+        self.robotic_arm_controller.journal = self.journal
+
+    async def _discover_ports(self):
+        """Replaces missing or stale ports with ones found by USB discovery."""
+        controllers = {
+            "main_scene": self.main_scene_controller,
+            "robotic_arm": self.robotic_arm_controller,
+        }
+        discovery = PortDiscovery()
+        # A re-enumeration can swap the boards' nodes while both paths stay
+        # valid, so an existing path must also be the right board.
+        stale = [
+            key
+            for key, controller in controllers.items()
+            if not await discovery.verify(key, controller.port)
+        ]
+        if not stale:
+            return
+        resolved = await discovery.discover(stale)
+        for key, device in resolved.items():
+            if device:
+                controllers[key].port = device
 
     async def connect_all(self):
-        """Connects to all serial devices concurrently."""
+        """Connects to all serial devices concurrently and keeps them connected."""
+        if self.port_discovery_enabled:
+            await self._discover_ports()
         await asyncio.gather(
             self.main_scene_controller._connect(),
             self.robotic_arm_controller._connect(),
         )
+        self.main_scene_controller.start_supervisor()
+        self.robotic_arm_controller.start_supervisor()
+
+    def action_stats(self):
+        """Returns action outcomes, latencies and circuit state per device."""
+        return self.action_runner.summary()
+
+    def connection_status(self):
+        """Returns the connection state and downtime metrics for every device."""
+        return {
+            "main_scene": self.main_scene_controller.connection_stats(),
+            "robotic_arm": self.robotic_arm_controller.connection_stats(),
+        }
 
     def _validate_params(
         self,
@@ -152,14 +459,18 @@ class HardwareManager:
             )
         return None
 
+    @hardware_action
     async def trigger_diorama_scene(self, scene_command_id: int):
         """Triggers a scene on the diorama after validating the ID."""
         error = self._validate_params(scene_command_id=scene_command_id)
         if error:
             logging.error(error)
             return error
-        return await self.main_scene_controller.send_command(str(scene_command_id))
+        command = str(scene_command_id)
+        self.main_scene_controller.replay_command = command
+        return await self.main_scene_controller.send_command(command)
 
+    @hardware_action
     async def move_robotic_arm(
         self,
         p1: int,
@@ -176,14 +487,36 @@ class HardwareManager:
             logging.error(error)
             return error
         command = f"3 {velocity} {velocity} {velocity} {acceleration} {acceleration} {acceleration} {p1} {p2} {p3}"
+        self.robotic_arm_controller.replay_command = command
         return await self.robotic_arm_controller.send_command(command)
 
+    async def jog_robotic_arm(self, p1: int, p2: int, p3: int):
+        """
+        Streams a position to the arm for jog mode (see src/arm_jog.py). Uses
+        "Move Position" with the current profile and, unlike move_robotic_arm,
+        bypasses the action runner: a newer target replaces a failed one, so
+        retries and long deadlines would only add lag.
+        """
+        error = self._validate_params(p1=p1, p2=p2, p3=p3)
+        if error:
+            logging.error(error)
+            return error
+        command = f"4 {p1} {p2} {p3}"
+        self.robotic_arm_controller.replay_command = command
+        return await self.robotic_arm_controller.send_command(
+            command, settle=0, discard_stale=True
+        )
+
+    @hardware_action
     async def play_video(self, video_file: str):
         """Plays a video file on the connected Android tablet using ADB."""
         # This command starts the default video player for a file in the Camera directory
         command = f"adb shell am start -a android.intent.action.VIEW -d file:///sdcard/DCIM/Camera/{video_file} -t video/*"
         logging.info(f"[HARDWARE] ---> Executing ADB command: {command}")
+        if self.journal:
+            self.journal.record_command(ADB_DEVICE_NAME, command)
 
+        proc = None
         try:
             proc = await asyncio.create_subprocess_shell(
                 command,
@@ -191,7 +524,18 @@ class HardwareManager:
                 stderr=asyncio.subprocess.PIPE,
             )
 
-            stdout, stderr = await proc.communicate()
+            try:
+                stdout, stderr = await proc.communicate()
+            except asyncio.CancelledError:
+                # The action deadline expired; don't leave a wedged adb behind.
+                if proc.returncode is None:
+                    proc.kill()
+                raise
+
+            if self.journal:
+                self.journal.record_response(
+                    ADB_DEVICE_NAME, f"{proc.returncode} {stdout.decode().strip()}"
+                )
 
             if proc.returncode == 0:
                 logging.info(
@@ -221,3 +565,5 @@ class HardwareManager:
         await asyncio.gather(
             self.main_scene_controller.close(), self.robotic_arm_controller.close()
         )
+        if self.journal:
+            self.journal.close()
@@ -1,113 +1,624 @@
+import argparse
 import asyncio
+import json
 import logging
+import math
 import os
+import random
 import serial
 import sys
+import time
+import tty
 from dotenv import load_dotenv
 
 # Load environment variables to get the port names
 load_dotenv()
 
+# --- Emulator Profiles ---
+# latency/jitter: seconds added before each response (jitter is +/-).
+# drop: probability that a command gets no response at all.
+# garbage: probability that a corrupted line is sent before a response.
+# faults: scheduled faults, e.g. {"type": "stall", "after": 60, "duration": 5}.
+# Override per device with a JSON file named by AUM_EMULATOR_PROFILE, e.g.
+# {"arm": {"latency": 0.03, "jitter": 0.01}, "scene": {"drop": 0.05}}.
+DEFAULT_PROFILES = {
+    "arm": {"latency": 0.02, "jitter": 0.005, "drop": 0.0, "garbage": 0.0},
+    "scene": {"latency": 0.01, "jitter": 0.005, "drop": 0.0, "garbage": 0.0},
+}
+FAULT_TYPES = ("stall", "garbage", "disconnect")
+STATS_INTERVAL = 30  # Seconds between emulator statistics log lines
 
-class RoboticArmEmulator:
+# --- Arm Kinematics ---
+# Velocity and acceleration arrive in Dynamixel X-series profile units, which
+# the OpenCR firmware writes straight to the servos' profile registers.
+ARM_TICK = 0.01  # Seconds between simulation steps (the firmware's 10ms loop)
+TICKS_PER_REV = 4096
+VELOCITY_UNIT_RPM = 0.229  # One velocity unit in rev/min
+ACCELERATION_UNIT_RPM2 = 214.577  # One acceleration unit in rev/min^2
+MAX_VELOCITY = 1023  # A velocity of 0 means "unlimited"; simulated as the maximum
+DEFAULT_VELOCITY = 50
+DEFAULT_ACCELERATION = 5
+
+
+def velocity_to_ticks(value):
+    """Converts a profile velocity to position ticks per second."""
+    return (value or MAX_VELOCITY) * VELOCITY_UNIT_RPM * TICKS_PER_REV / 60
+
+
+def acceleration_to_ticks(value):
+    """Converts a profile acceleration to ticks/s^2 (0 means a step change in speed)."""
+    if not value:
+        return math.inf
+    return value * ACCELERATION_UNIT_RPM2 * TICKS_PER_REV / 3600
+
+
+def load_profiles(path=None):
+    """Returns the device profiles, merged with the JSON file from AUM_EMULATOR_PROFILE."""
+    profiles = {name: dict(profile) for name, profile in DEFAULT_PROFILES.items()}
+    path = path or os.getenv("AUM_EMULATOR_PROFILE")
+    if not path:
+        return profiles
+    try:
+        with open(path, "r") as f:
+            overrides = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.error(f"[EMULATOR] ERROR: Could not load profile '{path}': {e}")
+        return profiles
+    for name, override in overrides.items():
+        profiles.setdefault(name, {}).update(override)
+    return profiles
+
+
+class VirtualSerialPair:
+    """
+    An in-process pty pair that replaces a socat link. The emulator owns the
+    master fd; the host opens `path` (or the optional `link` symlink to it)
+    exactly like a real serial port.
+
+    The pair is created once and kept until close(), so `path` never changes:
+    an injected disconnect only unplugs the link, and a host that opened the
+    raw pty path sees the same device again once it is plugged back in.
+    """
+
+    def __init__(self, link=None):
+        self.link = link
+        self.master_fd = None
+        self.slave_fd = None
+        self.path = None
+
+    def open(self):
+        if self.master_fd is None:
+            self.master_fd, self.slave_fd = os.openpty()
+            # Raw mode before the host opens it, so nothing is echoed back to us.
+            tty.setraw(self.slave_fd)
+            os.set_blocking(self.master_fd, False)
+            self.path = os.ttyname(self.slave_fd)
+        if self.link:
+            tmp_link = f"{self.link}.tmp"
+            if os.path.lexists(tmp_link):
+                os.remove(tmp_link)
+            os.symlink(self.path, tmp_link)
+            os.replace(tmp_link, self.link)
+        return self.master_fd
+
+    @property
+    def host_path(self):
+        """The path the host should open: the stable link if there is one."""
+        return self.link or self.path
+
+    def unplug(self):
+        """Removes the link, which a host watching it sees as an unplug; the pty stays."""
+        if self.link and os.path.lexists(self.link):
+            os.remove(self.link)
+
+    def discard_input(self):
+        """Drops whatever the host wrote while the device was unplugged."""
+        while True:
+            try:
+                if not os.read(self.master_fd, 4096):
+                    return
+            except (BlockingIOError, OSError):
+                return
+
+    def close(self):
+        self.unplug()
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is not None:
+                os.close(fd)
+        self.master_fd = None
+        self.slave_fd = None
+
+
+class EmulatedDevice:
+    """
+    An emulated serial device driven by the event loop.
+    Incoming bytes are read only when the port's fd becomes readable; responses
+    are scheduled with the profile's latency, jitter, drops and faults.
+    """
+
+    tag = "EMU"
+
+    def __init__(self, port_name, baudrate, profile=None):
+        # port_name is a path opened with pyserial (socat mode) or a
+        # VirtualSerialPair owned by the emulator.
+        self.port_name = port_name
+        self.baudrate = baudrate
+        self.profile = dict(profile or {})
+        self.ser = None
+        self.fd = None
+        self._loop = None
+        self._buffer = bytearray()
+        self._stalled_until = 0.0
+        self._pending_garbage = 0
+        self._timers = set()
+        self.commands_handled = 0
+        self.responses_sent = 0
+        self.responses_dropped = 0
+        self.garbage_sent = 0
+        self.bytes_dropped = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._open()
+
+    # --- Port handling ---
+    def _open(self):
+        if isinstance(self.port_name, VirtualSerialPair):
+            self.fd = self.port_name.open()
+            where = self.port_name.host_path
+        else:
+            self.ser = serial.Serial(self.port_name, self.baudrate, timeout=0)
+            self.fd = self.ser.fileno()
+            os.set_blocking(self.fd, False)
+            where = self.port_name
+        logging.info(f"[{self.tag}] Listening on {where}")
+        sys.stdout.flush()
+
+    def _close_port(self):
+        if self._loop and self.fd is not None:
+            self._loop.remove_reader(self.fd)
+        if isinstance(self.port_name, VirtualSerialPair):
+            self.port_name.close()
+        elif self.ser:
+            self.ser.close()
+        self.ser = None
+        self.fd = None
+
+    def start(self):
+        """Registers the port with the running event loop and arms scheduled faults."""
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self.fd, self._on_readable)
+        for fault in self.profile.get("faults", []):
+            fault = dict(fault)
+            self._call_later(
+                fault.pop("after", 0),
+                lambda fault=fault: self.inject_fault(fault.pop("type"), **fault),
+            )
+
+    def _call_later(self, delay, callback, *args):
+        def run():
+            self._timers.discard(handle)
+            callback(*args)
+
+        handle = self._loop.call_later(delay, run)
+        self._timers.add(handle)
+        return handle
+
+    def _on_readable(self):
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logging.error(f"[{self.tag}] ERROR: Could not read from port: {e}")
+            self._close_port()
+            return
+        received_at = time.monotonic()
+        self._buffer += data
+        while b"\n" in self._buffer:
+            line, _, rest = bytes(self._buffer).partition(b"\n")
+            self._buffer = bytearray(rest)
+            line = line.decode("utf-8", "replace").strip()
+            if line:
+                self._on_command(line, received_at)
+
+    def write(self, data):
+        """Writes without blocking; like a real USB CDC device, data is lost if the host isn't reading."""
+        if self.fd is None:
+            return False
+        try:
+            os.write(self.fd, data)
+            return True
+        except BlockingIOError:
+            self.bytes_dropped += len(data)
+        except OSError as e:
+            logging.error(f"[{self.tag}] ERROR: Could not write to port: {e}")
+        return False
+
+    # --- Command handling ---
+    def handle_command(self, line):
+        """Updates device state for a command and returns the response lines (bytes)."""
+        raise NotImplementedError
+
+    def _on_command(self, line, received_at):
+        logging.info(f'[{self.tag}] <--- Received command: "{line}"')
+        sys.stdout.flush()
+        try:
+            responses = self.handle_command(line)
+        except (ValueError, IndexError) as e:
+            logging.error(f"[{self.tag}] ERROR: Could not process command: {e}")
+            return
+        self.commands_handled += 1
+
+        if random.random() < self.profile.get("drop", 0.0):
+            self.responses_dropped += 1
+            logging.info(f'[{self.tag}] Dropping response to "{line}" (profile).')
+            return
+        if random.random() < self.profile.get("garbage", 0.0):
+            self._pending_garbage += 1
+
+        latency = self.profile.get("latency", 0.0)
+        jitter = self.profile.get("jitter", 0.0)
+        delay = max(0.0, latency + random.uniform(-jitter, jitter))
+        self._call_later(delay, self._respond, responses, received_at)
+
+    def _respond(self, responses, received_at):
+        now = time.monotonic()
+        if now < self._stalled_until:
+            # Stalled: hold the response until the stall ends.
+            self._call_later(
+                self._stalled_until - now, self._respond, responses, received_at
+            )
+            return
+        while self._pending_garbage:
+            self._pending_garbage -= 1
+            self._send_garbage()
+        for response in responses:
+            self.write(response)
+        self.responses_sent += 1
+        latency = time.monotonic() - received_at
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def _send_garbage(self):
+        garbage = bytes(random.randrange(256) for _ in range(random.randint(4, 24)))
+        self.write(garbage.replace(b"\n", b"?") + b"\n")
+        self.garbage_sent += 1
+
+    # --- Fault injection ---
+    def inject_fault(self, kind, duration=1.0, count=1):
+        """
+        Injects a fault: 'stall' holds all responses for `duration` seconds,
+        'garbage' sends `count` corrupted lines, 'disconnect' closes the port
+        for `duration` seconds and then reopens it. On a VirtualSerialPair the
+        disconnect removes the link instead and keeps the pty's path.
+        """
+        if kind not in FAULT_TYPES:
+            raise ValueError(f"Unknown fault type '{kind}'.")
+        logging.warning(f"[{self.tag}] Injecting fault: {kind}")
+        if kind == "stall":
+            self._stalled_until = max(self._stalled_until, time.monotonic() + duration)
+        elif kind == "garbage":
+            for _ in range(count):
+                self._send_garbage()
+        elif kind == "disconnect":
+            if isinstance(self.port_name, VirtualSerialPair):
+                # Keep the pty so its path survives; only the link goes away.
+                self._loop.remove_reader(self.fd)
+                self.port_name.unplug()
+                self.fd = None
+            else:
+                self._close_port()
+            self._call_later(duration, self._reconnect)
+
+    def _reconnect(self):
+        try:
+            self._open()
+            if isinstance(self.port_name, VirtualSerialPair):
+                self.port_name.discard_input()
+            self._loop.add_reader(self.fd, self._on_readable)
+            logging.info(f"[{self.tag}] Reconnected after injected disconnect.")
+        except (serial.SerialException, OSError) as e:
+            logging.error(f"[{self.tag}] ERROR: Could not reopen port: {e}")
+
+    def stats(self):
+        """Returns command counters and response latency for this device."""
+        return {
+            "commands_handled": self.commands_handled,
+            "responses_sent": self.responses_sent,
+            "responses_dropped": self.responses_dropped,
+            "garbage_sent": self.garbage_sent,
+            "bytes_dropped": self.bytes_dropped,
+            "mean_latency_ms": round(1000 * self.total_latency / self.responses_sent, 2)
+            if self.responses_sent
+            else 0.0,
+            "max_latency_ms": round(1000 * self.max_latency, 2),
+        }
+
+    def close(self):
+        for handle in list(self._timers):
+            handle.cancel()
+        self._timers.clear()
+        self._close_port()
+
+
+class JointMotion:
+    """
+    A trapezoidal velocity profile for one joint: accelerate to the profile
+    velocity, cruise, decelerate onto the target. Short moves that never reach
+    the profile velocity become triangular.
+    """
+
+    def __init__(self, start, target, velocity, acceleration):
+        self.start = start
+        self.target = target
+        self.distance = abs(target - start)
+        self.direction = 1 if target >= start else -1
+        max_velocity = velocity_to_ticks(velocity)
+        self.acceleration = acceleration_to_ticks(acceleration)
+
+        if self.distance == 0:
+            self.peak_velocity = 0.0
+            self.t_accel = 0.0
+        elif math.isinf(self.acceleration):
+            self.peak_velocity = max_velocity
+            self.t_accel = 0.0
+        else:
+            self.t_accel = max_velocity / self.acceleration
+            self.peak_velocity = max_velocity
+            if self.acceleration * self.t_accel**2 > self.distance:
+                self.t_accel = math.sqrt(self.distance / self.acceleration)
+                self.peak_velocity = self.acceleration * self.t_accel
+        ramp_distance = self.peak_velocity * self.t_accel
+        self.t_cruise = (
+            max(0.0, (self.distance - ramp_distance) / self.peak_velocity)
+            if self.peak_velocity
+            else 0.0
+        )
+        self.duration = 2 * self.t_accel + self.t_cruise
+
+    def position_at(self, t):
+        """Returns the joint position `t` seconds after the move started."""
+        if t >= self.duration:
+            return float(self.target)
+        if t < self.t_accel:
+            travelled = 0.5 * self.acceleration * t * t
+        elif t < self.t_accel + self.t_cruise:
+            travelled = 0.5 * self.peak_velocity * self.t_accel + self.peak_velocity * (
+                t - self.t_accel
+            )
+        else:
+            remaining = self.duration - t
+            travelled = self.distance - 0.5 * self.acceleration * remaining**2
+        return self.start + self.direction * travelled
+
+
+class RoboticArmEmulator(EmulatedDevice):
     """Simulates the Robotic Arm Controller (OpenCR board)."""
 
-    def __init__(self):
+    tag = "ARM_EMU"
+
+    def __init__(self, port_name=None, profile=None):
         # Initial position, mimicking the real device's startup
         self.position = [2048, 0, 3960]
-        self.port_name = os.getenv(
+        # Command 4 has no profile of its own and reuses the last one.
+        self.velocities = [DEFAULT_VELOCITY] * 3
+        self.accelerations = [DEFAULT_ACCELERATION] * 3
+        self._joints = None
+        self._move_started = 0.0
+        self._move_duration = 0.0
+        self._tick_handle = None
+        self.moves_completed = 0
+        self.moves_preempted = 0
+        self.total_move_time = 0.0
+        self.last_move_time = 0.0
+        port_name = port_name or os.getenv(
             "ROBOTIC_ARM_PORT_EMULATOR", "./robotic_arm_emu_port"
         )
-        if not self.port_name:
+        if not port_name:
             raise ValueError("ROBOTIC_ARM_PORT_EMULATOR not set in .env file")
-        self.ser = serial.Serial(self.port_name, 57600, timeout=0.1)
-        logging.info(f"[ARM_EMU] Listening on {self.port_name}")
-        sys.stdout.flush()
+        super().__init__(port_name, 57600, profile or load_profiles()["arm"])
 
-    async def listen_for_commands(self):
-        """Waits for commands and updates the arm's state."""
-        while True:
-            try:
-                if self.ser.in_waiting > 0:
-                    line = self.ser.readline()
-                    if line:
-                        line = line.decode("utf-8").strip()
-                        logging.info(f'[ARM_EMU] <--- Received command: "{line}"')
-                        sys.stdout.flush()
-                        parts = line.split()
-                        command_id = int(parts[0])
-                        if command_id == 3:  # Move Full
-                            self.position = [int(p) for p in parts[7:10]]
-                        elif command_id == 4:  # Move Position
-                            self.position = [int(p) for p in parts[1:4]]
-
-                        # Send a confirmation/position update immediately after command
-                        pos_str = f"angle:{self.position[0]}|{self.position[1]}|{self.position[2]}\n"
-                        self.ser.write(pos_str.encode("utf-8"))
-                        self.ser.write(b"ok\n")
-
-                        logging.info(
-                            f"[ARM_EMU] ---> State updated. New position: {self.position}"
-                        )
-                        sys.stdout.flush()
-            except Exception as e:
-                logging.error(f"[ARM_EMU] ERROR: Could not process command: {e}")
-                sys.stdout.flush()
-            await asyncio.sleep(0.05)
+    def _position_line(self):
+        return (
+            f"angle:{self.position[0]}|{self.position[1]}|{self.position[2]}\n".encode(
+                "utf-8"
+            )
+        )
+
+    @staticmethod
+    def _three_ints(values):
+        if len(values) != 3:
+            raise ValueError(f"Expected 3 values, got {len(values)}.")
+        return [int(value) for value in values]
+
+    def handle_command(self, line):
+        parts = line.split()
+        command_id = int(parts[0])
+        if command_id == 3:  # Move Full
+            self.velocities = self._three_ints(parts[1:4])
+            self.accelerations = self._three_ints(parts[4:7])
+            self._start_move(self._three_ints(parts[7:10]))
+        elif command_id == 4:  # Move Position
+            self._start_move(self._three_ints(parts[1:4]))
+        # Acknowledge with the position the move starts from, like the firmware.
+        return [self._position_line(), b"ok\n"]
+
+    # --- Motion simulation ---
+    @property
+    def moving(self):
+        return self._joints is not None
+
+    def _start_move(self, target):
+        if self._loop is None:
+            # Not attached to an event loop (e.g. driven directly): jump.
+            self.position = list(target)
+            return
+        now = time.monotonic()
+        if self.moving:
+            self._step(now)
+            self.moves_preempted += 1
+        self._joints = [
+            JointMotion(start, end, velocity, acceleration)
+            for start, end, velocity, acceleration in zip(
+                self.position, target, self.velocities, self.accelerations
+            )
+        ]
+        self._move_started = now
+        self._move_duration = max(joint.duration for joint in self._joints)
+        logging.info(
+            f"[{self.tag}] ---> Moving to {target} "
+            f"({self._move_duration * 1000:.0f} ms profile)."
+        )
+        if self._tick_handle is None:
+            self._tick_handle = self._call_later(ARM_TICK, self._tick)
+
+    def _step(self, now):
+        elapsed = now - self._move_started
+        self.position = [round(joint.position_at(elapsed)) for joint in self._joints]
+        return elapsed
+
+    def _tick(self):
+        self._tick_handle = None
+        if not self.moving:
+            return
+        elapsed = self._step(time.monotonic())
+        remaining = self._move_duration - elapsed
+        if remaining <= 0:
+            self._finish_move()
+            return
+        # Land the last step exactly on the end of the profile.
+        self._tick_handle = self._call_later(min(ARM_TICK, remaining), self._tick)
+
+    def _finish_move(self):
+        self._joints = None
+        self.last_move_time = time.monotonic() - self._move_started
+        self.moves_completed += 1
+        self.total_move_time += self.last_move_time
+        logging.info(
+            f"[{self.tag}] ---> Move complete at {self.position} "
+            f"after {self.last_move_time * 1000:.0f} ms."
+        )
+        self.write(self._position_line())
+        self.write(b"done\n")
+
+    def stats(self):
+        """Adds move counters and durations to the device statistics."""
+        return {
+            **super().stats(),
+            "moves_completed": self.moves_completed,
+            "moves_preempted": self.moves_preempted,
+            "mean_move_ms": round(1000 * self.total_move_time / self.moves_completed, 2)
+            if self.moves_completed
+            else 0.0,
+            "last_move_ms": round(1000 * self.last_move_time, 2),
+        }
+
+    def close(self):
+        self._joints = None
+        self._tick_handle = None
+        super().close()
 
     async def send_position_updates(self):
         """Continuously sends position feedback, like the real device."""
         while True:
-            try:
-                pos_str = (
-                    f"angle:{self.position[0]}|{self.position[1]}|{self.position[2]}\n"
-                )
-                self.ser.write(pos_str.encode("utf-8"))
-            except Exception as e:
-                logging.error(f"[ARM_EMU] ERROR: Could not send position update: {e}")
-                sys.stdout.flush()
+            self.write(self._position_line())
             await asyncio.sleep(0.01)  # 10ms interval from original code
 
-    def close(self):
-        self.ser.close()
-
 
-class MainSceneEmulator:
+class MainSceneEmulator(EmulatedDevice):
     """Simulates the Main Scene Controller (Arduino Mega)."""
 
-    def __init__(self):
-        self.port_name = os.getenv(
+    tag = "SCENE_EMU"
+
+    def __init__(self, port_name=None, profile=None):
+        port_name = port_name or os.getenv(
             "MAIN_CONTROLLER_PORT_EMULATOR", "./main_controller_emu_port"
         )
-        if not self.port_name:
+        if not port_name:
             raise ValueError("MAIN_CONTROLLER_PORT_EMULATOR not set in .env file")
-        self.ser = serial.Serial(self.port_name, 9600, timeout=0.1)
-        logging.info(f"[SCENE_EMU] Listening on {self.port_name}")
-        sys.stdout.flush()
+        super().__init__(port_name, 9600, profile or load_profiles()["scene"])
 
-    async def listen_for_commands(self):
-        """Waits for commands and prints them."""
-        while True:
-            try:
-                if self.ser.in_waiting > 0:
-                    line = self.ser.readline()
-                    if line:
-                        line = line.decode("utf-8").strip()
-                        logging.info(f'[SCENE_EMU] <--- Received command: "{line}"')
-                        # Send a simple "OK" confirmation
-                        self.ser.write(b"OK\n")
-                        sys.stdout.flush()
-            except Exception as e:
-                logging.error(f"[SCENE_EMU] ERROR: Could not process command: {e}")
-                sys.stdout.flush()
-            await asyncio.sleep(0.05)
+    def handle_command(self, line):
+        # Send a simple "OK" confirmation
+        return [b"OK\n"]
+
+
+class EmulatedKiosk:
+    """
+    A full set of emulated boards on in-process pty pairs, so tests and load
+    runs can start many independent kiosks without socat.
+    """
+
+    def __init__(self, profiles=None, main_link=None, arm_link=None):
+        profiles = profiles or load_profiles()
+        self.scene = MainSceneEmulator(
+            VirtualSerialPair(main_link), profile=profiles["scene"]
+        )
+        self.arm = RoboticArmEmulator(
+            VirtualSerialPair(arm_link), profile=profiles["arm"]
+        )
+        self._telemetry_task = None
+        self._started_at = None
+
+    @property
+    def ports(self):
+        """The host-side port paths, keyed like HardwareManager's arguments."""
+        return {
+            "main_port": self.scene.port_name.host_path,
+            "arm_port": self.arm.port_name.host_path,
+        }
+
+    def start(self):
+        self.scene.start()
+        self.arm.start()
+        self._telemetry_task = asyncio.create_task(self.arm.send_position_updates())
+        self._started_at = time.monotonic()
+
+    def stats(self):
+        """Returns each device's counters plus its command throughput."""
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            device.tag: {
+                **device.stats(),
+                "commands_per_s": round(device.commands_handled / elapsed, 2),
+            }
+            for device in (self.scene, self.arm)
+        }
 
     def close(self):
-        self.ser.close()
+        if self._telemetry_task:
+            self._telemetry_task.cancel()
+        self.scene.close()
+        self.arm.close()
 
 
-async def main():
-    """Runs both emulators concurrently."""
+async def start_kiosks(count, profiles=None):
+    """Starts `count` independent emulated kiosks and logs how long startup took."""
+    started = time.perf_counter()
+    kiosks = [EmulatedKiosk(profiles) for _ in range(count)]
+    for kiosk in kiosks:
+        kiosk.start()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logging.info(
+        f"[EMULATOR] Started {count} emulated kiosk(s) in {elapsed_ms:.1f} ms "
+        f"({elapsed_ms / max(count, 1):.2f} ms each)."
+    )
+    return kiosks
+
+
+async def log_stats(emulators):
+    """Periodically logs the counters of every emulated device."""
+    while True:
+        await asyncio.sleep(STATS_INTERVAL)
+        for emulator in emulators:
+            logging.info(f"[{emulator.tag}] Stats: {emulator.stats()}")
+
+
+async def main(virtual=False):
+    """
+    Runs both emulators concurrently. With virtual=True the emulator creates its
+    own pty pairs and links them at the *_PORT_EMULATOR paths the director opens.
+    """
     logging.info("--- Hardware Emulator ---")
     logging.info("Simulating physical Arduino and OpenCR boards.")
     logging.info("Press Ctrl+C to exit.")
@@ -116,27 +627,51 @@ async def main():
     arm_emulator = None
     scene_emulator = None
     try:
-        arm_emulator = RoboticArmEmulator()
-        scene_emulator = MainSceneEmulator()
+        profiles = load_profiles()
+        arm_port = None
+        scene_port = None
+        if virtual:
+            arm_port = VirtualSerialPair(
+                os.getenv("ROBOTIC_ARM_PORT_EMULATOR", "./robotic_arm_emu_port")
+            )
+            scene_port = VirtualSerialPair(
+                os.getenv("MAIN_CONTROLLER_PORT_EMULATOR", "./main_controller_emu_port")
+            )
+        arm_emulator = RoboticArmEmulator(arm_port, profile=profiles["arm"])
+        scene_emulator = MainSceneEmulator(scene_port, profile=profiles["scene"])
+        arm_emulator.start()
+        scene_emulator.start()
 
         await asyncio.gather(
-            arm_emulator.listen_for_commands(),
             arm_emulator.send_position_updates(),
-            scene_emulator.listen_for_commands(),
+            log_stats([arm_emulator, scene_emulator]),
         )
     except serial.SerialException as e:
         logging.error(f"[EMULATOR] CRITICAL_ERROR: {e}")
-        logging.error("[EMULATOR] Is 'socat' running correctly? Check Procfile.dev.")
+        logging.error(
+            "[EMULATOR] Without --virtual the ports must already exist (e.g. via socat)."
+        )
         sys.stdout.flush()
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
         logging.info("\n--- Shutting down hardware emulator ---")
         sys.stdout.flush()
     finally:
         if arm_emulator:
+            logging.info(f"[{arm_emulator.tag}] Final stats: {arm_emulator.stats()}")
             arm_emulator.close()
         if scene_emulator:
+            logging.info(
+                f"[{scene_emulator.tag}] Final stats: {scene_emulator.stats()}"
+            )
             scene_emulator.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Emulate the diorama hardware.")
+    parser.add_argument(
+        "--virtual",
+        action="store_true",
+        help="Create in-process pty pairs instead of opening socat ports.",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(virtual=args.virtual))
@@ -0,0 +1,149 @@
+import collections
+import logging
+import os
+import struct
+import time
+
+# --- Journal Format ---
+# File header: magic, format version, wall-clock start time (unix seconds).
+# Each record: nanoseconds since the journal started (monotonic clock),
+# device id, record kind, payload length, then the payload bytes.
+# Device ids are declared in-band by KIND_DEVICE records so a journal is
+# self-describing.
+MAGIC = b"AUMJ"
+VERSION = 1
+HEADER = struct.Struct("<4sBd")
+RECORD = struct.Struct("<QBBH")
+
+KIND_COMMAND = 0
+KIND_RESPONSE = 1
+KIND_DEVICE = 2
+KIND_NAMES = {KIND_COMMAND: "command", KIND_RESPONSE: "response"}
+
+FLUSH_INTERVAL = 1.0  # Seconds between flushes to disk
+MAX_PAYLOAD = 0xFFFF
+
+JournalRecord = collections.namedtuple(
+    "JournalRecord", ["timestamp", "device", "kind", "payload"]
+)
+
+
+class HardwareJournal:
+    """
+    Appends every hardware command and response to a compact binary file.
+    `path` may be a directory, which gets a timestamped file per run. An
+    existing file is never overwritten: the new journal is written next to
+    it with the start time appended to its name.
+    """
+
+    def __init__(self, path):
+        if os.path.isdir(path):
+            path = os.path.join(path, time.strftime("journal-%Y%m%d-%H%M%S.aumj"))
+        elif os.path.exists(path):
+            root, ext = os.path.splitext(path)
+            path = f"{root}-{time.strftime('%Y%m%d-%H%M%S')}{ext}"
+        self.path = path
+        self._file = open(path, "wb", buffering=64 * 1024)
+        self._file.write(HEADER.pack(MAGIC, VERSION, time.time()))
+        self._start = time.monotonic_ns()
+        self._last_flush = time.monotonic()
+        self._device_ids = {}
+        self.records_written = 0
+        logging.info(f"[HARDWARE] Recording hardware journal to '{path}'.")
+
+    def _device_id(self, device):
+        device_id = self._device_ids.get(device)
+        if device_id is None:
+            device_id = len(self._device_ids)
+            self._device_ids[device] = device_id
+            self._write(device_id, KIND_DEVICE, device.encode("utf-8"))
+        return device_id
+
+    def _write(self, device_id, kind, payload):
+        payload = payload[:MAX_PAYLOAD]
+        elapsed = time.monotonic_ns() - self._start
+        self._file.write(RECORD.pack(elapsed, device_id, kind, len(payload)))
+        self._file.write(payload)
+        self.records_written += 1
+        now = time.monotonic()
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self._file.flush()
+            self._last_flush = now
+
+    def record_command(self, device, payload):
+        """Records a command sent to a device. Payload may be str or bytes."""
+        if self._file.closed:
+            return
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self._write(self._device_id(device), KIND_COMMAND, payload)
+
+    def record_response(self, device, payload):
+        """Records a device's response. An empty payload means no response arrived."""
+        if self._file.closed:
+            return
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self._write(self._device_id(device), KIND_RESPONSE, payload)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            logging.info(
+                f"[HARDWARE] Hardware journal closed after {self.records_written} records."
+            )
+
+
+def read_journal(path):
+    """Yields JournalRecords (timestamp in seconds, device name, kind name, payload)."""
+    devices = {}
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"'{path}' is not a hardware journal.")
+        magic, version, _ = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' is not a version {VERSION} hardware journal.")
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return  # End of file, or a record cut short by a crash
+            elapsed_ns, device_id, kind, length = RECORD.unpack(head)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            if kind == KIND_DEVICE:
+                devices[device_id] = payload.decode("utf-8")
+                continue
+            yield JournalRecord(
+                elapsed_ns / 1e9,
+                devices.get(device_id, f"device-{device_id}"),
+                KIND_NAMES.get(kind, str(kind)),
+                payload,
+            )
+
+
+def pair_exchanges(records):
+    """
+    Pairs each command with the next response from the same device.
+    Returns a list of dicts with the command, response and round-trip latency.
+    """
+    exchanges = []
+    pending = {}
+    for record in records:
+        if record.kind == "command":
+            exchange = {
+                "device": record.device,
+                "sent_at": record.timestamp,
+                "command": record.payload.decode("utf-8", "replace").strip(),
+                "response": None,
+                "latency": None,
+            }
+            exchanges.append(exchange)
+            pending[record.device] = exchange
+        elif record.kind == "response":
+            exchange = pending.pop(record.device, None)
+            if exchange is not None:
+                exchange["response"] = record.payload.decode("utf-8", "replace").strip()
+                exchange["latency"] = record.timestamp - exchange["sent_at"]
+    return exchanges
@@ -0,0 +1,167 @@
+"""
+Replays a hardware journal against the emulator or the real boards.
+
+Usage:
+    python -m src.journal_replay JOURNAL [--speed 1.0] [--record OUT] [--json]
+
+Ports are chosen exactly like the director chooses them (AUM_ENVIRONMENT and
+the *_PORT variables). --speed 2 replays twice as fast; --speed 0 sends each
+command as soon as the previous one on that device has been answered.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from .hardware_controller import HardwareManager
+from .hardware_journal import HardwareJournal, pair_exchanges, read_journal
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+def _summarize(latencies):
+    latencies = [latency for latency in latencies if latency is not None]
+    if not latencies:
+        return {"count": 0, "mean_ms": None, "p95_ms": None}
+    return {
+        "count": len(latencies),
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 2),
+        "p95_ms": round(1000 * _percentile(latencies, 0.95), 2),
+    }
+
+
+async def _replay_device(controller, exchanges, speed, started, first_sent_at=0.0):
+    """
+    Sends one device's commands in their original order and timing, relative
+    to `first_sent_at` (the first replayed command of any device).
+    """
+    results = []
+    for exchange in exchanges:
+        if speed > 0:
+            offset = exchange["sent_at"] - first_sent_at
+            delay = offset / speed - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        sent_at = time.monotonic()
+        await controller.send_command(exchange["command"])
+        results.append(
+            {
+                **exchange,
+                "replay_latency": time.monotonic() - sent_at,
+                "replay_response": controller.last_response,
+            }
+        )
+    return results
+
+
+def build_report(results):
+    """Compares recorded and replayed latencies and responses per device."""
+    report = {}
+    for device in sorted({result["device"] for result in results}):
+        device_results = [r for r in results if r["device"] == device]
+        recorded = _summarize([r["latency"] for r in device_results])
+        replayed = _summarize([r["replay_latency"] for r in device_results])
+        delta = None
+        if recorded["mean_ms"] is not None and replayed["mean_ms"] is not None:
+            delta = round(replayed["mean_ms"] - recorded["mean_ms"], 2)
+        report[device] = {
+            "recorded": recorded,
+            "replayed": replayed,
+            "mean_delta_ms": delta,
+            "response_mismatches": sum(
+                1
+                for r in device_results
+                if r["response"] is not None
+                and r["replay_response"] is not None
+                and r["response"] != r["replay_response"]
+            ),
+        }
+    return report
+
+
+async def replay(journal_path, speed=1.0, record_path=None):
+    """Replays every serial exchange in a journal and returns the timing report."""
+    exchanges = pair_exchanges(read_journal(journal_path))
+    # The env-configured journal could be the very file being replayed.
+    hardware = HardwareManager(journal=False)
+    if record_path:
+        hardware.journal = HardwareJournal(record_path)
+        hardware.main_scene_controller.journal = hardware.journal
+        hardware.robotic_arm_controller.journal = hardware.journal
+    controllers = {
+        controller.name: controller
+        for controller in (
+            hardware.main_scene_controller,
+            hardware.robotic_arm_controller,
+        )
+    }
+
+    skipped = {e["device"] for e in exchanges if e["device"] not in controllers}
+    for device in skipped:
+        logging.warning(
+            f"[REPLAY] Skipping commands for '{device}' (not a serial device)."
+        )
+
+    # Skip any idle time before the first command instead of sleeping through it.
+    first_sent_at = min(
+        (e["sent_at"] for e in exchanges if e["device"] in controllers), default=0.0
+    )
+    await hardware.connect_all()
+    try:
+        started = time.monotonic()
+        per_device = await asyncio.gather(
+            *(
+                _replay_device(
+                    controller,
+                    [e for e in exchanges if e["device"] == name],
+                    speed,
+                    started,
+                    first_sent_at,
+                )
+                for name, controller in controllers.items()
+            )
+        )
+    finally:
+        await hardware.close_all_ports()
+    return build_report([result for results in per_device for result in results])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a hardware journal.")
+    parser.add_argument("journal", help="Path to a .aumj journal file.")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed multiplier (0 = as fast as the devices answer).",
+    )
+    parser.add_argument("--record", help="Write a journal of the replay itself.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(replay(args.journal, args.speed, args.record))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for device, stats in report.items():
+        print(f"{device}:")
+        print(f"  recorded: {stats['recorded']}")
+        print(f"  replayed: {stats['replayed']}")
+        print(f"  mean delta: {stats['mean_delta_ms']} ms")
+        print(f"  response mismatches: {stats['response_mismatches']}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    main()
@@ -1,10 +1,16 @@
+import asyncio
+import sys
+
 import serial.tools.list_ports
 
+from .port_discovery import DEVICE_SIGNATURES, discover_ports, match_device
+
 
 def list_serial_ports():
     """
     Lists serial ports using the pyserial list_ports module.
-    Each port is identified by its device, name, and description.
+    Each port is identified by its device, name, and description, plus the
+    project device it matches by USB VID/PID or serial number (if any).
     """
     print("Listing available serial ports...")
 
@@ -16,12 +22,30 @@ def list_serial_ports():
         return
 
     # Iterate through the list of ports and print their details.
-    for port, desc, hwid in sorted(ports):
-        print(f"Device: {port}")
-        print(f"Description: {desc}")
-        print(f"Hardware ID: {hwid}")
+    for port in sorted(ports):
+        print(f"Device: {port.device}")
+        print(f"Description: {port.description}")
+        print(f"Hardware ID: {port.hwid}")
+        matches = [
+            signature["name"]
+            for key, signature in DEVICE_SIGNATURES.items()
+            if match_device(key, [port])
+        ]
+        if matches:
+            print(f"Matches: {', '.join(matches)}")
         print("-" * 20)
 
 
+def refresh_port_cache():
+    """Runs USB discovery for every device and rewrites the port cache."""
+    resolved, timings = asyncio.run(discover_ports(refresh=True))
+    for key, device in resolved.items():
+        print(f"{DEVICE_SIGNATURES[key]['name']}: {device or 'NOT FOUND'}")
+    print(f"Timings (ms): {timings}")
+
+
 if __name__ == "__main__":
-    list_serial_ports()
+    if "--discover" in sys.argv:
+        refresh_port_cache()
+    else:
+        list_serial_ports()
@@ -1,44 +1,171 @@
 import asyncio
 import logging
 import os
-import pyaudio
+import time
 import traceback
-import json
 import websockets
-import numpy as np
-import noisereduce as nr
-from google import genai
 from google.genai import types
 
+from . import control_protocol, live_session, metrics, startup, tracing
+from .arm_jog import ArmJogController
+from .live_session import LiveSessionManager
+from .local_genai import create_client
+from .loop_monitor import LoopMonitor
 from .orchestrator import StatefulOrchestrator
+from .startup import StartupPlan
 
 # --- Audio Configuration ---
-FORMAT = pyaudio.paInt16
+# pyaudio, numpy and noisereduce (which pulls in SciPy) are imported in the
+# background during startup; see src/startup.py.
+DENOISE_MODULES = ("numpy", "noisereduce")
+SAMPLE_WIDTH = 2  # Bytes per sample: 16-bit PCM
 CHANNELS = 1
 SEND_SAMPLE_RATE = 16000
 RECEIVE_SAMPLE_RATE = 24000
 CHUNK_SIZE = 1024
+# Denoised mic chunks louder than this RMS (16-bit samples) count as the
+# visitor talking. Sessions are only switched after VOICE_HOLD_S without one,
+# the same silence the server waits for before it ends a turn.
+VOICE_RMS_THRESHOLD = 500
+VOICE_HOLD_S = 1.2
+
+SYSTEM_PROMPT_PATH = "prompts/BOB_DIRECTOR.md"
+
+# --- Metrics ---
+# Snapshots are pushed to the web server, which serves them on /metrics,
+# every METRICS_PUSH_INTERVAL seconds (AUM_METRICS_PUSH_INTERVAL overrides it).
+METRICS_PUSH_INTERVAL = 5.0
+AUDIO_CHUNKS = metrics.counter(
+    "aum_audio_chunks_total",
+    "Audio chunks: mic chunks sent or muted while Bob speaks, model chunks received.",
+    labelnames=("direction",),
+)
+AUDIO_CHUNKS_SENT = AUDIO_CHUNKS.labels("sent")
+AUDIO_CHUNKS_MUTED = AUDIO_CHUNKS.labels("muted")
+AUDIO_CHUNKS_RECEIVED = AUDIO_CHUNKS.labels("received")
+AUDIO_QUEUE_DEPTH = metrics.gauge(
+    "aum_audio_queue_depth", "Model audio chunks waiting to be played."
+)
+TOOL_CALL_SECONDS = metrics.histogram(
+    "aum_tool_call_seconds", "Time from a tool call to its tool response being sent."
+)
+WEB_COMMANDS = metrics.counter(
+    "aum_web_commands_total",
+    "Control messages from the web UI by outcome.",
+    labelnames=("outcome",),
+)
+
+
+def _read_system_prompt():
+    with open(SYSTEM_PROMPT_PATH, "r") as f:
+        return f.read()
 
 
 class AumDirectorApp:
-    def __init__(self):
-        self.orchestrator = StatefulOrchestrator()
-        self.pya = pyaudio.PyAudio()
+    def __init__(self, orchestrator=None, client=None):
+        self.orchestrator = orchestrator or StatefulOrchestrator()
+        self.client = client
+        self.pya = None  # Created by open_audio()
+        self.input_stream = None
+        self.output_stream = None
         self.audio_in_queue = asyncio.Queue()
-        self.session = None
+        self.live = None  # LiveSessionManager, created by run()
+        self.tool_call_in_progress = False
         self.web_socket = None
+        self.web_connected = asyncio.Event()
+        self.ready = asyncio.Event()
+        self.startup_plan = None  # The StartupPlan of the last run()
         self.is_model_speaking = False
+        self.last_voice_at = 0.0  # time.monotonic() of the last loud mic chunk
         self.speaking_lock = asyncio.Lock()
+        self.web_commands = control_protocol.Dispatcher(
+            {
+                control_protocol.TriggerScene: self._on_trigger_scene,
+                control_protocol.MoveRoboticArm: self._on_move_robotic_arm,
+                control_protocol.ResetConversation: self._on_reset_conversation,
+                control_protocol.JogArm: self._on_jog_arm,
+                control_protocol.ProfilerControl: self._on_profiler_control,
+            }
+        )
+        self.loop_monitor = LoopMonitor()
+        self.arm_jog = ArmJogController(self.orchestrator.hardware, self.send_to_web)
+
+    @property
+    def session(self):
+        """The active Live session; None while it is being replaced."""
+        return self.live.session if self.live else None
+
+    def _is_quiet(self):
+        """True when switching sessions would cut off neither Bob nor a visitor."""
+        return (
+            not self.is_model_speaking
+            and not self.tool_call_in_progress
+            and self.audio_in_queue.empty()
+            and time.monotonic() - self.last_voice_at >= VOICE_HOLD_S
+        )
+
+    async def send_to_web(self, message):
+        """Sends a control_protocol message to the web server; False if not connected."""
+        if not self.web_socket or self.web_socket.closed:
+            return False
+        try:
+            await self.web_socket.send(control_protocol.encode(message))
+        except websockets.exceptions.ConnectionClosed:
+            logging.error("[DIRECTOR] WebSocket connection is closed.")
+            self.web_socket = None
+            return False
+        return True
 
     async def send_qr_command_to_web(self):
         """Sends the display_qr command to the web server via WebSocket."""
         if self.web_socket and not self.web_socket.closed:
             logging.info("[DIRECTOR] ---> Sending 'display_qr' command to web server.")
-            try:
-                await self.web_socket.send(json.dumps({"type": "display_qr"}))
-            except websockets.exceptions.ConnectionClosed:
-                logging.error("[DIRECTOR] WebSocket connection is closed.")
-                self.web_socket = None
+            await self.send_to_web(control_protocol.DisplayQr())
+
+    # --- Web command handlers (see src/control_protocol.py) ---
+    async def _on_trigger_scene(self, command):
+        await self.orchestrator.execute_scene_by_name(command.scene_name)
+
+    async def _on_move_robotic_arm(self, command):
+        await self.orchestrator.execute_manual_arm_move(
+            p1=command.p1, p2=command.p2, p3=command.p3
+        )
+
+    async def _on_jog_arm(self, command):
+        self.arm_jog.set_target((command.p1, command.p2, command.p3), command.seq)
+
+    async def _on_profiler_control(self, command):
+        if command.action == "start":
+            self.loop_monitor.start_profiler()
+        elif command.action == "stop":
+            # Writing the profile is file I/O; keep it off the loop.
+            await asyncio.to_thread(self.loop_monitor.stop_profiler)
+        stats = self.loop_monitor.stats()
+        await self.send_to_web(
+            control_protocol.ProfilerStatus(
+                running=stats["profiling"],
+                samples=stats["profile_samples"],
+                path=stats["last_profile"],
+                stalls=stats["stalls"],
+                max_lag_ms=stats["max_lag_ms"],
+            )
+        )
+
+    async def _on_reset_conversation(self, command):
+        logging.info("[DIRECTOR] Received 'reset_conversation' command.")
+        self.orchestrator._reset_conversation()
+        if self.session:
+            self.live.fresh_context(self.session, after_turn=False)
+
+    async def _reject_web_command(self, websocket, message, error):
+        """Logs an invalid web command and tells the UIs why it was rejected."""
+        command = control_protocol.peek_type(message) or "unknown"
+        logging.error(f"[DIRECTOR] Rejected web command '{command}': {error}")
+        await websocket.send(
+            control_protocol.encode(
+                control_protocol.CommandRejected(command=command, error=str(error))
+            )
+        )
 
     async def listen_for_web_commands(self):
         """Connects to the web server's control WebSocket and listens for commands."""
@@ -48,29 +175,19 @@ class AumDirectorApp:
                 async with websockets.connect(uri) as websocket:
                     self.web_socket = websocket
                     await websocket.send(
-                        json.dumps({"type": "identify", "client": "director"})
+                        control_protocol.encode(control_protocol.Identify("director"))
                     )
                     logging.info("[DIRECTOR] Connected to web control WebSocket.")
+                    self.web_connected.set()
                     async for message in websocket:
-                        try:
-                            data = json.loads(message)
-                            if data.get("type") == "trigger_scene":
-                                await self.orchestrator.execute_scene_by_name(
-                                    data.get("scene_name")
-                                )
-                            elif data.get("type") == "move_robotic_arm":
-                                await self.orchestrator.execute_manual_arm_move(
-                                    **data.get("params", {})
-                                )
-                            elif data.get("type") == "reset_conversation":
-                                logging.info(
-                                    "[DIRECTOR] Received 'reset_conversation' command."
-                                )
-                                self.orchestrator._reset_conversation()
-                        except (json.JSONDecodeError, TypeError) as e:
-                            logging.error(
-                                f"[DIRECTOR] Error processing web command: {e}"
-                            )
+                        error = await self.web_commands.dispatch(message)
+                        if isinstance(error, control_protocol.ProtocolError):
+                            WEB_COMMANDS.labels("rejected").inc()
+                            await self._reject_web_command(websocket, message, error)
+                        elif error:
+                            WEB_COMMANDS.labels("failed").inc()
+                        else:
+                            WEB_COMMANDS.labels("handled").inc()
             except (OSError, websockets.exceptions.ConnectionClosedError) as e:
                 logging.warning(
                     f"[DIRECTOR] WebSocket connection failed: {e}. Retrying..."
@@ -78,16 +195,50 @@ class AumDirectorApp:
                 self.web_socket = None
                 await asyncio.sleep(3)
 
+    async def push_metrics(self):
+        """Periodically sends a metrics snapshot to the web server (/metrics)."""
+        interval = float(
+            os.getenv("AUM_METRICS_PUSH_INTERVAL", str(METRICS_PUSH_INTERVAL))
+        )
+        while True:
+            await asyncio.sleep(interval)
+            await self.send_to_web(
+                control_protocol.MetricsSnapshot(metrics=metrics.snapshot())
+            )
+
+    def _open_streams(self):
+        audio_format = self.pya.get_format_from_width(SAMPLE_WIDTH)
+        if self.input_stream is None:
+            self.input_stream = self.pya.open(
+                format=audio_format,
+                channels=CHANNELS,
+                rate=SEND_SAMPLE_RATE,
+                input=True,
+                frames_per_buffer=CHUNK_SIZE,
+            )
+            logging.info("[DIRECTOR] Microphone is open.")
+        if self.output_stream is None:
+            self.output_stream = self.pya.open(
+                format=audio_format,
+                channels=CHANNELS,
+                rate=RECEIVE_SAMPLE_RATE,
+                output=True,
+            )
+            logging.info("[DIRECTOR] Audio output is open.")
+
+    async def open_audio(self):
+        """Opens the microphone and speaker streams once; they outlive reconnects."""
+        if self.pya is None:
+            pyaudio = await startup.import_module("pyaudio")
+            # PortAudio scans the sound devices here, so keep it off the loop.
+            self.pya = await asyncio.to_thread(pyaudio.PyAudio)
+        await asyncio.to_thread(self._open_streams)
+
     async def listen_and_send_audio(self):
         """Captures, denoises, and sends audio to the Gemini API."""
-        stream = self.pya.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=SEND_SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=CHUNK_SIZE,
-        )
-        logging.info("[DIRECTOR] Microphone is open.")
+        np, nr = await startup.import_modules(*DENOISE_MODULES)
+        await self.open_audio()
+        stream = self.input_stream
         while True:
             data = await asyncio.to_thread(
                 stream.read, CHUNK_SIZE, exception_on_overflow=False
@@ -101,27 +252,40 @@ class AumDirectorApp:
 
             # Convert back to bytes
             denoised_data = reduced_noise.astype(np.int16).tobytes()
+            rms = np.sqrt(np.mean(np.square(reduced_noise, dtype=np.float64)))
+            if rms > VOICE_RMS_THRESHOLD:
+                self.last_voice_at = time.monotonic()
 
-            if self.session:
+            if session := self.session:
                 is_speaking = False
                 async with self.speaking_lock:
                     is_speaking = self.is_model_speaking
 
                 if not is_speaking:
-                    await self.session.send_realtime_input(
-                        audio={"data": denoised_data, "mime_type": "audio/pcm"}
-                    )
+                    try:
+                        await session.send_realtime_input(
+                            audio={"data": denoised_data, "mime_type": "audio/pcm"}
+                        )
+                    except live_session.SESSION_CLOSED_ERRORS as e:
+                        if session is self.session:
+                            logging.warning(
+                                f"[DIRECTOR] Gemini API connection closed: {e}."
+                            )
+                            await self.live.failover(session)
+                        continue
+                    AUDIO_CHUNKS_SENT.inc()
+                else:
+                    AUDIO_CHUNKS_MUTED.inc()
 
     async def play_audio(self):
         """Plays audio from the incoming queue, managing speaking state."""
-        stream = self.pya.open(
-            format=FORMAT, channels=CHANNELS, rate=RECEIVE_SAMPLE_RATE, output=True
-        )
-        logging.info("[DIRECTOR] Audio output is open.")
+        await self.open_audio()
+        stream = self.output_stream
         while True:
             try:
                 # Wait for the first chunk with a short timeout.
                 chunk = await asyncio.wait_for(self.audio_in_queue.get(), timeout=0.25)
+                AUDIO_QUEUE_DEPTH.set(self.audio_in_queue.qsize())
 
                 # If we get a chunk, the model is speaking.
                 async with self.speaking_lock:
@@ -135,6 +299,7 @@ class AumDirectorApp:
                 # Continue playing subsequent chunks without delay.
                 while not self.audio_in_queue.empty():
                     chunk = self.audio_in_queue.get_nowait()
+                    AUDIO_QUEUE_DEPTH.set(self.audio_in_queue.qsize())
                     await asyncio.to_thread(stream.write, chunk)
 
             except asyncio.TimeoutError:
@@ -155,42 +320,70 @@ class AumDirectorApp:
     async def receive_and_process(self):
         """Handles responses from Gemini, including tool calls and audio."""
         while True:
-            if not self.session:
+            session = self.session
+            if not session:
                 await asyncio.sleep(0.1)
                 continue
 
-            turn = self.session.receive()
-            async for response in turn:
-                if response.server_content and response.server_content.model_turn:
-                    for part in response.server_content.model_turn.parts:
-                        if audio_data := getattr(part, "inline_data", None):
-                            if audio_data.mime_type.startswith("audio/pcm"):
-                                self.audio_in_queue.put_nowait(audio_data.data)
-
-                if response.tool_call:
-                    for call in response.tool_call.function_calls:
-                        if call.name == "process_user_command":
-                            command = call.args["command"]
-                            logging.info(
-                                f'[DIRECTOR] ---> User speech detected: "{command}"'
-                            )
-                            result = await self.orchestrator.process_user_input(
-                                command, self
-                            )
-                            await self.session.send_tool_response(
-                                function_responses=[
-                                    types.FunctionResponse(
-                                        id=call.id, name=call.name, response=result
-                                    )
-                                ]
+            try:
+                async for response in session.receive():
+                    self.live.on_message(session, response)
+                    if response.server_content and response.server_content.model_turn:
+                        for part in response.server_content.model_turn.parts:
+                            if audio_data := getattr(part, "inline_data", None):
+                                if audio_data.mime_type.startswith("audio/pcm"):
+                                    self.audio_in_queue.put_nowait(audio_data.data)
+                                    AUDIO_CHUNKS_RECEIVED.inc()
+                                    AUDIO_QUEUE_DEPTH.set(self.audio_in_queue.qsize())
+
+                    if response.tool_call:
+                        for call in response.tool_call.function_calls:
+                            if call.name == "process_user_command":
+                                await self._handle_tool_call(session, call)
+            except live_session.SESSION_CLOSED_ERRORS as e:
+                # A replaced session is closed while this loop may still be
+                # reading it; only a failure of the active one needs a failover.
+                if session is not self.session:
+                    logging.debug(f"[DIRECTOR] Replaced Live session closed: {e}.")
+                    continue
+                logging.warning(f"[DIRECTOR] Gemini API connection closed: {e}.")
+                await self.live.failover(session)
+
+    async def _handle_tool_call(self, session, call):
+        command = call.args["command"]
+        started = time.perf_counter()
+        logging.info(f'[DIRECTOR] ---> User speech detected: "{command}"')
+        self.tool_call_in_progress = True
+        try:
+            # One trace per visitor turn; see src/tracing.py.
+            with tracing.start_trace("turn", command=command):
+                result = await self.orchestrator.process_user_input(command, self)
+                with tracing.span("send_tool_response"):
+                    await session.send_tool_response(
+                        function_responses=[
+                            types.FunctionResponse(
+                                id=call.id,
+                                name=call.name,
+                                response=result,
                             )
+                        ]
+                    )
+        finally:
+            self.tool_call_in_progress = False
+        TOOL_CALL_SECONDS.observe(time.perf_counter() - started)
+        if result["is_story_finished"]:
+            # The next visitor starts on a session without this conversation.
+            self.live.fresh_context(session)
+
+    async def _connect_live(self, plan):
+        # The system prompt is part of the session setup (its system instruction).
+        self.live.system_prompt = await plan.result("system_prompt_load")
+        return await self.live.open()
 
     async def run(self):
         """Main entry point to run the director application."""
         api_key = os.getenv("GEMINI_API_KEY")
-        client = genai.Client(api_key=api_key)
-        with open("prompts/BOB_DIRECTOR.md", "r") as f:
-            system_prompt = f.read()
+        client = self.client or create_client(api_key)
 
         tools = [
             {
@@ -223,66 +416,68 @@ class AumDirectorApp:
                     disabled=False,
                     start_of_speech_sensitivity=types.StartSensitivity.START_SENSITIVITY_LOW,
                     end_of_speech_sensitivity=types.EndSensitivity.END_SENSITIVITY_LOW,
-                    silence_duration_ms=1200,
+                    silence_duration_ms=int(1000 * VOICE_HOLD_S),
                 ),
                 turn_coverage=types.TurnCoverage.TURN_INCLUDES_ALL_INPUT,
             ),
             tools=tools,
+            # A session open for hours keeps only its most recent turns.
+            context_window_compression=live_session.context_window_compression(),
+        )
+
+        # Dropped connections are replaced by a standby or resumed session;
+        # see src/live_session.py.
+        self.live = LiveSessionManager(
+            client,
+            config,
+            resume_context=self.orchestrator.resume_context,
+            is_quiet=self._is_quiet,
         )
 
         logging.info("-- Bob the Curious Robot --")
+        # Everything Bob needs before he can speak starts at once; see src/startup.py.
+        plan = self.startup_plan = StartupPlan()
+        background = []
         try:
-            await self.orchestrator.hardware.connect_all()
+            self.loop_monitor.start()
+            # Imports run one at a time on the import thread. pyaudio goes
+            # first: audio_devices blocks on it, the denoiser does not.
+            if self.pya is None:
+                startup.preload("pyaudio")
+            plan.add(
+                "imports", startup.import_modules(*DENOISE_MODULES), blocking=False
+            )
+            plan.add("system_prompt_load", asyncio.to_thread(_read_system_prompt))
+            plan.add("audio_devices", self.open_audio())
+            plan.add(
+                "hardware", self.orchestrator.hardware.connect_all(), blocking=False
+            )
+            plan.add("web_socket", self.web_connected.wait(), blocking=False)
+            # The web control socket outlives Gemini reconnects.
+            background.append(asyncio.create_task(self.listen_for_web_commands()))
+            background.append(asyncio.create_task(self.push_metrics()))
+            logging.info("[DIRECTOR] Attempting to connect to Gemini API...")
+            plan.add("gemini_connect", self._connect_live(plan))
+            session = await plan.result("gemini_connect")
+            logging.info("[DIRECTOR] Gemini API connection successful.")
+            await plan.ready()
+            self.ready.set()
+
+            # Kick off the conversation; a standby session connects behind it.
+            await self.live.begin(session)
             while True:
-                logging.info("[DIRECTOR] Attempting to connect to Gemini API...")
                 try:
-                    async with (
-                        client.aio.live.connect(
-                            model="gemini-2.5-flash-preview-native-audio-dialog",
-                            config=config,
-                        ) as session,
-                        asyncio.TaskGroup() as tg,
-                    ):
-                        self.session = session
-                        logging.info("[DIRECTOR] Gemini API connection successful.")
-
-                        # Send the system prompt as the first turn to initialize the AI
-                        await self.session.send_client_content(
-                            turns=[
-                                {"role": "user", "parts": [{"text": system_prompt}]}
-                            ],
-                            turn_complete=False,
-                        )
-
-                        # Kick off the conversation
-                        await self.session.send_client_content(
-                            turns={"role": "user", "parts": []}, turn_complete=True
-                        )
-
+                    async with asyncio.TaskGroup() as tg:
                         tg.create_task(self.listen_and_send_audio())
                         tg.create_task(self.play_audio())
                         tg.create_task(self.receive_and_process())
-                        tg.create_task(self.listen_for_web_commands())
-
-                except websockets.exceptions.ConnectionClosedError as e:
+                except* live_session.SESSION_CLOSED_ERRORS as group:
+                    # The tasks fail over on their own; a closed session that
+                    # slips past them restarts the tasks on the active one.
                     logging.warning(
-                        f"[DIRECTOR] Gemini API connection closed: {e}. Reconnecting..."
-                    )
-                    self.session = None
-                    await asyncio.sleep(5)
-                except ExceptionGroup as eg:
-                    is_connection_error = any(
-                        isinstance(err, websockets.exceptions.ConnectionClosedError)
-                        for err in eg.exceptions
+                        "[DIRECTOR] Gemini API connection closed within TaskGroup: "
+                        f"{group.exceptions[0]}. Restarting the session tasks..."
                     )
-                    if is_connection_error:
-                        logging.warning(
-                            "[DIRECTOR] Gemini API connection closed within TaskGroup. Reconnecting..."
-                        )
-                        self.session = None
-                        await asyncio.sleep(5)
-                    else:
-                        raise
         except asyncio.CancelledError:
             logging.info("[DIRECTOR] Main task cancelled.")
         except Exception as e:
@@ -290,7 +485,16 @@ class AumDirectorApp:
                 f"[DIRECTOR] CRITICAL_ERROR in run loop: {e}\n{traceback.format_exc()}"
             )
         finally:
-            self.pya.terminate()
+            await plan.cancel()
+            if self.live:
+                await self.live.close()
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+            if self.pya:
+                self.pya.terminate()
+            await self.arm_jog.stop()
+            await self.loop_monitor.stop()
             if self.orchestrator and hasattr(self.orchestrator, "hardware"):
                 await self.orchestrator.hardware.close_all_ports()
             logging.info("--- Application shut down ---")
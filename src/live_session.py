@@ -0,0 +1,457 @@
+"""
+Live API session management: a warm standby session, session resumption,
+GoAway handovers and the size of the session context.
+
+A dropped Live connection used to cost a 5 s sleep, a new connection and the
+whole system prompt. The kickoff that followed made Bob greet whoever was
+talking as if they had just walked up. LiveSessionManager keeps the active
+session and, in the background, a standby session that is already connected
+and has the system prompt (its system instruction, which context compression
+never drops). The active session is replaced when:
+
+- The connection fails. The standby is promoted at once. If a visitor is
+  mid-conversation, the orchestrator's resume_context() tells the new
+  session where things stand; without a recap the new session waits for the
+  visitor instead of kicking off a new greeting. Without a standby, the
+  session is resumed from the latest resumption handle (the server restores
+  its context) or, failing that, connected from scratch.
+- The server sends GoAway. The session is resumed from the latest handle at
+  a quiet moment before the deadline, so the conversation continues in the
+  same server-side session.
+- A visitor's story is finished. Once Bob has said goodbye, the standby
+  takes over without a kickoff, so the next visitor starts on a context
+  that holds only the system prompt.
+
+The config's sliding-window compression (context_window_compression())
+keeps a session that stays open between visitors from growing until it
+slows down or hits the session limits. Each model turn's token usage is
+logged and exported, so the growth is visible.
+
+The standby is replaced every STANDBY_MAX_AGE seconds, so it is never close
+to the server's connection lifetime when it is promoted. Each switch is
+timed from losing the session to a usable replacement.
+"""
+
+import asyncio
+import collections
+import contextlib
+import logging
+import os
+import time
+
+import websockets
+from google.genai import errors, types
+
+from . import metrics
+
+LIVE_MODEL = "gemini-2.5-flash-preview-native-audio-dialog"
+# Default; AUM_LIVE_STANDBY_MAX_AGE overrides it. AUM_LIVE_STANDBY,
+# AUM_LIVE_RESUMPTION and AUM_LIVE_FRESH_CONTEXT ("0" turns them off) are read
+# when the manager is built, after .env has been loaded.
+STANDBY_MAX_AGE = 480.0
+# Sliding-window compression: once the context reaches the trigger, the
+# oldest turns are dropped down to the target. A trigger of 0 disables it.
+# Defaults for AUM_LIVE_COMPRESSION_TRIGGER_TOKENS / _TARGET_TOKENS.
+COMPRESSION_TRIGGER_TOKENS = 32000
+COMPRESSION_TARGET_TOKENS = 16000
+FAREWELL_TIMEOUT = 30.0  # Seconds to wait for the end of Bob's last turn
+RECONNECT_DELAY = 5  # Seconds between failed connection attempts
+GO_AWAY_MARGIN = 2.0  # Seconds before a GoAway deadline to hand over regardless
+QUIET_POLL_INTERVAL = 0.1
+SWITCH_HISTORY = 50  # Recent switches kept in `switches`
+
+# Errors worth another connection attempt; anything else (a bad API key, an
+# invalid config) is raised.
+CONNECT_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    websockets.exceptions.WebSocketException,
+)
+
+# Errors from a session whose connection is closed. Sends raise the websockets
+# error; receive() turns the close frame into an APIError, even for a clean
+# 1000 close (e.g. a replaced session being closed).
+SESSION_CLOSED_ERRORS = (websockets.exceptions.ConnectionClosed, errors.APIError)
+
+RECONNECT_GAP = metrics.histogram(
+    "aum_live_reconnect_gap_seconds",
+    "Time from losing the Live session to a usable replacement.",
+    labelnames=("via",),
+)
+SESSION_SWITCHES = metrics.counter(
+    "aum_live_session_switches_total",
+    "Live session replacements by cause and by how they were replaced.",
+    labelnames=("reason", "via"),
+)
+STANDBY_READY = metrics.gauge(
+    "aum_live_standby_ready", "1 while a standby Live session is connected."
+)
+TURN_TOKENS = metrics.histogram(
+    "aum_live_turn_tokens",
+    "Tokens per Live model turn from its usage metadata: prompt (the session "
+    "context) or response.",
+    labelnames=("kind",),
+    buckets=(100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000),
+)
+CONTEXT_TOKENS = metrics.gauge(
+    "aum_live_context_tokens", "Prompt tokens of the active session's latest turn."
+)
+
+# via: "standby", "resume" or "connect"; context: how the new session learned
+# about the conversation ("server", "recap" or "kickoff"), or "fresh" when it
+# starts without one.
+Switch = collections.namedtuple("Switch", "reason via context gap_s at")
+
+
+def _duration_seconds(duration):
+    """Parses a protobuf Duration string such as "9.5s"; 0 if missing."""
+    try:
+        return float(str(duration).rstrip("s"))
+    except ValueError:
+        return 0.0
+
+
+def context_window_compression():
+    """The sliding-window compression config for LiveConnectConfig, or None."""
+    trigger = int(
+        os.getenv(
+            "AUM_LIVE_COMPRESSION_TRIGGER_TOKENS", str(COMPRESSION_TRIGGER_TOKENS)
+        )
+    )
+    if trigger <= 0:
+        return None
+    target = int(
+        os.getenv("AUM_LIVE_COMPRESSION_TARGET_TOKENS", str(COMPRESSION_TARGET_TOKENS))
+    )
+    return types.ContextWindowCompressionConfig(
+        trigger_tokens=trigger,
+        sliding_window=types.SlidingWindow(target_tokens=target),
+    )
+
+
+class LiveSessionManager:
+    """Owns the active Live session and replaces it without losing the visitor."""
+
+    def __init__(
+        self,
+        client,
+        config,
+        resume_context=lambda: None,
+        is_quiet=lambda: True,
+        model=LIVE_MODEL,
+        standby=None,
+        resumption=None,
+        fresh_context=None,
+    ):
+        self.client = client
+        self.config = config
+        self.model = model
+        self.resume_context = resume_context
+        self.is_quiet = is_quiet
+        # None: AUM_LIVE_STANDBY / AUM_LIVE_RESUMPTION / AUM_LIVE_FRESH_CONTEXT decide.
+        if standby is None:
+            standby = os.getenv("AUM_LIVE_STANDBY", "1") != "0"
+        if resumption is None:
+            resumption = os.getenv("AUM_LIVE_RESUMPTION", "1") != "0"
+        if fresh_context is None:
+            fresh_context = os.getenv("AUM_LIVE_FRESH_CONTEXT", "1") != "0"
+        self.standby_enabled = standby
+        self.resumption = resumption
+        self.fresh_context_enabled = fresh_context
+        self.standby_max_age = float(
+            os.getenv("AUM_LIVE_STANDBY_MAX_AGE", str(STANDBY_MAX_AGE))
+        )
+        self.system_prompt = None  # Sent as each session's system instruction
+        self.session = None
+        self.standby = None
+        self.handle = None  # Latest resumption handle of the active session
+        self._kickoff_pending = False  # begin() has yet to start a conversation
+        self.context_tokens = 0  # Prompt tokens of the active session's latest turn
+        self.switches = collections.deque(maxlen=SWITCH_HISTORY)
+        self._stacks = {}  # Session -> the AsyncExitStack that closes it
+        self._lock = asyncio.Lock()
+        self._standby_wanted = asyncio.Event()
+        self._standby_since = None
+        self._standby_task = None
+        self._handover_task = None
+        self._refresh_task = None
+        self._turn_complete = asyncio.Event()
+        self._closing = set()
+
+    # --- Sessions ---
+    async def connect(self, handle=None):
+        """Opens a Live session, resumed from `handle` if given."""
+        update = {
+            "system_instruction": types.Content(
+                parts=[types.Part(text=self.system_prompt)]
+            )
+        }
+        if self.resumption:
+            update["session_resumption"] = types.SessionResumptionConfig(handle=handle)
+        config = self.config.model_copy(update=update)
+        stack = contextlib.AsyncExitStack()
+        session = await stack.enter_async_context(
+            self.client.aio.live.connect(model=self.model, config=config)
+        )
+        self._stacks[session] = stack
+        return session
+
+    async def open(self):
+        """Connects a new session, retrying until the Gemini API is reachable."""
+        while True:
+            try:
+                return await self.connect()
+            except CONNECT_ERRORS as e:
+                logging.warning(
+                    f"[LIVE_SESSION] Could not connect to the Gemini API: {e}. "
+                    f"Retrying in {RECONNECT_DELAY}s..."
+                )
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _start(self, session):
+        """Kicks off a new session; returns how it learned the context."""
+        context = self.resume_context()
+        if context:
+            await session.send_client_content(
+                turns=[{"role": "user", "parts": [{"text": context}]}],
+                turn_complete=True,
+            )
+            return "recap"
+        if not self._kickoff_pending:
+            # A replacement without a recap waits for the visitor: an empty
+            # turn would make Bob greet whoever is talking all over again.
+            return "fresh"
+        await session.send_client_content(
+            turns={"role": "user", "parts": []}, turn_complete=True
+        )
+        self._kickoff_pending = False
+        return "kickoff"
+
+    async def begin(self, session):
+        """Makes a new session the active one, starts it and keeps a standby."""
+        self.session = session
+        self._kickoff_pending = True
+        try:
+            await self._start(session)
+        except websockets.exceptions.ConnectionClosed:
+            await self.failover(session, reason="closed")
+        if self.standby_enabled and self._standby_task is None:
+            self._standby_task = asyncio.create_task(self._keep_standby())
+
+    def _close_later(self, session):
+        """Closes a session in the background; a dead one can take a while."""
+        stack = self._stacks.pop(session, None)
+        if stack is None:
+            return
+        task = asyncio.create_task(self._close_stack(stack))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_stack(self, stack):
+        try:
+            await stack.aclose()
+        except Exception as e:
+            logging.debug(f"[LIVE_SESSION] Error while closing a session: {e}")
+
+    # --- Replacing the active session ---
+    async def _promote_standby(self, fresh=False):
+        standby, self.standby = self.standby, None
+        if standby is None:
+            return None
+        STANDBY_READY.set(0)
+        self._standby_wanted.set()
+        if fresh:
+            self.handle = None
+            return "standby", "fresh", standby
+        try:
+            context = await self._start(standby)
+        except websockets.exceptions.ConnectionClosed as e:
+            logging.warning(f"[LIVE_SESSION] Standby session was closed: {e}.")
+            self._close_later(standby)
+            return None
+        self.handle = None  # The standby's own handles will follow.
+        return "standby", context, standby
+
+    async def _resume(self):
+        if not self.handle:
+            return None
+        try:
+            return "resume", "server", await self.connect(self.handle)
+        except Exception as e:
+            logging.warning(f"[LIVE_SESSION] Could not resume the session: {e}.")
+            self.handle = None
+            return None
+
+    async def _replacement(self, prefer_resume=False, fresh=False):
+        """Returns (via, context, session) for a new active session."""
+        if fresh:
+            # Resuming would bring the old conversation back.
+            replacement = await self._promote_standby(fresh=True)
+            if replacement:
+                return replacement
+            self.handle = None
+            return "connect", "fresh", await self.open()
+        if prefer_resume:
+            steps = (self._resume, self._promote_standby)
+        else:
+            steps = (self._promote_standby, self._resume)
+        for step in steps:
+            replacement = await step()
+            if replacement:
+                return replacement
+        while True:
+            session = await self.open()
+            try:
+                return "connect", await self._start(session), session
+            except websockets.exceptions.ConnectionClosed as e:
+                logging.warning(f"[LIVE_SESSION] New session was closed: {e}.")
+                self._close_later(session)
+
+    def _record(self, reason, via, context, started):
+        gap = time.monotonic() - started
+        self.switches.append(Switch(reason, via, context, gap, time.time()))
+        RECONNECT_GAP.labels(via).observe(gap)
+        SESSION_SWITCHES.labels(reason, via).inc()
+        logging.info(
+            f"[LIVE_SESSION] Session replaced after {reason} via {via} "
+            f"({context}) in {1000 * gap:.0f} ms."
+        )
+
+    async def failover(self, session, reason="closed"):
+        """Replaces `session` if it is still the active one; returns the active session."""
+        async with self._lock:
+            if session is not self.session:
+                return self.session
+            started = time.monotonic()
+            self.session = None
+            self._close_later(session)
+            via, context, self.session = await self._replacement()
+            self._record(reason, via, context, started)
+            return self.session
+
+    async def _swap(self, session, reason, prefer_resume=False, fresh=False):
+        """Replaces `session`, which still works, if it is still the active one."""
+        async with self._lock:
+            if session is not self.session:
+                return
+            # The old session serves until the new one is ready; the gap is
+            # timed like a failover's, from the start of the replacement.
+            started = time.monotonic()
+            via, context, new = await self._replacement(prefer_resume, fresh)
+            self.session = new
+            if fresh:
+                self.context_tokens = 0
+            self._close_later(session)
+            self._record(reason, via, context, started)
+
+    def on_message(self, session, message):
+        """Tracks handles, GoAway notices and token usage of the active session."""
+        if session is not self.session:
+            return
+        if message.server_content and message.server_content.turn_complete:
+            self._turn_complete.set()
+        if message.usage_metadata:
+            self._count_tokens(message.usage_metadata)
+        update = message.session_resumption_update
+        if update and update.resumable and update.new_handle:
+            self.handle = update.new_handle
+        if message.go_away and self._handover_task is None:
+            time_left = _duration_seconds(message.go_away.time_left)
+            logging.warning(
+                f"[LIVE_SESSION] GoAway: the server closes the session in {time_left:.1f}s."
+            )
+            self._handover_task = asyncio.create_task(
+                self._hand_over(session, time_left)
+            )
+
+    async def _hand_over(self, session, time_left):
+        """Moves to a resumed session at a quiet moment before the GoAway deadline."""
+        try:
+            deadline = time.monotonic() + max(0.0, time_left - GO_AWAY_MARGIN)
+            while time.monotonic() < deadline and not self.is_quiet():
+                await asyncio.sleep(QUIET_POLL_INTERVAL)
+            await self._swap(session, "go_away", prefer_resume=True)
+        finally:
+            self._handover_task = None
+
+    # --- Context size ---
+    def _count_tokens(self, usage):
+        prompt = usage.prompt_token_count or 0
+        response = usage.response_token_count or 0
+        TURN_TOKENS.labels("prompt").observe(prompt)
+        TURN_TOKENS.labels("response").observe(response)
+        CONTEXT_TOKENS.set(prompt)
+        logging.info(
+            f"[LIVE_SESSION] Turn tokens: {prompt} prompt "
+            f"({prompt - self.context_tokens:+d}), {response} response."
+        )
+        self.context_tokens = prompt
+
+    def fresh_context(self, session, after_turn=True):
+        """
+        Moves to a session without the finished conversation. With after_turn,
+        this waits for the end of the model turn in progress (Bob's goodbye)
+        and then for a quiet moment.
+        """
+        if (
+            not self.fresh_context_enabled
+            or self._refresh_task
+            or session is not self.session
+        ):
+            return
+        self._turn_complete.clear()
+        self._refresh_task = asyncio.create_task(self._refresh(session, after_turn))
+
+    async def _refresh(self, session, after_turn):
+        try:
+            if after_turn:
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout(FAREWELL_TIMEOUT):
+                        await self._turn_complete.wait()
+            while not self.is_quiet():
+                await asyncio.sleep(QUIET_POLL_INTERVAL)
+            await self._swap(session, "visitor_done", fresh=True)
+        finally:
+            self._refresh_task = None
+
+    # --- Standby ---
+    async def _keep_standby(self):
+        """Keeps one connected standby session, replacing it before it gets old."""
+        while True:
+            if self.standby is None:
+                try:
+                    session = await self.connect()
+                except CONNECT_ERRORS as e:
+                    logging.warning(
+                        f"[LIVE_SESSION] Could not connect a standby session: {e}."
+                    )
+                    await asyncio.sleep(RECONNECT_DELAY)
+                    continue
+                self.standby = session
+                self._standby_since = time.monotonic()
+                STANDBY_READY.set(1)
+                logging.info("[LIVE_SESSION] Standby session is ready.")
+            self._standby_wanted.clear()
+            age = time.monotonic() - self._standby_since
+            try:
+                async with asyncio.timeout(max(0.0, self.standby_max_age - age)):
+                    await self._standby_wanted.wait()
+            except TimeoutError:
+                old, self.standby = self.standby, None
+                if old is not None:
+                    STANDBY_READY.set(0)
+                    self._close_later(old)
+
+    async def close(self):
+        """Stops the standby upkeep and closes every open session."""
+        tasks = (self._standby_task, self._handover_task, self._refresh_task)
+        tasks = [task for task in tasks if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._standby_task = self._handover_task = self._refresh_task = None
+        for session in list(self._stacks):
+            self._close_later(session)
+        await asyncio.gather(*self._closing, return_exceptions=True)
+        self.session = self.standby = None
+        STANDBY_READY.set(0)
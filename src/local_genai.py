@@ -0,0 +1,461 @@
+"""
+A local stand-in for the parts of the Gemini API this project uses: the Live
+session (tool calls in, audio out) and the Storyteller's generate_content JSON
+reply. It needs no network, so the whole turn loop can be run and measured on
+any machine.
+
+Select it with AUM_GENAI_BACKEND="local". Latencies, the scripted visitor
+utterances and the Storyteller replies come from DEFAULT_SCRIPT, merged with
+the JSON file named by AUM_LOCAL_GENAI_SCRIPT.
+
+The scripted visitor belongs to the client, so a conversation carries on in
+whichever session is live. Sessions can be dropped or sent a GoAway notice
+to exercise reconnects, and hand out resumption handles when the config asks
+for session resumption. Each model turn reports usage metadata from a rough
+token count of the session context (audio at AUDIO_TOKENS_PER_SECOND, text
+at CHARS_PER_TOKEN), which the config's sliding window trims.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+import uuid
+
+import websockets
+from google import genai
+from google.genai import errors, types
+from websockets.frames import Close
+
+# --- Script ---
+# Latencies are in seconds: a number (fixed), {"mean", "stddev"} (normal),
+# {"min", "max"} (uniform) or {"median", "sigma"} (log-normal).
+#   connect:         live.connect() -> session open (WebSocket and setup)
+#   tool_call:       end of the visitor's speech -> process_user_command call
+#   first_audio:     tool response -> first audio chunk
+#   generate_content: Storyteller request -> JSON reply
+#   visitor_speech:  how long the visitor talks before each utterance ends
+# time_scale multiplies every delay (0 runs the script as fast as possible).
+DEFAULT_SCRIPT = {
+    "latency": {
+        "connect": {"median": 0.8, "sigma": 0.3},
+        "tool_call": {"median": 0.6, "sigma": 0.25},
+        "first_audio": {"median": 0.45, "sigma": 0.2},
+        "generate_content": {"median": 1.2, "sigma": 0.3},
+        "visitor_speech": {"min": 1.5, "max": 4.0},
+    },
+    "speech_rate": 2.5,  # Words per second of Bob's simulated audio
+    "chunk_ms": 40,  # Duration of each audio chunk sent to the director
+    "time_scale": 1.0,
+    "utterances": [
+        "START_CONVERSATION",
+        "I love going to the market on Sundays.",
+        "There is a stall that sells fresh bread.",
+        "My grandmother used to take me there.",
+        "We would sit by the pool afterwards.",
+        "stop",
+    ],
+    "storyteller_replies": [
+        {
+            "scene_to_trigger": "MARKET",
+            "next_question": "What do you like to buy at the market?",
+            "is_finished": False,
+        },
+        {
+            "scene_to_trigger": "STALL",
+            "next_question": "Who runs that stall?",
+            "is_finished": False,
+        },
+        {
+            "scene_to_trigger": "HOME",
+            "next_question": "What else did you do together?",
+            "is_finished": False,
+        },
+        {
+            "scene_to_trigger": "REFLECTION_POOL",
+            "next_question": "That sounds peaceful. How does it make you feel?",
+            "is_finished": False,
+        },
+    ],
+}
+OUTPUT_SAMPLE_RATE = 24000
+INPUT_SAMPLE_RATE = 16000
+AUDIO_TOKENS_PER_SECOND = 25  # Gemini's documented rate for audio input and output
+CHARS_PER_TOKEN = 4
+START_COMMAND = "START_CONVERSATION"
+
+
+def use_local_backend():
+    """Returns True when AUM_GENAI_BACKEND selects the local stand-in."""
+    return os.getenv("AUM_GENAI_BACKEND", "gemini").lower() == "local"
+
+
+def load_script(path=None):
+    """Returns the script, merged with the JSON file from AUM_LOCAL_GENAI_SCRIPT."""
+    script = json.loads(json.dumps(DEFAULT_SCRIPT))
+    path = path or os.getenv("AUM_LOCAL_GENAI_SCRIPT")
+    if not path:
+        return script
+    try:
+        with open(path, "r") as f:
+            overrides = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.error(f"[LOCAL_GENAI] ERROR: Could not load script '{path}': {e}")
+        return script
+    script["latency"].update(overrides.pop("latency", {}))
+    script.update(overrides)
+    return script
+
+
+def sample_latency(spec):
+    """Draws one delay in seconds from a latency spec (see DEFAULT_SCRIPT)."""
+    if spec is None:
+        return 0.0
+    if isinstance(spec, (int, float)):
+        return max(0.0, float(spec))
+    if "median" in spec:
+        return random.lognormvariate(math.log(spec["median"]), spec.get("sigma", 0.0))
+    if "min" in spec:
+        return random.uniform(spec["min"], spec["max"])
+    return max(0.0, random.gauss(spec["mean"], spec.get("stddev", 0.0)))
+
+
+def _text_tokens(content):
+    """A rough token count of the text in a turn, tool response or instruction."""
+    if not content:
+        return 0
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    return len(content) // CHARS_PER_TOKEN
+
+
+def create_client(api_key=None):
+    """Returns the local stand-in when selected, otherwise a real genai.Client."""
+    if use_local_backend():
+        logging.info("[LOCAL_GENAI] Using the local Gemini stand-in.")
+        return LocalGenaiClient()
+    return genai.Client(api_key=api_key)
+
+
+class LocalLiveSession:
+    """
+    The Live session surface used by AumDirectorApp. After the kickoff turn it
+    plays the scripted visitor: each utterance becomes a process_user_command
+    tool call, and each tool response is answered with silent PCM audio whose
+    length matches the narrative. Microphone audio also starts the
+    conversation, as a visitor speaking would. A session resumed from a handle
+    needs no kickoff; it carries on where its predecessor stopped.
+    """
+
+    def __init__(
+        self,
+        client,
+        resumption=False,
+        resumed_from=None,
+        system_instruction=None,
+        compression=None,
+    ):
+        self.client = client
+        self.script = client.script
+        self.session_id = uuid.uuid4().hex[:8]
+        self.resumption = resumption
+        self.resumed_from = resumed_from
+        self.system_instruction = system_instruction
+        self.compression = compression
+        if resumed_from:
+            self.context_tokens = resumed_from.context_tokens
+        else:
+            self.context_tokens = _text_tokens(system_instruction)
+        self.usage = []  # The UsageMetadata of each model turn
+        self.timeline = []  # (turn, stage, time.monotonic()) for benchmarks
+        self.audio_bytes_received = 0
+        self.finished = asyncio.Event()
+        self.closed = None  # The ConnectionClosed error sends raise once closed
+        self._outbox = asyncio.Queue()
+        self._kickoff = asyncio.Event()
+        self._pending_calls = {}
+        self._handles = 0
+        self._task = None
+
+    @property
+    def started(self):
+        """True once the scripted conversation has been kicked off."""
+        return self._kickoff.is_set()
+
+    def _check_open(self):
+        if self.closed:
+            raise self.closed
+
+    def _receive_error(self):
+        """Like the SDK, receive() reports a closed socket as an APIError."""
+        close = self.closed.rcvd
+        if close:
+            return errors.APIError(close.code, close.reason, None)
+        return errors.APIError(1006, "Abnormal closure.", None)
+
+    # --- Client -> server ---
+    async def send_client_content(self, turns=None, turn_complete=True):
+        self._check_open()
+        self.context_tokens += _text_tokens(turns)
+        if turn_complete:
+            self._kickoff.set()
+
+    async def send_realtime_input(self, audio=None, **kwargs):
+        self._check_open()
+        if audio is not None:
+            data = audio.get("data", b"") if isinstance(audio, dict) else audio.data
+            self.audio_bytes_received += len(data or b"")
+            self.context_tokens += (
+                len(data or b"") / 2 / INPUT_SAMPLE_RATE * AUDIO_TOKENS_PER_SECOND
+            )
+            self._kickoff.set()
+
+    async def send_tool_response(self, function_responses=None):
+        self._check_open()
+        for function_response in function_responses or []:
+            future = self._pending_calls.pop(function_response.id, None)
+            self.context_tokens += _text_tokens(function_response.response)
+            if future and not future.done():
+                future.set_result(function_response.response or {})
+
+    # --- Server -> client ---
+    async def receive(self):
+        """Yields server messages until the end of the current model turn."""
+        while True:
+            if self.closed:
+                raise self._receive_error() from self.closed
+            message = await self._outbox.get()
+            if message is None:
+                raise self._receive_error() from self.closed
+            yield message
+            if message.server_content and message.server_content.turn_complete:
+                return
+
+    # --- Scripted conversation ---
+    def _mark(self, turn, stage):
+        self.timeline.append((turn, stage, time.monotonic()))
+
+    async def _sleep(self, name):
+        delay = sample_latency(self.script["latency"].get(name))
+        await asyncio.sleep(delay * self.script.get("time_scale", 1.0))
+
+    def _end_turn(self, duration):
+        """Returns the usage of a model turn that spoke for `duration` seconds."""
+        prompt = round(self.context_tokens)
+        response = round(duration * AUDIO_TOKENS_PER_SECOND)
+        self.context_tokens += response
+        compression = self.compression
+        if compression and self.context_tokens > (compression.trigger_tokens or 0):
+            # The sliding window drops the oldest turns down to target_tokens.
+            self.context_tokens = compression.sliding_window.target_tokens or 0
+        usage = types.UsageMetadata(
+            prompt_token_count=prompt,
+            response_token_count=response,
+            total_token_count=prompt + response,
+        )
+        self.usage.append(usage)
+        return usage
+
+    async def _speak(self, text):
+        chunk_s = self.script["chunk_ms"] / 1000
+        duration = len(text.split()) / self.script["speech_rate"]
+        chunk_count = max(1, math.ceil(duration / chunk_s))
+        chunk = bytes(int(OUTPUT_SAMPLE_RATE * chunk_s) * 2)
+        for _ in range(chunk_count):
+            self._outbox.put_nowait(
+                types.LiveServerMessage(
+                    server_content=types.LiveServerContent(
+                        model_turn=types.Content(
+                            role="model",
+                            parts=[
+                                types.Part(
+                                    inline_data=types.Blob(
+                                        data=chunk,
+                                        mime_type=f"audio/pcm;rate={OUTPUT_SAMPLE_RATE}",
+                                    )
+                                )
+                            ],
+                        )
+                    )
+                )
+            )
+            await asyncio.sleep(chunk_s * self.script.get("time_scale", 1.0))
+        self._outbox.put_nowait(
+            types.LiveServerMessage(
+                server_content=types.LiveServerContent(
+                    output_transcription=types.Transcription(text=text),
+                    turn_complete=True,
+                ),
+                usage_metadata=self._end_turn(duration),
+            )
+        )
+
+    def _send_resumption_update(self):
+        if not self.resumption:
+            return
+        self._handles += 1
+        handle = f"{self.session_id}-{self._handles}"
+        self.client.handles[handle] = self
+        self._outbox.put_nowait(
+            types.LiveServerMessage(
+                session_resumption_update=types.LiveServerSessionResumptionUpdate(
+                    new_handle=handle, resumable=True
+                )
+            )
+        )
+
+    async def _run_conversation(self):
+        await self._kickoff.wait()
+        loop = asyncio.get_running_loop()
+        utterances = self.script["utterances"]
+        while self.client.next_turn < len(utterances):
+            turn = self.client.next_turn
+            command = utterances[turn]
+            if command != START_COMMAND:
+                await self._sleep("visitor_speech")
+            self._mark(turn, "utterance_end")
+            await self._sleep("tool_call")
+
+            call_id = uuid.uuid4().hex
+            future = loop.create_future()
+            self._pending_calls[call_id] = future
+            self.context_tokens += _text_tokens(command)
+            self._mark(turn, "tool_call_sent")
+            self._outbox.put_nowait(
+                types.LiveServerMessage(
+                    tool_call=types.LiveServerToolCall(
+                        function_calls=[
+                            types.FunctionCall(
+                                id=call_id,
+                                name="process_user_command",
+                                args={"command": command},
+                            )
+                        ]
+                    )
+                )
+            )
+            response = await future
+            self._mark(turn, "tool_response_received")
+
+            await self._sleep("first_audio")
+            self._mark(turn, "first_audio_sent")
+            await self._speak(response.get("narrative", ""))
+            self.client.next_turn = turn + 1
+            self._send_resumption_update()
+        logging.info("[LOCAL_GENAI] Scripted conversation finished.")
+        self.finished.set()
+
+    # --- Connection ---
+    def _close(self, error):
+        if self.closed:
+            return
+        self.closed = error
+        if self._task:
+            self._task.cancel()
+        for future in self._pending_calls.values():
+            future.cancel()
+        self._pending_calls.clear()
+        self._outbox.put_nowait(None)
+
+    def drop(self, reason="keepalive ping timeout"):
+        """Fails the connection: sends raise ConnectionClosedError, receive() an APIError."""
+        self._mark(self.client.next_turn, "dropped")
+        self._close(
+            websockets.exceptions.ConnectionClosedError(Close(1011, reason), None)
+        )
+
+    def go_away(self, time_left=10.0):
+        """Sends a GoAway notice, then drops the connection time_left seconds later."""
+        self._outbox.put_nowait(
+            types.LiveServerMessage(
+                go_away=types.LiveServerGoAway(time_left=f"{time_left}s")
+            )
+        )
+        asyncio.get_running_loop().call_later(time_left, self.drop, "session expired")
+
+    async def __aenter__(self):
+        await self._sleep("connect")
+        if self.resumed_from:
+            # The server keeps one connection per session: resuming closes the old one.
+            self.resumed_from._close(
+                websockets.exceptions.ConnectionClosedOK(
+                    Close(1000, "session resumed"), None
+                )
+            )
+            self._kickoff.set()
+        self._send_resumption_update()
+        self._task = asyncio.create_task(self._run_conversation())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # The server echoes the client's close frame.
+        close = Close(1000, "client closed")
+        self._close(
+            websockets.exceptions.ConnectionClosedOK(close, close, rcvd_then_sent=False)
+        )
+
+
+class _LocalLive:
+    def __init__(self, client):
+        self._client = client
+
+    def connect(self, model=None, config=None):
+        resumption = getattr(config, "session_resumption", None)
+        handle = resumption.handle if resumption else None
+        session = LocalLiveSession(
+            self._client,
+            resumption=resumption is not None,
+            resumed_from=self._client.handles.get(handle),
+            system_instruction=getattr(config, "system_instruction", None),
+            compression=getattr(config, "context_window_compression", None),
+        )
+        self._client.sessions.append(session)
+        return session
+
+
+class _LocalAio:
+    def __init__(self, client):
+        self.live = _LocalLive(client)
+
+
+class _LocalModels:
+    def __init__(self, client):
+        self._client = client
+        self._replies = itertools.cycle(client.script["storyteller_replies"])
+        self._lock = threading.Lock()
+
+    def generate_content(self, model=None, contents=None, config=None):
+        """Blocks for the scripted latency and returns the next Storyteller reply."""
+        script = self._client.script
+        time.sleep(
+            sample_latency(script["latency"].get("generate_content"))
+            * script.get("time_scale", 1.0)
+        )
+        with self._lock:
+            reply = next(self._replies)
+        return types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(
+                        role="model", parts=[types.Part(text=json.dumps(reply))]
+                    )
+                )
+            ]
+        )
+
+
+class LocalGenaiClient:
+    """Mirrors the genai.Client attributes used here: aio.live.connect and models."""
+
+    def __init__(self, script=None):
+        self.script = script or load_script()
+        self.sessions = []
+        self.handles = {}  # Resumption handle -> the session it resumes
+        self.next_turn = 0  # The scripted visitor's next utterance
+        self.aio = _LocalAio(self)
+        self.models = _LocalModels(self)
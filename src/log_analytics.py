@@ -0,0 +1,404 @@
+"""
+Offline latency reports from the director's JSON logs (app.log).
+
+Usage:
+    python -m src.log_analytics app.log* [--format json|csv] [--out FILE]
+                                [--turns turns.csv]
+
+Reads plain and gzipped log files (rotated files included, oldest first by
+modification time) one line at a time and rebuilds:
+
+- turns: from "User speech detected" to the Storyteller's scene or the end
+  of the conversation, with turn and Storyteller latency and the outcome
+- scene executions: duration per scene and the hardware actions in them
+- serial round trips per device and ADB commands
+- WARNING/ERROR rates per [PREFIX]
+
+Latencies go into fixed log-spaced histograms, so memory stays constant
+however many days of logs are read; percentiles are accurate to one bucket
+(about 12%). --turns streams one CSV row per turn as it is rebuilt.
+"""
+
+import argparse
+import collections
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+from .metrics import HistogramValue
+
+# 1 ms to ~170 s, 20 buckets per decade.
+LATENCY_BUCKETS = tuple(0.001 * 10 ** (i / 20) for i in range(106))
+
+# Only lines containing one of these are decoded; the rest are just counted.
+INTERESTING = re.compile(
+    "|".join(
+        re.escape(marker)
+        for marker in (
+            "User speech detected",
+            "[ORCHESTRATOR]",
+            "[HARDWARE] --->",
+            "[HARDWARE] <---",
+            "[HARDWARE] Action",
+            "[HARDWARE] ERROR: ADB",
+        )
+    )
+)
+# Level and [PREFIX] without decoding; main.py's formatter writes them in this order.
+LEVEL_PATTERN = re.compile(r'"levelname": "([A-Z]+)", "message": "(?:\[([A-Z_]+)\])?')
+SERIAL_SENT = re.compile(r'^\[HARDWARE\] ---> Sent to (.+?): "')
+SERIAL_RECEIVED = re.compile(r'^\[HARDWARE\] <--- Received from (.+?): "')
+ACTION_DONE = re.compile(
+    r"^\[HARDWARE\] Action (\w+) on (.+?) (?:failed \((\w+)\)|(\w+)) in (\d+) ms"
+)
+SCENE_STARTED = re.compile(r"^\[ORCHESTRATOR\] ---> Executing actions for scene '(.*)'")
+SCENE_DONE = re.compile(r"^\[ORCHESTRATOR\] <--- Scene '(.*)' done in (\d+) ms")
+STORYTELLER_DONE = re.compile(r"^\[ORCHESTRATOR\] <--- Storyteller replied in (\d+) ms")
+
+Turn = collections.namedtuple(
+    "Turn", "started command outcome turn_ms storyteller_ms scene"
+)
+
+
+class LatencyHistogram:
+    """Count, mean, max and bucketed percentiles of latencies in seconds."""
+
+    def __init__(self):
+        self.values = HistogramValue(LATENCY_BUCKETS)
+        self.max = 0.0
+
+    def observe(self, seconds):
+        seconds = max(0.0, seconds)
+        self.values.observe(seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of values."""
+        rank = fraction * self.values.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.values.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        count = self.values.count
+        if not count:
+            return {"count": 0}
+        return {
+            "count": count,
+            "mean_ms": round(1000 * self.values.sum / count, 1),
+            "p50_ms": round(1000 * self.percentile(0.50), 1),
+            "p95_ms": round(1000 * self.percentile(0.95), 1),
+            "p99_ms": round(1000 * self.percentile(0.99), 1),
+            "max_ms": round(1000 * self.max, 1),
+        }
+
+
+# --- Reading ---
+def ordered_log_files(paths):
+    """Returns the files oldest first; rotated files were last written earlier."""
+    return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+class _Clock:
+    """Parses asctime ("2026-10-19 15:38:48,123") with a per-second cache."""
+
+    def __init__(self):
+        self._second = None
+        self._epoch = 0.0
+
+    def parse(self, asctime):
+        second = asctime[:19]
+        if second != self._second:
+            self._second = second
+            self._epoch = time.mktime(time.strptime(second, "%Y-%m-%d %H:%M:%S"))
+        return self._epoch + int(asctime[20:23] or 0) / 1000
+
+
+# --- Analysis ---
+class LogAnalyzer:
+    """Rebuilds turns and scene executions from log records fed in order."""
+
+    def __init__(self, on_turn=None):
+        self.on_turn = on_turn
+        self.lines = 0
+        self.invalid_lines = 0
+        self.first = None
+        self.last = None
+        self.latency = collections.defaultdict(LatencyHistogram)
+        self.scenes = collections.defaultdict(LatencyHistogram)
+        self.actions = collections.defaultdict(LatencyHistogram)
+        self.serial = collections.defaultdict(LatencyHistogram)
+        self.outcomes = collections.defaultdict(collections.Counter)
+        self.levels = collections.defaultdict(collections.Counter)
+        self._clock = _Clock()
+        self._turn = None
+        self._scene = None  # [name, started, last action seen]
+        self._serial_pending = {}
+        self._adb_pending = None
+
+    # --- Input ---
+    def feed_line(self, line):
+        self.lines += 1
+        level = LEVEL_PATTERN.search(line)
+        if level:
+            self.levels[level.group(2) or "-"][level.group(1)] += 1
+        if not INTERESTING.search(line):
+            return
+        try:
+            record = json.loads(line)
+            timestamp = self._clock.parse(record["asctime"])
+        except (ValueError, KeyError, TypeError):
+            self.invalid_lines += 1
+            return
+        self.feed(timestamp, record.get("levelname", ""), record.get("message", ""))
+
+    def feed(self, timestamp, level, message):
+        if self.first is None:
+            self.first = timestamp
+        self.last = timestamp
+        if message.startswith("[HARDWARE]"):
+            self._hardware(timestamp, message)
+        elif message.startswith("[ORCHESTRATOR]"):
+            self._orchestrator(timestamp, message)
+        elif "---> User speech detected" in message:
+            self._close_turn()
+            command = message.partition(": ")[2]
+            if len(command) >= 2 and command[0] == command[-1] == '"':
+                command = command[1:-1]
+            self._turn = {"started": timestamp, "command": command}
+
+    # --- Turns ---
+    def _end_turn(self, timestamp, outcome):
+        turn = self._turn
+        if turn is None:
+            return
+        if "ended" not in turn:
+            turn["ended"] = timestamp
+            turn["outcome"] = outcome
+        elif outcome != "ok":
+            turn["outcome"] = outcome  # e.g. the scene started, then it finished
+
+    def _close_turn(self):
+        turn, self._turn = self._turn, None
+        if turn is None:
+            return
+        outcome = turn.get("outcome", "incomplete")
+        turn_s = turn["ended"] - turn["started"] if "ended" in turn else None
+        storyteller_s = turn.get("storyteller")
+        if storyteller_s is None and "storyteller_started" in turn and turn_s:
+            storyteller_s = turn["ended"] - turn["storyteller_started"]
+        self.outcomes["turns"][outcome] += 1
+        if turn_s is not None:
+            self.latency["turn"].observe(turn_s)
+        if storyteller_s is not None:
+            self.latency["storyteller"].observe(storyteller_s)
+        if self.on_turn:
+            self.on_turn(
+                Turn(
+                    started=turn["started"],
+                    command=turn["command"],
+                    outcome=outcome,
+                    turn_ms=None if turn_s is None else round(1000 * turn_s),
+                    storyteller_ms=None
+                    if storyteller_s is None
+                    else round(1000 * storyteller_s),
+                    scene=turn.get("scene"),
+                )
+            )
+
+    def _orchestrator(self, timestamp, message):
+        turn = self._turn
+        if match := STORYTELLER_DONE.match(message):
+            if turn is not None:
+                turn["storyteller"] = int(match.group(1)) / 1000
+        elif message.startswith("[ORCHESTRATOR] ---> Calling Gemini API"):
+            if turn is not None:
+                turn["storyteller_started"] = timestamp
+        elif match := SCENE_STARTED.match(message):
+            self._close_scene()
+            self._scene = [match.group(1), timestamp, None]
+            if turn is not None and "scene" not in turn:
+                turn["scene"] = match.group(1)
+                self._end_turn(timestamp, "ok")
+        elif match := SCENE_DONE.match(message):
+            name = match.group(1)
+            self.scenes[name].observe(int(match.group(2)) / 1000)
+            self.outcomes["scenes"][name] += 1
+            if self._scene and self._scene[0] == name:
+                self._scene = None
+        elif "Conversation finished" in message:
+            self._end_turn(timestamp, "finished")
+        elif "Stop command detected" in message:
+            self._end_turn(timestamp, "stop")
+        elif "CRITICAL_ERROR" in message:
+            self._end_turn(timestamp, "error")
+
+    def _close_scene(self):
+        # Logs from before scenes logged their duration: use the last action.
+        scene, self._scene = self._scene, None
+        if scene and scene[2] is not None:
+            self.scenes[scene[0]].observe(scene[2] - scene[1])
+            self.outcomes["scenes"][scene[0]] += 1
+
+    # --- Hardware ---
+    def _hardware(self, timestamp, message):
+        if match := SERIAL_SENT.match(message):
+            device = match.group(1)
+            if device in self._serial_pending:
+                self.outcomes["serial_no_response"][device] += 1
+            self._serial_pending[device] = timestamp
+        elif match := SERIAL_RECEIVED.match(message):
+            sent = self._serial_pending.pop(match.group(1), None)
+            if sent is not None:
+                self.serial[match.group(1)].observe(timestamp - sent)
+        elif match := ACTION_DONE.match(message):
+            action, device, failed, outcome, ms = match.groups()
+            self.actions[action].observe(int(ms) / 1000)
+            self.outcomes[f"action.{action}"][failed or outcome] += 1
+            if self._scene is not None:
+                self._scene[2] = timestamp
+        elif message.startswith("[HARDWARE] ---> Executing ADB command"):
+            self._adb_pending = timestamp
+        elif message.startswith("[HARDWARE] <--- ADB command successful") or (
+            message.startswith("[HARDWARE] ERROR: ADB command failed")
+        ):
+            ok = "successful" in message
+            self.outcomes["adb"]["ok" if ok else "error"] += 1
+            if self._adb_pending is not None:
+                self.latency["adb"].observe(timestamp - self._adb_pending)
+                self._adb_pending = None
+
+    def finish(self):
+        self._close_turn()
+        self._close_scene()
+
+    # --- Output ---
+    def report(self):
+        error_rates = {}
+        for prefix, levels in sorted(self.levels.items()):
+            total = sum(levels.values())
+            problems = levels["WARNING"] + levels["ERROR"] + levels["CRITICAL"]
+            error_rates[prefix] = {
+                "records": total,
+                "warnings": levels["WARNING"],
+                "errors": levels["ERROR"] + levels["CRITICAL"],
+                "problem_rate": round(problems / total, 4) if total else 0.0,
+            }
+        return {
+            "lines": self.lines,
+            "invalid_lines": self.invalid_lines,
+            "first": self.first,
+            "last": self.last,
+            "latency": {
+                name: hist.summary() for name, hist in sorted(self.latency.items())
+            },
+            "scenes": {
+                name: hist.summary() for name, hist in sorted(self.scenes.items())
+            },
+            "actions": {
+                name: hist.summary() for name, hist in sorted(self.actions.items())
+            },
+            "serial": {
+                name: hist.summary() for name, hist in sorted(self.serial.items())
+            },
+            "outcomes": {
+                name: dict(counter) for name, counter in sorted(self.outcomes.items())
+            },
+            "error_rates": error_rates,
+        }
+
+
+def analyze(paths, on_turn=None):
+    """Streams the log files through a LogAnalyzer and returns its report."""
+    analyzer = LogAnalyzer(on_turn)
+    for path in ordered_log_files(paths):
+        with _open(path) as f:
+            for line in f:
+                analyzer.feed_line(line)
+    analyzer.finish()
+    return analyzer.report()
+
+
+CSV_FIELDS = [
+    "group",
+    "name",
+    "count",
+    "mean_ms",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "max_ms",
+]
+
+
+def write_csv(report, out):
+    """Writes the latency distributions as one flat CSV table."""
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for group in ("latency", "scenes", "actions", "serial"):
+        for name, summary in report[group].items():
+            writer.writerow({"group": group, "name": name, **summary})
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Latency and error reports from the director's JSON logs."
+    )
+    parser.add_argument("paths", nargs="+", help="app.log, rotated or .gz files")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--out", help="Write the report here instead of stdout")
+    parser.add_argument("--turns", help="Also write one CSV row per turn here")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    turns_file = open(args.turns, "w", newline="") if args.turns else None
+    on_turn = None
+    if turns_file:
+        turn_writer = csv.writer(turns_file)
+        turn_writer.writerow(Turn._fields)
+
+        def on_turn(turn):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(turn.started))
+            turn_writer.writerow(turn._replace(started=started))
+
+    try:
+        report = analyze(args.paths, on_turn)
+    finally:
+        if turns_file:
+            turns_file.close()
+
+    out = io.StringIO()
+    if args.format == "csv":
+        write_csv(report, out)
+    else:
+        json.dump(report, out, indent=2)
+        out.write("\n")
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            f.write(out.getvalue())
+    else:
+        sys.stdout.write(out.getvalue())
+    logging.info(
+        f"[LOG_ANALYTICS] Read {report['lines']} lines in "
+        f"{time.perf_counter() - started:.1f} s."
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    main()
@@ -0,0 +1,140 @@
+"""
+Non-blocking logging for the director process.
+
+Log calls on the event loop thread only put the record on a bounded queue; a
+QueueListener thread does all formatting and I/O (rotating file, console,
+web socket transport). High-frequency messages are rate limited per logger
+and [PREFIX], and the pipeline counts what it drops.
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import threading
+import time
+
+# Defaults; each can be overridden with the AUM_LOG_* variable of the same name
+# (read when the pipeline is built, after .env has been loaded).
+LOG_QUEUE_SIZE = 10000
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# AUM_LOG_ROTATE_WHEN set to a TimedRotatingFileHandler interval (e.g.
+# "midnight", "H") rotates by time instead of size.
+
+# Records per second (with a burst of twice that) allowed for each
+# logger/[PREFIX] pair. Warnings and errors are never rate limited.
+# Override with e.g. AUM_LOG_RATE_LIMITS="HARDWARE=20,EMULATOR=10".
+DEFAULT_RATE_LIMITS = {"HARDWARE": 50.0}
+PREFIX_PATTERN = re.compile(r"^\[([A-Z_]+)\]")
+
+
+def load_rate_limits(value=None):
+    """Parses AUM_LOG_RATE_LIMITS ("PREFIX=rate,...") over the defaults."""
+    limits = dict(DEFAULT_RATE_LIMITS)
+    value = value if value is not None else os.getenv("AUM_LOG_RATE_LIMITS", "")
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        prefix, _, rate = item.partition("=")
+        try:
+            limits[prefix.strip().strip("[]")] = float(rate)
+        except ValueError:
+            logging.warning(f"[LOGGING] Ignoring invalid rate limit '{item}'.")
+    return limits
+
+
+class RateLimitFilter(logging.Filter):
+    """Token-bucket rate limit per (logger name, [PREFIX]) for INFO and below."""
+
+    def __init__(self, limits=None):
+        super().__init__()
+        self.limits = load_rate_limits() if limits is None else limits
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.suppressed = {}
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or not isinstance(record.msg, str):
+            return True
+        match = PREFIX_PATTERN.match(record.msg)
+        rate = self.limits.get(match.group(1)) if match else None
+        if not rate:
+            return True
+        key = f"{record.name}:{match.group(1)}"
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (2 * rate, now))
+            tokens = min(2 * rate, tokens + (now - updated) * rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                self.suppressed[key] = self.suppressed.get(key, 0) + 1
+                return False
+            self._buckets[key] = (tokens - 1, now)
+        return True
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that drops (and counts) records when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.records_dropped = 0
+        self.max_queue_depth = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.records_dropped += 1
+            return
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+
+class LogPipeline:
+    """The queue, its handler and the listener thread that owns the real handlers."""
+
+    def __init__(self, handlers, queue_size=None, rate_limits=None):
+        queue_size = queue_size or int(
+            os.getenv("AUM_LOG_QUEUE_SIZE", str(LOG_QUEUE_SIZE))
+        )
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.handler = BoundedQueueHandler(self.queue)
+        self.rate_limiter = RateLimitFilter(rate_limits)
+        self.handler.addFilter(self.rate_limiter)
+        self.handlers = list(handlers)
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *self.handlers, respect_handler_level=True
+        )
+
+    def start(self):
+        self.listener.start()
+
+    def stop(self):
+        """Drains the queue, stops the listener thread and closes the handlers."""
+        self.listener.stop()
+        for handler in self.handlers:
+            handler.close()
+
+    def stats(self):
+        """Returns queue depth, dropped records and rate-limited records."""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.handler.max_queue_depth,
+            "records_dropped": self.handler.records_dropped,
+            "records_suppressed": dict(self.rate_limiter.suppressed),
+        }
+
+
+def rotating_file_handler(path):
+    """Returns a size- or time-rotating file handler for `path`."""
+    backup_count = int(os.getenv("AUM_LOG_BACKUP_COUNT", str(LOG_BACKUP_COUNT)))
+    when = os.getenv("AUM_LOG_ROTATE_WHEN", "")
+    if when:
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=when, backupCount=backup_count
+        )
+    return logging.handlers.RotatingFileHandler(
+        path,
+        maxBytes=int(os.getenv("AUM_LOG_MAX_BYTES", str(LOG_MAX_BYTES))),
+        backupCount=backup_count,
+    )
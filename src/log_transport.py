@@ -0,0 +1,200 @@
+"""
+Streams the director's log records straight to the web server over a Unix
+domain socket, so the dashboard doesn't depend on polling app.log.
+
+Records are formatted by the handler's formatter (the same JSON lines that go
+to app.log), collected into batches and written by a background thread as one
+newline-terminated JSON frame per batch:
+
+    {"seq": 7, "sent_at": 1718000000.12, "records": ["{...}", ...], "stats": {...}}
+
+`seq` increases by one per batch, even when a batch is lost, so the receiver
+can count gaps. `stats` carries the sender's counters so both ends can be
+reported together.
+"""
+
+import collections
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+DEFAULT_LOG_SOCKET = "/tmp/aum_director_logs.sock"
+LOG_BATCH_SIZE = 100  # Default; AUM_LOG_BATCH_SIZE overrides it per handler
+LOG_FLUSH_INTERVAL = 0.05  # Seconds a record may wait for its batch to fill
+LOG_BUFFER_LIMIT = 10000  # Records held while the web server is unreachable
+RECONNECT_INTERVAL = 1.0  # Seconds between connection attempts
+SEND_TIMEOUT = 1.0
+
+
+def log_socket_path():
+    return os.getenv("AUM_LOG_SOCKET", DEFAULT_LOG_SOCKET)
+
+
+def encode_frame(seq, records, stats=None):
+    frame = {"seq": seq, "sent_at": time.time(), "records": records}
+    if stats is not None:
+        frame["stats"] = stats
+    return (json.dumps(frame) + "\n").encode("utf-8")
+
+
+def decode_frame(line):
+    """Parses one frame; returns None for anything that isn't a valid frame."""
+    try:
+        frame = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(frame, dict) or not isinstance(frame.get("records"), list):
+        return None
+    return frame
+
+
+class SocketLogHandler(logging.Handler):
+    """
+    A logging handler that never blocks the caller on I/O: emit() only formats
+    and buffers the record; a daemon thread batches and sends. While the web
+    server is down, records stay buffered and go out once it is reachable
+    again; records past buffer_limit, and batches whose send fails, are dropped
+    and counted.
+    """
+
+    def __init__(
+        self,
+        path=None,
+        batch_size=None,
+        flush_interval=LOG_FLUSH_INTERVAL,
+        buffer_limit=LOG_BUFFER_LIMIT,
+    ):
+        super().__init__()
+        self.path = path or log_socket_path()
+        self.batch_size = batch_size or int(
+            os.getenv("AUM_LOG_BATCH_SIZE", str(LOG_BATCH_SIZE))
+        )
+        self.flush_interval = flush_interval
+        self._pending = collections.deque()
+        self._buffer_limit = buffer_limit
+        self._condition = threading.Condition()
+        self._closed = False
+        self._stopping = threading.Event()
+        self._sock = None
+        self._next_connect = 0.0
+        self._seq = 0
+        self.records_sent = 0
+        self.batches_sent = 0
+        self.records_dropped = 0
+        self.send_failures = 0
+        self.total_send_latency = 0.0
+        self.max_send_latency = 0.0
+        self._thread = threading.Thread(
+            target=self._run, name="log-transport", daemon=True
+        )
+        self._thread.start()
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._condition:
+            if len(self._pending) >= self._buffer_limit:
+                self.records_dropped += 1
+                return
+            self._pending.append((line, time.monotonic()))
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    # --- Sender thread ---
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                if self._closed and not self._pending:
+                    return
+            if self._sock is None and not self._connect():
+                if not self._closed:
+                    # Keep the records queued until the next attempt.
+                    self._stopping.wait(max(0.0, self._next_connect - time.monotonic()))
+                    continue
+                if not self._connect(force=True):
+                    self._drop_pending()
+                    return
+            with self._condition:
+                batch = [
+                    self._pending.popleft()
+                    for _ in range(min(self.batch_size, len(self._pending)))
+                ]
+            if batch:
+                self._send(batch)
+
+    def _drop_pending(self):
+        with self._condition:
+            self.records_dropped += len(self._pending)
+            self._pending.clear()
+
+    def _connect(self, force=False):
+        now = time.monotonic()
+        if now < self._next_connect and not force:
+            return False
+        self._next_connect = now + RECONNECT_INTERVAL
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(SEND_TIMEOUT)
+            sock.connect(self.path)
+        except OSError:
+            return False
+        self._sock = sock
+        return True
+
+    def _send(self, batch):
+        self._seq += 1
+        frame = encode_frame(self._seq, [line for line, _ in batch], self.stats())
+        try:
+            self._sock.sendall(frame)
+        except OSError:
+            self.send_failures += 1
+            self.records_dropped += len(batch)
+            self._sock.close()
+            self._sock = None
+            return
+        sent_at = time.monotonic()
+        self.batches_sent += 1
+        self.records_sent += len(batch)
+        for _, queued_at in batch:
+            latency = sent_at - queued_at
+            self.total_send_latency += latency
+            self.max_send_latency = max(self.max_send_latency, latency)
+
+    def stats(self):
+        """Returns the sender's batch, latency and loss counters."""
+        return {
+            "records_sent": self.records_sent,
+            "batches_sent": self.batches_sent,
+            "records_dropped": self.records_dropped,
+            "send_failures": self.send_failures,
+            "pending": len(self._pending),
+            "mean_batch_size": round(self.records_sent / self.batches_sent, 1)
+            if self.batches_sent
+            else 0.0,
+            "mean_send_latency_ms": round(
+                1000 * self.total_send_latency / self.records_sent, 2
+            )
+            if self.records_sent
+            else 0.0,
+            "max_send_latency_ms": round(1000 * self.max_send_latency, 2),
+        }
+
+    def close(self):
+        """Flushes what is buffered (if the server is reachable) and stops the thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._stopping.set()
+        self._thread.join(timeout=SEND_TIMEOUT * 2)
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+        super().close()
@@ -0,0 +1,254 @@
+"""
+Event-loop lag monitor, slow-callback detection and a sampling profiler.
+
+All of the director's work shares one asyncio loop, so one blocking call
+(a synchronous denoise, a serial read) stalls audio for everyone. The
+monitor has two halves:
+
+- A heartbeat coroutine on the loop wakes every `interval` seconds and
+  records how late it woke up (aum_event_loop_lag_seconds).
+- A watchdog thread checks the heartbeat. When the loop has not beaten for
+  `slow_threshold` seconds, it captures the loop thread's stack and the
+  running task while the blocking code is still on the stack, and logs it
+  when the loop recovers (aum_event_loop_stalls_total).
+
+The profiler samples the loop thread's stack from the watchdog thread at
+`rate` Hz while it is running and writes folded stacks ("task;frame;frame
+count" lines) that flamegraph.pl and speedscope read. The loop thread does
+no extra work per sample, so the overhead stays low enough for production.
+"""
+
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from . import metrics
+
+# Defaults; each can be overridden with the AUM_* variable of the same name
+# (read when the monitor or profiler is started, after .env has been loaded).
+LOOP_MONITOR_INTERVAL = 0.1
+SLOW_CALLBACK_MS = 100.0
+PROFILER_RATE = 100.0  # Samples per second
+PROFILE_DIR = "profiles"
+STALL_HISTORY = 50  # Recent stalls kept for stats()
+STACK_DEPTH = 64  # Frames kept per profiler sample
+
+EVENT_LOOP_LAG = metrics.histogram(
+    "aum_event_loop_lag_seconds",
+    "How late a timer on the director's event loop fired.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+EVENT_LOOP_STALLS = metrics.counter(
+    "aum_event_loop_stalls_total",
+    "Times the event loop was blocked longer than the slow-callback threshold.",
+)
+
+Stall = collections.namedtuple("Stall", "started duration_ms task coroutine stack")
+
+
+def _task_names(task):
+    """Returns (task name, coroutine qualname) for a task, or (None, None)."""
+    if task is None:
+        return None, None
+    coro = task.get_coro()
+    return task.get_name(), getattr(coro, "__qualname__", repr(coro))
+
+
+def _fold(frame, limit=STACK_DEPTH):
+    """Returns a frame's stack, outermost first, as "func (file:line)" strings."""
+    frames = []
+    while frame is not None and len(frames) < limit:
+        code = frame.f_code
+        frames.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        )
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+class SamplingProfiler:
+    """Counts folded stacks of one thread; fed by the watchdog thread."""
+
+    def __init__(self, rate=PROFILER_RATE):
+        self.period = 1.0 / rate
+        self.samples = collections.Counter()
+        self.sample_count = 0
+        self.started = None
+
+    def sample(self, frame, task_name):
+        stack = _fold(frame)
+        if task_name:
+            stack.insert(0, f"task:{task_name}")
+        self.samples[";".join(stack)] += 1
+        self.sample_count += 1
+
+    def dump(self, path):
+        """Writes the samples in the folded-stack format; returns the path."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+class LoopMonitor:
+    """Measures event-loop lag and reports what blocked the loop."""
+
+    def __init__(
+        self,
+        interval=None,
+        slow_threshold=None,
+        profile_dir=None,
+    ):
+        self.interval = interval or float(
+            os.getenv("AUM_LOOP_MONITOR_INTERVAL", str(LOOP_MONITOR_INTERVAL))
+        )
+        self.slow_threshold = slow_threshold or (
+            float(os.getenv("AUM_SLOW_CALLBACK_MS", str(SLOW_CALLBACK_MS))) / 1000
+        )
+        self.profile_dir = profile_dir or os.getenv("AUM_PROFILE_DIR", PROFILE_DIR)
+        self.stalls = collections.deque(maxlen=STALL_HISTORY)
+        self.stall_count = 0
+        self.max_lag = 0.0
+        self.profiler = None
+        self.last_profile = None
+        self._loop = None
+        self._loop_thread_id = None
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = None
+        self._watchdog = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    # --- Lifecycle ---
+    def start(self):
+        """Starts the heartbeat on the running loop and the watchdog thread."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopping.clear()
+        self._heartbeat_task = asyncio.create_task(
+            self._heartbeat(), name="loop-monitor-heartbeat"
+        )
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        logging.info(
+            f"[LOOP_MONITOR] Watching the event loop (slow callbacks > {1000 * self.slow_threshold:.0f} ms)."
+        )
+
+    async def stop(self):
+        if self.profiler:
+            self.stop_profiler()
+        self._stopping.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        if self._watchdog:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+            self._watchdog = None
+
+    # --- Loop side ---
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.max_lag = max(self.max_lag, lag)
+            EVENT_LOOP_LAG.observe(lag)
+
+    # --- Watchdog thread ---
+    def _watch(self):
+        # Wake often enough to catch a stall while it is still happening, and
+        # at the profiler's rate while profiling.
+        check = self.slow_threshold / 2
+        stall = None  # [started, task, coroutine, stack] of the current stall
+        while not self._stopping.is_set():
+            profiler = self.profiler
+            self._stopping.wait(profiler.period if profiler else check)
+            frame = None
+            if profiler:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    task_name, _ = _task_names(asyncio.current_task(self._loop))
+                    profiler.sample(frame, task_name)
+
+            blocked = time.monotonic() - self._last_beat - self.interval
+            if blocked >= self.slow_threshold and stall is None:
+                frame = frame or sys._current_frames().get(self._loop_thread_id)
+                task_name, coroutine = _task_names(asyncio.current_task(self._loop))
+                stall = [
+                    time.time() - blocked,
+                    task_name,
+                    coroutine,
+                    traceback.format_stack(frame) if frame else [],
+                ]
+            elif blocked < self.slow_threshold and stall is not None:
+                self._record_stall(stall)
+                stall = None
+            frame = None
+
+    def _record_stall(self, stall):
+        started, task_name, coroutine, stack = stall
+        duration_ms = round(1000 * (time.time() - started), 1)
+        with self._lock:
+            self.stalls.append(
+                Stall(started, duration_ms, task_name, coroutine, "".join(stack))
+            )
+            self.stall_count += 1
+        EVENT_LOOP_STALLS.inc()
+        where = "".join(stack[-3:]).strip()
+        logging.warning(
+            f"[LOOP_MONITOR] Event loop blocked for ~{duration_ms} ms in task "
+            f"'{task_name}' ({coroutine}). Innermost frames:\n{where}"
+        )
+
+    # --- Profiler ---
+    def start_profiler(self, rate=None):
+        """Starts sampling the loop thread; returns False if already running."""
+        if self.profiler:
+            return False
+        rate = rate or float(os.getenv("AUM_PROFILER_RATE", str(PROFILER_RATE)))
+        self.profiler = SamplingProfiler(rate)
+        self.profiler.started = time.time()
+        logging.info(f"[LOOP_MONITOR] Sampling profiler started ({rate:.0f} Hz).")
+        return True
+
+    def stop_profiler(self):
+        """Stops the profiler and writes its folded stacks; returns the file path."""
+        profiler, self.profiler = self.profiler, None
+        if profiler is None:
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(profiler.started))
+        path = profiler.dump(os.path.join(self.profile_dir, f"director-{stamp}.folded"))
+        self.last_profile = path
+        logging.info(
+            f"[LOOP_MONITOR] Profiler stopped after {profiler.sample_count} samples. Wrote {path}"
+        )
+        return path
+
+    def stats(self):
+        """Returns lag, stall and profiler state for the dashboard."""
+        with self._lock:
+            recent = [stall._asdict() for stall in self.stalls]
+        return {
+            "max_lag_ms": round(1000 * self.max_lag, 2),
+            "stalls": self.stall_count,
+            "recent_stalls": recent,
+            "profiling": self.profiler is not None,
+            "profile_samples": self.profiler.sample_count if self.profiler else 0,
+            "last_profile": self.last_profile,
+        }
@@ -1,44 +1,79 @@
 # main.py
 import asyncio
 import logging
+import os
 import sys
 from dotenv import load_dotenv
 from pythonjsonlogger import jsonlogger
 from .live_director import AumDirectorApp
+from .log_pipeline import LogPipeline, rotating_file_handler
+from .log_transport import SocketLogHandler
 
 # Load environment variables from .env file at the very start
 load_dotenv()
 
+STATS_LOG_INTERVAL = 300  # Seconds between logging pipeline statistics lines
+
 
 def setup_logging():
-    """Configures logging to file and console."""
+    """
+    Configures non-blocking logging: the root logger only enqueues records and
+    a background listener writes them to the web server's log socket, the
+    rotating log file and the console.
+    """
     # Get the root logger
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
 
-    # Create a handler for the file
-    file_handler = logging.FileHandler("app.log")
-
     # Create a JSON formatter
     formatter = jsonlogger.JsonFormatter(
         "%(asctime)s %(name)s %(levelname)s %(message)s"
     )
-    file_handler.setFormatter(formatter)
+    handlers = []
+
+    # Stream records to the web dashboard without going through the disk
+    if os.getenv("AUM_LOG_TRANSPORT", "socket") == "socket":
+        transport_handler = SocketLogHandler()
+        transport_handler.setFormatter(formatter)
+        handlers.append(transport_handler)
 
-    # Clear existing handlers and add the new one
+    # The log file is optional when the socket transport is used
+    log_file = os.getenv("AUM_LOG_FILE", "app.log")
+    if log_file:
+        file_handler = rotating_file_handler(log_file)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    # Also log to the console for local debugging
+    handlers.append(logging.StreamHandler(sys.stdout))
+
+    # Clear existing handlers and route everything through the queue
     if logger.hasHandlers():
         logger.handlers.clear()
-    logger.addHandler(file_handler)
+    pipeline = LogPipeline(handlers)
+    logger.addHandler(pipeline.handler)
+    pipeline.start()
+    return pipeline
 
-    # Also log to the console for local debugging
-    logger.addHandler(logging.StreamHandler(sys.stdout))
+
+async def log_pipeline_stats(pipeline):
+    """Periodically logs queue depth, dropped and rate-limited record counts."""
+    while True:
+        await asyncio.sleep(STATS_LOG_INTERVAL)
+        logging.info(f"[LOGGING] Stats: {pipeline.stats()}")
 
 
 async def main():
     """The main entry point for the application."""
-    setup_logging()
-    app = AumDirectorApp()
-    await app.run()
+    pipeline = setup_logging()
+    stats_task = asyncio.create_task(log_pipeline_stats(pipeline))
+    try:
+        app = AumDirectorApp()
+        await app.run()
+    finally:
+        stats_task.cancel()
+        logging.info(f"[LOGGING] Final stats: {pipeline.stats()}")
+        pipeline.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+"""
+Counters, gauges and fixed-bucket histograms for the director and web server.
+
+Metrics are created once at import time (module-level constants) and updated
+in place: an update is an attribute increment or a bisect into a short bucket
+list, with no locks and no allocation, so it is cheap enough for every audio
+chunk. Updates come from the event loop thread; the rare update from a worker
+thread can at worst lose one count under the GIL.
+
+    SERIAL_ROUND_TRIP = metrics.histogram(
+        "aum_serial_round_trip_seconds", "...", labelnames=("device",)
+    )
+    SERIAL_ROUND_TRIP.labels("Robotic Arm Controller").observe(0.104)
+
+`snapshot()` returns a JSON-serializable copy of every metric (pushed by the
+director to the web server), and `render_prometheus` turns snapshots into the
+Prometheus text exposition format.
+"""
+
+import bisect
+import time
+
+# Upper bounds in seconds, for latencies from serial round trips to AI turns.
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _Timer:
+    """Context manager that observes the elapsed time into a histogram."""
+
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def sample(self):
+        return {"value": self.value}
+
+
+class GaugeValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def sample(self):
+        return {"value": self.value}
+
+
+class HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+    def sample(self):
+        return {"counts": list(self.counts), "sum": self.sum, "count": self.count}
+
+
+class MetricFamily:
+    """One named metric and its children, one per combination of label values."""
+
+    def __init__(self, kind, name, help_text, labelnames=(), buckets=None):
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets or DEFAULT_BUCKETS)
+        self._children = {}
+        self._default = None if self.labelnames else self.labels()
+
+    def _new_value(self):
+        if self.kind == "counter":
+            return CounterValue()
+        if self.kind == "gauge":
+            return GaugeValue()
+        return HistogramValue(self.buckets)
+
+    def labels(self, *values):
+        """Returns the child for these label values; callers on hot paths keep it."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {values}."
+            )
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_value()
+        return child
+
+    # Shortcuts for metrics without labels.
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def set(self, value):
+        self._default.set(value)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def snapshot(self):
+        snapshot = {
+            "type": self.kind,
+            "help": self.help,
+            "samples": [
+                {"labels": dict(zip(self.labelnames, key)), **child.sample()}
+                for key, child in list(self._children.items())
+            ],
+        }
+        if self.kind == "histogram":
+            snapshot["buckets"] = list(self.buckets)
+        return snapshot
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.families = {}
+        self.collectors = []
+
+    def _get_or_create(self, kind, name, help_text, labelnames, buckets=None):
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = MetricFamily(
+                kind, name, help_text, labelnames, buckets
+            )
+        elif family.kind != kind:
+            raise ValueError(f"Metric {name} is already a {family.kind}.")
+        return family
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get_or_create("counter", name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._get_or_create("gauge", name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=None):
+        return self._get_or_create("histogram", name, help_text, labelnames, buckets)
+
+    def register_collector(self, collector):
+        """Adds a function called before each snapshot, e.g. to set gauges."""
+        self.collectors.append(collector)
+
+    def snapshot(self):
+        """Returns every metric as a JSON-serializable dict keyed by name."""
+        for collector in list(self.collectors):
+            collector()
+        return {name: family.snapshot() for name, family in self.families.items()}
+
+
+REGISTRY = MetricsRegistry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+register_collector = REGISTRY.register_collector
+snapshot = REGISTRY.snapshot
+
+
+# --- Exposition ---
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=None):
+    labels = {**labels, **(extra or {})}
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        + "}"
+    )
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(*snapshots):
+    """Renders one or more snapshots in the Prometheus text format (0.0.4)."""
+    lines = []
+    for families in snapshots:
+        for name, family in families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for sample in family["samples"]:
+                labels = sample["labels"]
+                if family["type"] != "histogram":
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(sample['value'])}"
+                    )
+                    continue
+                cumulative = 0
+                bounds = family["buckets"] + [float("inf")]
+                for bound, count in zip(bounds, sample["counts"]):
+                    cumulative += count
+                    le = {"le": _format_value(bound)}
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labels, le)} {cumulative}"
+                    )
+                lines.append(
+                    f"{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}"
+                )
+                lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+    return "\n".join(lines) + "\n"
@@ -2,9 +2,11 @@ import asyncio
 import json
 import logging
 import os
-from google import genai
+import time
 from google.genai import types
+from . import metrics, tracing
 from .hardware_controller import HardwareManager
+from .local_genai import create_client, use_local_backend
 
 # --- Scene to Action Mapping ---
 SCENE_ACTIONS = {
@@ -66,8 +68,35 @@ SCENE_ACTIONS = {
 }
 
 
+# --- Metrics ---
+TURN_SECONDS = metrics.histogram(
+    "aum_turn_seconds", "Time to process one visitor turn, Storyteller call included."
+)
+TURNS = metrics.counter(
+    "aum_turns_total", "Visitor turns by how they ended.", labelnames=("outcome",)
+)
+STORYTELLER_SECONDS = metrics.histogram(
+    "aum_storyteller_seconds", "Latency of the Storyteller generate_content call."
+)
+CONVERSATION_TURN = metrics.gauge(
+    "aum_conversation_turn", "Turn number of the current conversation."
+)
+
+
 # --- Helper Functions ---
 async def _execute_scene_actions(scene_name, hardware_manager):
+    started = time.perf_counter()
+    with tracing.span("execute_scene", scene=str(scene_name)):
+        await _run_scene_actions(scene_name, hardware_manager)
+    if SCENE_ACTIONS.get(scene_name):
+        # Read by src/log_analytics.py for per-scene timing.
+        logging.info(
+            f"[ORCHESTRATOR] <--- Scene '{scene_name}' done in "
+            f"{1000 * (time.perf_counter() - started):.0f} ms."
+        )
+
+
+async def _run_scene_actions(scene_name, hardware_manager):
     actions_to_run = SCENE_ACTIONS.get(scene_name)
     if not actions_to_run:
         logging.info(f"[ORCHESTRATOR] No actions defined for scene: {scene_name}")
@@ -113,7 +142,14 @@ async def _get_model_response(client, system_prompt, history):
         contents=contents,
         config=config,
     )
-    return await asyncio.wait_for(api_call, timeout=8.0)
+    started = time.perf_counter()
+    with STORYTELLER_SECONDS.time(), tracing.span("storyteller"):
+        response = await asyncio.wait_for(api_call, timeout=8.0)
+    logging.info(
+        f"[ORCHESTRATOR] <--- Storyteller replied in "
+        f"{1000 * (time.perf_counter() - started):.0f} ms."
+    )
+    return response
 
 
 def _parse_json_from_text(text: str):
@@ -128,17 +164,19 @@ def _parse_json_from_text(text: str):
 class StatefulOrchestrator:
     """Manages the multi-turn conversation, state, and hardware orchestration."""
 
-    def __init__(self):
+    def __init__(self, hardware=None, client=None):
         api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
+        if not client and not api_key and not use_local_backend():
             raise ValueError("GEMINI_API_KEY environment variable not set.")
-        self.client = genai.Client(api_key=api_key)
-        self.hardware = HardwareManager()
+        self.client = client or create_client(api_key)
+        self.hardware = hardware or HardwareManager()
         with open("prompts/BOB_STORYTELLER.md", "r") as f:
             self.system_prompt = f.read()
         self.background_tasks = set()
         self.conversation_history = []
         self.turn_number = 0
+        # What Bob was last asked to say while a conversation is in progress.
+        self.last_narrative = None
         self.stop_commands = [
             "stop",
             "i want to stop",
@@ -151,15 +189,29 @@ class StatefulOrchestrator:
     def _reset_conversation(self):
         self.conversation_history = []
         self.turn_number = 0
+        self.last_narrative = None
+        CONVERSATION_TURN.set(0)
         logging.info("[ORCHESTRATOR] Conversation has been reset.")
 
     async def process_user_input(self, user_prompt: str, director):
         """
         Processes user input, manages conversation state, and triggers all actions.
         """
+        started = time.perf_counter()
+        with tracing.span("process_user_input", turn=self.turn_number) as span:
+            result = await self._process_user_input(user_prompt, director)
+            span.set("is_story_finished", result["is_story_finished"])
+        if not result["is_story_finished"]:
+            self.last_narrative = result["narrative"]
+        TURN_SECONDS.observe(time.perf_counter() - started)
+        CONVERSATION_TURN.set(self.turn_number)
+        return result
+
+    async def _process_user_input(self, user_prompt: str, director):
         # 1. Handle the special command to start the conversation
         if user_prompt == "START_CONVERSATION":
             self._reset_conversation()
+            TURNS.labels("start").inc()
             logging.info("[ORCHESTRATOR] Starting new conversation.")
             return {
                 "narrative": "Hello! I'm Bob. I live here in this town, but I'm so curious about your world. Can you tell me about a place that makes you happy?",
@@ -176,6 +228,7 @@ class StatefulOrchestrator:
             await director.send_qr_command_to_web()
             await _execute_end_scene(self.hardware)
             self._reset_conversation()
+            TURNS.labels("stop").inc()
             return {
                 "narrative": "Thank you for sharing your world with me!",
                 "is_story_finished": True,
@@ -212,12 +265,15 @@ class StatefulOrchestrator:
                 # await director.send_qr_command_to_web()
                 await _execute_end_scene(self.hardware)
                 self._reset_conversation()
+                TURNS.labels("finished").inc()
                 return {"narrative": question, "is_story_finished": True}
             else:
+                TURNS.labels("ok").inc()
                 return {"narrative": question, "is_story_finished": False}
 
         except Exception as e:
             logging.error(f"[ORCHESTRATOR] CRITICAL_ERROR: {e}")
+            TURNS.labels("error").inc()
             # await director.send_qr_command_to_web()
             self._reset_conversation()
             return {
@@ -225,6 +281,23 @@ class StatefulOrchestrator:
                 "is_story_finished": True,
             }
 
+    def resume_context(self):
+        """
+        Returns a message that lets a new Live session pick up the conversation
+        in progress, or None between visitors. The Storyteller's state stays
+        here, so only the Live model has to be told where things stand.
+        """
+        if self.last_narrative is None:
+            return None
+        answers = "; ".join(f'"{answer}"' for answer in self.conversation_history)
+        return (
+            "The connection was interrupted while you were talking with a visitor. "
+            "Do not call process_user_command with START_CONVERSATION and do not "
+            f"greet them again. Their answers so far: {answers or 'none yet'}. "
+            f'Repeat the last thing you said to them: "{self.last_narrative}" '
+            "Then relay their next answer with process_user_command as usual."
+        )
+
     async def execute_scene_by_name(self, scene_name: str):
         """A direct method to execute a scene's actions, bypassing the AI."""
         task = asyncio.create_task(_execute_scene_actions(scene_name, self.hardware))
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+import serial.tools.list_ports
+
+# --- Known USB Identifiers ---
+# Each device is matched by serial number first (when configured), then by VID/PID.
+DEVICE_SIGNATURES = {
+    "main_scene": {
+        "name": "Main Scene Controller",
+        "serial_env": "MAIN_CONTROLLER_SERIAL",
+        "vid_pids": {
+            (0x2341, 0x0010),  # Arduino Mega 2560
+            (0x2341, 0x0042),  # Arduino Mega 2560 R3
+            (0x2A03, 0x0010),  # Arduino Mega 2560 (arduino.org)
+            (0x2A03, 0x0042),  # Arduino Mega 2560 R3 (arduino.org)
+        },
+    },
+    "robotic_arm": {
+        "name": "Robotic Arm Controller",
+        "serial_env": "ROBOTIC_ARM_SERIAL",
+        "vid_pids": {
+            (0x0483, 0x5740),  # ROBOTIS OpenCR (STM32 virtual COM port)
+        },
+    },
+}
+
+DEFAULT_CACHE_PATH = ".port_cache.json"
+
+
+def _cache_path():
+    return os.getenv("AUM_PORT_CACHE", DEFAULT_CACHE_PATH)
+
+
+def load_port_cache(path=None):
+    """Loads the cached device map, returning an empty map if it is missing or corrupt."""
+    try:
+        with open(path or _cache_path(), "r") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_port_cache(cache, path=None):
+    """Writes the device map atomically so a crash never leaves a half-written file."""
+    path = path or _cache_path()
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"[HARDWARE] Could not write port cache '{path}': {e}")
+
+
+def _port_identity(port):
+    """Returns the cacheable identity of a pyserial ListPortInfo object."""
+    return {
+        "device": port.device,
+        "vid": port.vid,
+        "pid": port.pid,
+        "serial_number": port.serial_number,
+        "location": port.location,
+    }
+
+
+def match_device(key, ports):
+    """Returns the first port matching the device signature, preferring serial numbers."""
+    signature = DEVICE_SIGNATURES[key]
+    wanted_serial = os.getenv(signature["serial_env"])
+    if wanted_serial:
+        for port in ports:
+            if port.serial_number == wanted_serial:
+                return port
+        return None
+    for port in ports:
+        if (port.vid, port.pid) in signature["vid_pids"]:
+            return port
+    return None
+
+
+def _describe_device(device):
+    """
+    Reads the USB identity of a single device node without a full scan.
+    Only Linux exposes this cheaply (via sysfs); elsewhere None is returned.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        from serial.tools.list_ports_linux import SysFS
+
+        return SysFS(device)
+    except Exception:
+        return None
+
+
+def _find_port(device, ports):
+    """Returns the scanned port for a device node (or a symlink to it), if any."""
+    path = os.path.realpath(device)
+    for port in ports:
+        if os.path.realpath(port.device) == path:
+            return port
+    return None
+
+
+def _entry_matches(key, entry, port):
+    """Checks a device node's USB identity against the signature and cache entry."""
+    if port is None or port.vid is None:
+        # Not a USB serial device (e.g. an emulator pty): nothing to check.
+        return True
+    if match_device(key, [port]) is None:
+        return False
+    if entry.get("serial_number") and port.serial_number != entry["serial_number"]:
+        return False
+    return True
+
+
+class PortDiscovery:
+    """Resolves device ports from the on-disk cache, falling back to a USB scan."""
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or _cache_path()
+        self.timings = {}
+        self._cache = None
+        self._scan_task = None
+
+    def _timed(self, step, started):
+        self.timings[step] = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _scan(self):
+        """Enumerates serial ports once, shared by every device being resolved."""
+        if self._scan_task is None:
+
+            async def scan():
+                started = time.perf_counter()
+                ports = await asyncio.to_thread(serial.tools.list_ports.comports)
+                self._timed("scan", started)
+                return ports
+
+            self._scan_task = asyncio.create_task(scan())
+        return await self._scan_task
+
+    async def _check(self, key, entry):
+        """Returns the entry's device node if it exists and still belongs to `key`."""
+        device = entry.get("device") if isinstance(entry, dict) else None
+        if not device or not await asyncio.to_thread(os.path.exists, device):
+            return None
+        port = await asyncio.to_thread(_describe_device, device)
+        if port is None:
+            # No cheap per-device lookup here (e.g. macOS): a re-enumeration
+            # can swap two boards' nodes, so check the node in a full scan.
+            port = _find_port(device, await self._scan())
+        return device if _entry_matches(key, entry, port) else None
+
+    async def verify(self, key, device):
+        """True if `device` exists and, as far as it can be identified, is `key`."""
+        return await self._check(key, {"device": device}) is not None
+
+    async def _resolve(self, key):
+        started = time.perf_counter()
+        entry = self._cache.get(key)
+        if entry:
+            device = await self._check(key, entry)
+            if device:
+                self._timed(f"{key}.cache_hit", started)
+                return device, False
+
+        ports = await self._scan()
+        port = match_device(key, ports)
+        self._timed(f"{key}.scan_match", started)
+        if port is None:
+            return None, False
+        self._cache[key] = _port_identity(port)
+        return port.device, True
+
+    async def discover(self, keys=None, refresh=False):
+        """
+        Resolves every requested device concurrently. Returns {key: device or
+        None}. With `refresh` the cache is ignored: every device is scanned for
+        and the cache is rewritten from the results.
+        """
+        keys = list(keys or DEVICE_SIGNATURES)
+        total_started = time.perf_counter()
+        self.timings = {}
+
+        if refresh:
+            self._cache = {}
+        else:
+            started = time.perf_counter()
+            self._cache = await asyncio.to_thread(load_port_cache, self.cache_path)
+            self._timed("cache_load", started)
+
+        results = await asyncio.gather(*(self._resolve(key) for key in keys))
+
+        if refresh or any(changed for _, changed in results):
+            started = time.perf_counter()
+            await asyncio.to_thread(save_port_cache, self._cache, self.cache_path)
+            self._timed("cache_save", started)
+
+        self._timed("total", total_started)
+        resolved = {key: device for key, (device, _) in zip(keys, results)}
+        for key, device in resolved.items():
+            name = DEVICE_SIGNATURES[key]["name"]
+            if device:
+                logging.info(f"[HARDWARE] Discovered {name} on port: {device}")
+            else:
+                logging.warning(f"[HARDWARE] Could not discover a port for {name}.")
+        logging.info(f"[HARDWARE] Port discovery timings (ms): {self.timings}")
+        return resolved
+
+
+async def discover_ports(keys=None, cache_path=None, refresh=False):
+    """Convenience wrapper returning ({key: device}, timings) for the given devices."""
+    discovery = PortDiscovery(cache_path)
+    resolved = await discovery.discover(keys, refresh=refresh)
+    return resolved, discovery.timings
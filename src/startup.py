@@ -0,0 +1,164 @@
+"""
+Concurrent director startup with a per-phase timing report.
+
+A cold start used to run one step after another: import SciPy (through
+noisereduce), open the serial ports (up to PORT_WAIT_TIMEOUT seconds each
+when a board is missing), then read the system prompt and connect to
+Gemini. Only the Gemini connect needs another step (the prompt), so
+StartupPlan starts each one as a task as soon as it is added and times it:
+
+- Blocking phases are the ones Bob needs before he can greet a visitor
+  (loading the system prompt, the Live session that is opened with it as
+  its system instruction, the audio devices). ready() waits for them and
+  logs the report. The slowest one is the critical path of the cold start.
+- Background phases (serial ports, the web control socket, the denoiser
+  import) are logged when they finish, even after ready(). Commands sent
+  before a port is open are mocked, as they are after a port times out.
+  The microphone is muted while Bob speaks his greeting, so the denoiser
+  only has to be loaded by the time he stops.
+
+import_module() imports heavy modules on a worker thread. The loop keeps
+serving the other phases while SciPy loads.
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import importlib
+import logging
+import time
+
+from . import metrics
+
+STARTUP_PHASE_SECONDS = metrics.gauge(
+    "aum_startup_phase_seconds",
+    "Duration of each director startup phase in the last cold start.",
+    labelnames=("phase",),
+)
+STARTUP_READY_SECONDS = metrics.gauge(
+    "aum_startup_ready_seconds",
+    "Time from the start of the director's run to ready in the last cold start.",
+)
+
+# started_s is the offset from the start of the plan; status is "ok" or "failed".
+PhaseTiming = collections.namedtuple(
+    "PhaseTiming", "name started_s seconds blocking status error"
+)
+
+_import_executor = None
+_imports = {}  # Module name -> concurrent.futures.Future
+
+
+def preload(*names):
+    """Starts importing modules on the import thread; returns immediately."""
+    global _import_executor
+    if _import_executor is None:
+        # One thread: imports hold the GIL, so parallel imports gain nothing.
+        _import_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="aum-import"
+        )
+    for name in names:
+        if name not in _imports:
+            _imports[name] = _import_executor.submit(importlib.import_module, name)
+
+
+async def import_module(name):
+    """Returns the module, waiting for its background import if needed."""
+    preload(name)
+    return await asyncio.wrap_future(_imports[name])
+
+
+async def import_modules(*names):
+    """Imports several modules in the background; returns them in order."""
+    preload(*names)
+    return [await import_module(name) for name in names]
+
+
+class StartupPlan:
+    """Runs startup phases concurrently and reports how long each one took."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.ready_s = None
+        self._tasks = {}
+        self._blocking = set()
+        self._timings = {}
+
+    def add(self, name, awaitable, blocking=True):
+        """Starts a phase now. Background phases (blocking=False) never raise."""
+        self._tasks[name] = asyncio.ensure_future(self._run(name, awaitable, blocking))
+        if blocking:
+            self._blocking.add(name)
+
+    async def _run(self, name, awaitable, blocking):
+        started = time.monotonic()
+        try:
+            result = await awaitable
+        except Exception as e:
+            self.record(name, started, blocking, error=e)
+            if blocking:
+                raise
+            return None
+        self.record(name, started, blocking)
+        return result
+
+    def record(self, name, started, blocking=True, error=None):
+        """Records a phase that began at `started` (time.monotonic()) and ended now."""
+        seconds = time.monotonic() - started
+        self._timings[name] = PhaseTiming(
+            name,
+            round(started - self.started, 3),
+            round(seconds, 3),
+            blocking,
+            "failed" if error else "ok",
+            str(error) if error else None,
+        )
+        STARTUP_PHASE_SECONDS.labels(name).set(seconds)
+        after_ready = " (after ready)" if self.ready_s is not None else ""
+        if error:
+            logging.error(
+                f"[STARTUP] Phase '{name}' failed after {seconds:.2f}s{after_ready}: {error}"
+            )
+        else:
+            logging.info(
+                f"[STARTUP] Phase '{name}' done in {seconds:.2f}s{after_ready}."
+            )
+
+    async def result(self, name):
+        """Waits for a phase added with add() and returns its result."""
+        return await self._tasks[name]
+
+    async def ready(self):
+        """Waits for every blocking phase, then logs and returns the report."""
+        await asyncio.gather(*(self._tasks[name] for name in self._blocking))
+        self.ready_s = time.monotonic() - self.started
+        STARTUP_READY_SECONDS.set(self.ready_s)
+        report = self.report()
+        phases = ", ".join(
+            f"{timing['name']} {timing['seconds']:.2f}s" for timing in report["phases"]
+        )
+        pending = "".join(f", {name} pending" for name in report["pending"])
+        logging.info(
+            f"[STARTUP] Ready in {self.ready_s:.2f}s "
+            f"(critical path: {report['critical_path']}): {phases}{pending}."
+        )
+        return report
+
+    def report(self):
+        """Returns the phase timings so far, the critical path and ready time."""
+        timings = sorted(self._timings.values(), key=lambda timing: timing.started_s)
+        blocking = [timing for timing in timings if timing.blocking]
+        critical = max(blocking, key=lambda timing: timing.seconds, default=None)
+        return {
+            "ready_s": None if self.ready_s is None else round(self.ready_s, 3),
+            "critical_path": critical.name if critical else None,
+            "phases": [timing._asdict() for timing in timings],
+            "pending": [name for name in self._tasks if name not in self._timings],
+        }
+
+    async def cancel(self):
+        """Cancels the phases that are still running (e.g. a port being waited on)."""
+        pending = [task for task in self._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
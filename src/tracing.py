@@ -0,0 +1,431 @@
+"""
+Per-turn tracing: nested spans tied together by a turn (trace) ID.
+
+The director starts a trace for each visitor turn; everything awaited
+inside it (orchestrator, Storyteller call, scene actions, serial commands)
+opens child spans. The current span lives in a contextvar, so it follows
+the turn through awaits and into tasks created inside it, such as the
+background scene actions.
+
+    with tracing.start_trace("turn", command=command):
+        ...
+        with tracing.span("storyteller"):
+            ...
+
+Outside a trace `span()` returns a shared no-op span, so instrumented code
+costs almost nothing when no turn is running (jog commands, idle audio).
+Finished spans go to a queue and a background thread appends them to
+AUM_TRACE_FILE as OTLP/JSON lines (the OpenTelemetry collector's file
+exporter format).
+
+Print the critical path of each turn with:
+    python -m src.tracing [traces.jsonl ...] [--trace ID] [--last N] [--json]
+"""
+
+import argparse
+import collections
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+TRACE_FILE = "traces.jsonl"  # Default; AUM_TRACE_FILE overrides it
+SERVICE_NAME = "aum-director"
+
+_current_span = contextvars.ContextVar("aum_current_span", default=None)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """One timed operation. Use as a context manager; see span()."""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "error",
+        "_token",
+    )
+
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _exporter.export(self)
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def tracing_enabled():
+    """AUM_TRACING=0 turns tracing off; read per turn, so .env applies."""
+    return os.getenv("AUM_TRACING", "1") != "0"
+
+
+def trace_file():
+    return os.getenv("AUM_TRACE_FILE", TRACE_FILE)
+
+
+def start_trace(name, **attributes):
+    """Returns the root span of a new trace (one visitor turn)."""
+    if not tracing_enabled():
+        return NOOP_SPAN
+    return Span(name, f"{random.getrandbits(128):032x}", None, attributes)
+
+
+def span(name, **attributes):
+    """Returns a child of the current span, or a no-op span outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, attributes)
+
+
+def current_trace_id():
+    current = _current_span.get()
+    return current.trace_id if current else None
+
+
+# --- Export ---
+class TraceExporter:
+    """
+    Appends finished spans to a file from a background thread. Without a
+    path, AUM_TRACE_FILE is read when the first span is exported.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.queue = queue.Queue()
+        self.spans_written = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        self.queue.put(span)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self.path = self.path or trace_file()
+                    self._thread = threading.Thread(
+                        target=self._write, name="trace-exporter", daemon=True
+                    )
+                    self._thread.start()
+
+    def _write(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            document = {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                {
+                                    "key": "service.name",
+                                    "value": {"stringValue": SERVICE_NAME},
+                                }
+                            ]
+                        },
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": "aum.tracing"},
+                                "spans": [span.to_otlp() for span in batch],
+                            }
+                        ],
+                    }
+                ]
+            }
+            try:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(document) + "\n")
+                self.spans_written += len(batch)
+            except OSError as e:
+                logging.error(f"[TRACING] Could not write spans to {self.path}: {e}")
+            for _ in batch:
+                self.queue.task_done()
+
+    def flush(self):
+        """Blocks until every exported span has been written."""
+        self.queue.join()
+
+
+_exporter = TraceExporter()
+
+
+def set_exporter(exporter):
+    """Replaces the exporter (e.g. to write to another file); returns the old one."""
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    return previous
+
+
+def flush():
+    _exporter.flush()
+
+
+# --- Analysis ---
+SpanRecord = collections.namedtuple(
+    "SpanRecord", "trace_id span_id parent_id name start end attributes error"
+)
+
+
+def _attribute_value(value):
+    for kind in ("stringValue", "boolValue", "doubleValue"):
+        if kind in value:
+            return value[kind]
+    if "intValue" in value:
+        return int(value["intValue"])
+    return None
+
+
+def read_spans(paths):
+    """Yields SpanRecords from OTLP/JSON trace files; times are in seconds."""
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                document = json.loads(line)
+                for resource in document.get("resourceSpans", []):
+                    for scope in resource.get("scopeSpans", []):
+                        for span in scope.get("spans", []):
+                            yield SpanRecord(
+                                trace_id=span["traceId"],
+                                span_id=span["spanId"],
+                                parent_id=span.get("parentSpanId"),
+                                name=span["name"],
+                                start=int(span["startTimeUnixNano"]) / 1e9,
+                                end=int(span["endTimeUnixNano"]) / 1e9,
+                                attributes={
+                                    a["key"]: _attribute_value(a["value"])
+                                    for a in span.get("attributes", [])
+                                },
+                                error=span.get("status", {}).get("message"),
+                            )
+
+
+def _walk(span, end, depth, children, path):
+    """
+    Adds `span` (clipped to `end`) and, recursively, the children it waited
+    on: walking back from its end, the child that ended last, then the child
+    that ended last before that one started, and so on.
+    """
+    entry = [span, depth, end - span.start, 0.0]
+    path.append(entry)
+    waited_on = []
+    cursor = end
+    kids = sorted(children.get(span.span_id, ()), key=lambda child: -child.end)
+    for child in kids:
+        if child.start >= cursor:
+            continue
+        waited_on.append((child, min(child.end, cursor)))
+        cursor = child.start
+    covered = 0.0
+    for child, child_end in reversed(waited_on):
+        covered += child_end - child.start
+        _walk(child, child_end, depth + 1, children, path)
+    entry[3] = max(0.0, entry[2] - covered)
+
+
+def critical_path(root, children):
+    """
+    Returns the critical path of `root` in start order as (span, depth,
+    seconds on the path, self seconds) tuples: the spans whose time added up
+    to the root's duration, as opposed to work that ran alongside them.
+    """
+    path = []
+    _walk(root, root.end, 0, children, path)
+    return [tuple(entry) for entry in path]
+
+
+def _hops(path):
+    return [
+        {
+            "name": span.name,
+            "depth": depth,
+            "duration_ms": round(1000 * duration, 2),
+            "self_ms": round(1000 * self_time, 2),
+            "attributes": span.attributes,
+        }
+        for span, depth, duration, self_time in path
+    ]
+
+
+def summarize_traces(spans):
+    """Groups spans by trace; returns one summary per turn, oldest first."""
+    traces = collections.defaultdict(list)
+    for span in spans:
+        traces[span.trace_id].append(span)
+    summaries = []
+    for trace_id, trace_spans in traces.items():
+        by_id = {span.span_id: span for span in trace_spans}
+        children = collections.defaultdict(list)
+        root = None
+        for span in trace_spans:
+            if span.parent_id is None:
+                root = span
+            else:
+                children[span.parent_id].append(span)
+        if root is None:
+            continue  # The turn is still running or its root was lost
+        # Work started in the background (scene actions) that outlived its
+        # parent is reported separately: it did not delay the response.
+        background = [
+            span
+            for span in trace_spans
+            if span.parent_id in by_id
+            and span.end > by_id[span.parent_id].end
+            and by_id[span.parent_id].end <= root.end
+        ]
+        for span in background:
+            children[span.parent_id].remove(span)
+        summaries.append(
+            {
+                "trace_id": trace_id,
+                "name": root.name,
+                "attributes": root.attributes,
+                "started": root.start,
+                "turn_ms": round(1000 * (root.end - root.start), 2),
+                "total_ms": round(
+                    1000 * (max(span.end for span in trace_spans) - root.start), 2
+                ),
+                "spans": len(trace_spans),
+                "errors": [span.name for span in trace_spans if span.error],
+                "critical_path": _hops(critical_path(root, children)),
+                "background": [
+                    {
+                        "name": span.name,
+                        "ends_after_turn_ms": round(1000 * (span.end - root.end), 2),
+                        "critical_path": _hops(critical_path(span, children)),
+                    }
+                    for span in sorted(background, key=lambda span: span.start)
+                ],
+            }
+        )
+    summaries.sort(key=lambda summary: summary["started"])
+    return summaries
+
+
+def _print_hops(hops, indent="  "):
+    for hop in hops:
+        attributes = " ".join(f"{k}={v}" for k, v in hop["attributes"].items())
+        print(
+            f"{indent}{hop['duration_ms']:9.1f} ms  self {hop['self_ms']:8.1f} ms  "
+            f"{'  ' * hop['depth']}{hop['name']} {attributes}".rstrip()
+        )
+
+
+def _print_summary(summary):
+    started = time.strftime("%H:%M:%S", time.localtime(summary["started"]))
+    label = summary["attributes"].get("command", "")
+    print(
+        f"{started} {summary['name']} {summary['trace_id'][:8]} "
+        f"{summary['turn_ms']:.0f} ms (with background {summary['total_ms']:.0f} ms)"
+        + (f' "{label}"' if label else "")
+    )
+    _print_hops(summary["critical_path"])
+    for work in summary["background"]:
+        print(
+            f"  background {work['name']}, "
+            f"ends {work['ends_after_turn_ms']:.0f} ms after the turn:"
+        )
+        _print_hops(work["critical_path"], indent="    ")
+    if summary["errors"]:
+        print(f"  errors in: {', '.join(summary['errors'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prints the critical path of each traced turn."
+    )
+    parser.add_argument("paths", nargs="*", default=[trace_file()])
+    parser.add_argument("--trace", help="Only the trace whose ID starts with this")
+    parser.add_argument("--last", type=int, help="Only the last N turns")
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args()
+
+    summaries = summarize_traces(read_spans(args.paths))
+    if args.trace:
+        summaries = [s for s in summaries if s["trace_id"].startswith(args.trace)]
+    if args.last:
+        summaries = summaries[-args.last :]
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+        return
+    for summary in summaries:
+        _print_summary(summary)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    main()
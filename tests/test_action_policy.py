@@ -0,0 +1,120 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest.mock import AsyncMock, patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.action_policy import ActionRunner, CircuitBreaker
+
+
+class TestActionRunner(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Use short deadlines so the tests run quickly."""
+        self.runner = ActionRunner()
+        patch.dict(
+            "src.action_policy.ACTION_POLICIES",
+            {
+                "move_robotic_arm": {
+                    "device": "robotic_arm",
+                    "deadline": 0.05,
+                    "retries": 2,
+                },
+                "play_video": {"device": "tablet", "deadline": 0.05, "retries": 0},
+            },
+        ).start()
+        patch("src.action_policy.RETRY_DELAY", 0).start()
+
+    def tearDown(self):
+        patch.stopall()
+
+    async def test_wedged_action_times_out(self):
+        """Tests that an action that never returns is abandoned at its deadline."""
+
+        async def wedged():
+            await asyncio.sleep(10)
+
+        result = await self.runner.run("play_video", wedged)
+        self.assertIn("timed out", result)
+        stats = self.runner.summary()["devices"]["tablet"]
+        self.assertEqual(stats["outcomes"], {"timeout": 1})
+        print("\n[TEST] Wedged actions are abandoned at their deadline.")
+
+    async def test_idempotent_action_is_retried(self):
+        """Tests that a failing idempotent action is retried until it succeeds."""
+        action = AsyncMock(
+            side_effect=[
+                "[HARDWARE] ERROR: Failed to send command to Arm: EIO",
+                "Command '3' sent to Arm.",
+            ]
+        )
+        result = await self.runner.run("move_robotic_arm", action)
+        self.assertEqual(result, "Command '3' sent to Arm.")
+        self.assertEqual(action.await_count, 2)
+        self.assertEqual(self.runner.breaker_for("robotic_arm").state, "closed")
+        print("\n[TEST] Idempotent actions are retried.")
+
+    async def test_validation_errors_are_not_retried(self):
+        """Tests that validation errors neither retry nor trip the breaker."""
+        action = AsyncMock(return_value="[HARDWARE] VALIDATION_ERROR: Invalid p1.")
+        await self.runner.run("move_robotic_arm", action)
+        self.assertEqual(action.await_count, 1)
+        self.assertEqual(self.runner.breaker_for("robotic_arm").consecutive_failures, 0)
+        print("\n[TEST] Validation errors are not retried.")
+
+    async def test_open_circuit_fails_fast(self):
+        """Tests that a device is skipped once its circuit has opened."""
+        action = AsyncMock(return_value="[HARDWARE] ERROR: device down")
+        await self.runner.run("move_robotic_arm", action)  # 3 failed attempts
+        self.assertEqual(self.runner.breaker_for("robotic_arm").state, "open")
+
+        action.reset_mock()
+        result = await self.runner.run("move_robotic_arm", action)
+        action.assert_not_awaited()
+        self.assertIn("circuit open", result)
+        print("\n[TEST] Open circuits fail fast.")
+
+    async def test_mocked_sends_do_not_close_the_circuit(self):
+        """Tests that a mocked send (port down) is not counted as a success."""
+        breaker = self.runner.breaker_for("robotic_arm")
+        breaker.consecutive_failures = 2
+        action = AsyncMock(return_value="Mock command '3' executed for Arm.")
+        await self.runner.run("move_robotic_arm", action)
+        self.assertEqual(breaker.consecutive_failures, 2)
+        print("\n[TEST] Mocked sends leave the circuit as it was.")
+
+    async def test_cancelled_probe_is_released(self):
+        """Tests that cancelling a half-open probe lets the next probe through."""
+        breaker = self.runner.breaker_for("robotic_arm")
+        breaker.reset_timeout = 0
+        for _ in range(3):
+            breaker.record_failure()
+
+        task = asyncio.create_task(
+            self.runner.run("move_robotic_arm", asyncio.Event().wait)
+        )
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertTrue(breaker.allow())
+        print("\n[TEST] A cancelled probe does not block the device.")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_half_open_allows_single_probe(self):
+        """Tests that an expired open circuit lets exactly one probe through."""
+        breaker = CircuitBreaker("arm", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        print("\n[TEST] Half-open circuits allow a single probe.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.arm_jog import ARM_JOG_RATE, ArmJogController, jog_rate, parse_arm_position
+
+
+class FakeArmController:
+    def __init__(self):
+        self.last_response = None
+
+
+class FakeHardware:
+    """Records jog commands; each one takes `delay` seconds, like a serial round trip."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.jogs = []
+        self.robotic_arm_controller = FakeArmController()
+
+    async def jog_robotic_arm(self, p1, p2, p3):
+        await asyncio.sleep(self.delay)
+        self.jogs.append((p1, p2, p3))
+        self.robotic_arm_controller.last_response = f"angle:{p1}|{p2}|{p3}"
+
+
+class TestArmJog(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.telemetry = []
+
+        async def send_telemetry(message):
+            self.telemetry.append(message)
+
+        self.hardware = FakeHardware(delay=0.01)
+        self.jog = ArmJogController(self.hardware, send_telemetry, rate=50)
+
+    async def asyncTearDown(self):
+        await self.jog.stop()
+
+    async def test_latest_target_wins(self):
+        """Tests that a burst of targets becomes one command for the newest one."""
+        for i in range(10):
+            self.jog.set_target((2400 + i, 100, 3000), seq=i)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.hardware.jogs, [(2409, 100, 3000)])
+        self.assertEqual(self.jog.stats()["targets_dropped"], 9)
+        self.assertEqual(self.telemetry[-1].seq, 9)
+        self.assertEqual(self.telemetry[-1].position, [2409, 100, 3000])
+        print("\n[TEST] Jog sends only the latest target.")
+
+    async def test_control_rate_and_unchanged_targets(self):
+        """Tests that the loop holds its rate and skips repeated targets."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i in range(30):
+            self.jog.set_target((2400 + i // 3, 100, 3000), seq=i)
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.05)
+
+        stats = self.jog.stats()
+        elapsed = loop.time() - started
+        # 50 commands/s at most, however fast the targets arrive.
+        self.assertLessEqual(stats["commands_sent"], elapsed * 50 + 1)
+        self.assertEqual(
+            stats["commands_sent"]
+            + stats["targets_dropped"]
+            + stats["unchanged_skipped"],
+            30,
+        )
+        self.assertIn("latency_p95_ms", stats)
+        print("\n[TEST] Jog holds its control rate.")
+
+    def test_parse_arm_position(self):
+        """Tests parsing of the arm's position lines."""
+        self.assertEqual(parse_arm_position("angle:1|2|3"), [1, 2, 3])
+        self.assertIsNone(parse_arm_position("ok"))
+        self.assertIsNone(parse_arm_position(None))
+        print("\n[TEST] Arm position lines are parsed.")
+
+    def test_invalid_jog_rate_falls_back(self):
+        """Tests that a zero, negative or malformed AUM_ARM_JOG_RATE is not used."""
+        for value in ("0", "-5", "fast", "inf"):
+            with patch.dict(os.environ, {"AUM_ARM_JOG_RATE": value}):
+                with self.assertLogs(level="WARNING"):
+                    self.assertEqual(jog_rate(), ARM_JOG_RATE)
+        with patch.dict(os.environ, {"AUM_ARM_JOG_RATE": "40"}):
+            self.assertEqual(jog_rate(), 40.0)
+        print("\n[TEST] Invalid jog rates fall back to the default.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from web.control_hub import CONTROL_ROUTES, ControlHub, register_route
+
+
+class FakeWebSocket:
+    """Collects sent messages; `delay` makes every send take that long."""
+
+    def __init__(self, delay=0.0):
+        self.sent = []
+        self.delay = delay
+        self.closed_with = None
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+class TestControlHub(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.hub = ControlHub(outbox_size=4, send_timeout=0.2)
+
+    async def asyncTearDown(self):
+        for client in list(self.hub.clients):
+            self.hub.disconnect(client)
+        await asyncio.sleep(0)
+
+    def _connect(self, websocket, director=False):
+        client = self.hub.connect(websocket)
+        if director:
+            self.hub.identify_director(client)
+        return client
+
+    def _route(self, client, message):
+        text = json.dumps(message)
+        self.hub.route(client, text, message["type"])
+
+    async def test_broadcast_is_concurrent(self):
+        """Tests that a slow UI does not delay delivery to the other UIs."""
+        director = self._connect(FakeWebSocket(), director=True)
+        fast = FakeWebSocket()
+        slow = FakeWebSocket(delay=0.1)
+        self._connect(fast)
+        self._connect(slow)
+
+        self._route(director, {"type": "display_qr"})
+        await asyncio.sleep(0.02)
+        self.assertEqual(len(fast.sent), 1)
+        self.assertEqual(slow.sent, [])
+
+        await asyncio.sleep(0.15)
+        self.assertEqual(len(slow.sent), 1)
+        stats = self.hub.stats()["messages"]["display_qr"]
+        self.assertEqual(stats["delivered"], 2)
+        self.assertGreaterEqual(stats["mean_fanout_ms"], 100)
+        print("\n[TEST] Control broadcasts are sent concurrently.")
+
+    async def test_stuck_client_is_dropped_after_timeout(self):
+        """Tests that a UI whose send times out is disconnected and closed."""
+        director = self._connect(FakeWebSocket(), director=True)
+        stuck = FakeWebSocket(delay=10)
+        self._connect(stuck)
+
+        self._route(director, {"type": "display_qr"})
+        await asyncio.sleep(0.3)
+        self.assertEqual(self.hub.stats()["ui_clients"], 0)
+        self.assertEqual(stuck.closed_with, 1013)
+        self.assertEqual(self.hub.stats()["messages"]["display_qr"]["failed"], 1)
+        print("\n[TEST] Stuck control clients are dropped.")
+
+    async def test_full_outbox_drops_client(self):
+        """Tests that a UI client whose outbox overflows is dropped without blocking."""
+        director = self._connect(FakeWebSocket(), director=True)
+        self._connect(FakeWebSocket(delay=0.05))
+        for _ in range(10):
+            self._route(director, {"type": "display_qr"})
+        self.assertEqual(self.hub.stats()["ui_clients"], 0)
+        self.assertEqual(self.hub.message_stats["_clients"]["dropped"], 1)
+        print("\n[TEST] UI clients with full outboxes are dropped.")
+
+    async def test_full_director_outbox_sheds_commands(self):
+        """Tests that a backed-up director keeps its connection and the latest jog."""
+        director_ws = FakeWebSocket(delay=0.05)
+        director = self._connect(director_ws, director=True)
+        ui = self._connect(FakeWebSocket())
+        for seq in range(10):
+            self._route(ui, {"type": "jog_arm", "params": {"seq": seq}})
+        self._route(ui, {"type": "trigger_scene", "scene_name": "HOME"})
+        for seq in range(10, 15):
+            self._route(ui, {"type": "jog_arm", "params": {"seq": seq}})
+
+        self.assertIs(self.hub.director, director)
+        self.assertIsNone(director_ws.closed_with)
+        await asyncio.sleep(0.3)
+        sent = [json.loads(text) for text in director_ws.sent]
+        self.assertIn("trigger_scene", [message["type"] for message in sent])
+        self.assertEqual(sent[-1]["params"]["seq"], 14)
+        self.assertGreater(self.hub.message_stats["jog_arm"]["superseded"], 0)
+        self.assertNotIn("_clients", self.hub.message_stats)
+        print("\n[TEST] A full director outbox sheds stale jog targets.")
+
+    async def test_full_director_outbox_discards_the_oldest_command(self):
+        """Tests that without stale jog targets the oldest queued command goes."""
+        director_ws = FakeWebSocket(delay=0.05)
+        self._connect(director_ws, director=True)
+        ui = self._connect(FakeWebSocket())
+        for scene in range(7):
+            self._route(ui, {"type": "trigger_scene", "scene_name": str(scene)})
+
+        await asyncio.sleep(0.3)
+        scenes = [json.loads(text)["scene_name"] for text in director_ws.sent]
+        self.assertEqual(scenes, ["3", "4", "5", "6"])
+        self.assertEqual(self.hub.message_stats["trigger_scene"]["discarded"], 3)
+        print("\n[TEST] A full director outbox discards its oldest command.")
+
+    async def test_routing_follows_registry(self):
+        """Tests registry routing, source checks and the default UI -> director path."""
+        director_ws, ui_ws = FakeWebSocket(), FakeWebSocket()
+        director = self._connect(director_ws, director=True)
+        ui = self._connect(ui_ws)
+
+        self._route(ui, {"type": "display_qr"})  # Wrong source: ignored
+        self._route(ui, {"type": "trigger_scene", "scene_name": "HOME"})
+        self._route(ui, {"type": "something_new"})  # Unregistered: to the director
+        register_route("show_subtitle", source="director", target="ui")
+        try:
+            self._route(director, {"type": "show_subtitle", "text": "Hi"})
+        finally:
+            CONTROL_ROUTES.pop("show_subtitle")
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(
+            [json.loads(text)["type"] for text in director_ws.sent],
+            ["trigger_scene", "something_new"],
+        )
+        self.assertEqual(
+            [json.loads(text)["type"] for text in ui_ws.sent], ["show_subtitle"]
+        )
+        print("\n[TEST] Control messages follow the route registry.")
+
+
+if __name__ == "__main__":
+    unittest.main()
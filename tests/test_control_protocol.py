@@ -0,0 +1,118 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.control_protocol import (
+    Dispatcher,
+    DisplayQr,
+    MoveRoboticArm,
+    ProtocolError,
+    TriggerScene,
+    decode,
+    encode,
+    peek_type,
+)
+
+
+class TestControlProtocol(unittest.TestCase):
+    def test_round_trip_and_legacy_messages(self):
+        """Tests encode/decode, and that messages without a version are accepted."""
+        move = MoveRoboticArm(p1=2048, p2=1024, p3=3000)
+        text = encode(move)
+        self.assertTrue(text.startswith('{"type": "move_robotic_arm", "v": 1'))
+        self.assertEqual(decode(text), move)
+        self.assertEqual(decode(encode(DisplayQr())), DisplayQr())
+        legacy = json.dumps({"type": "trigger_scene", "scene_name": "HOME"})
+        self.assertEqual(decode(legacy), TriggerScene("HOME"))
+        print("\n[TEST] Control messages round-trip.")
+
+    def test_invalid_messages_are_rejected_with_clear_errors(self):
+        """Tests schema errors for missing, mistyped and out-of-range fields."""
+        cases = {
+            '{"type": "move_robotic_arm", "params": {"p1": 1, "p2": 2}}': "missing 'p3'",
+            '{"type": "move_robotic_arm", "params": {"p1": 1, "p2": "2", "p3": 3}}': "'p2' must be int, got str",
+            '{"type": "move_robotic_arm", "params": {"p1": true, "p2": 2, "p3": 3}}': "'p1' must be int, got bool",
+            '{"type": "move_robotic_arm", "params": {"p1": 1, "p2": 2, "p3": 5000}}': "between 0 and 4095",
+            '{"type": "move_robotic_arm", "params": [1, 2, 3]}': "params must be an object",
+            '{"type": "trigger_scene", "scene_name": ""}': "must not be empty",
+            '{"type": "display_qr", "v": 2}': "Unsupported protocol version 2",
+            '{"type": "self_destruct"}': "Unknown control message type",
+            "not json": "not valid JSON",
+        }
+        for text, expected in cases.items():
+            with self.assertRaises(ProtocolError) as context:
+                decode(text)
+            self.assertIn(expected, str(context.exception))
+        print("\n[TEST] Invalid control messages are rejected.")
+
+    def test_peek_type(self):
+        """Tests the fast type lookup and its fallback for other key orders."""
+        self.assertEqual(peek_type(encode(DisplayQr())), "display_qr")
+        self.assertEqual(
+            peek_type('{"v": 1, "type": "reset_conversation"}'), "reset_conversation"
+        )
+        self.assertIsNone(peek_type("legacy text"))
+        self.assertIsNone(peek_type('{"type": 3}'))
+        print("\n[TEST] Message types are read without a full decode.")
+
+    def test_import_does_not_load_the_hardware_stack(self):
+        """Tests that the web server can import the protocol without pyserial."""
+        code = (
+            "import sys; import src.control_protocol; "
+            "print(sorted(m for m in ('serial', 'src.hardware_controller') "
+            "if m in sys.modules))"
+        )
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+        print("\n[TEST] The control protocol imports without the hardware stack.")
+
+
+class TestDispatcher(unittest.IsolatedAsyncioTestCase):
+    async def test_dispatch_table(self):
+        """Tests that messages reach their handler and bad ones are counted."""
+        moves = []
+
+        async def on_move(message):
+            moves.append(message)
+
+        dispatcher = Dispatcher({MoveRoboticArm: on_move})
+        self.assertIsNone(await dispatcher.dispatch(encode(MoveRoboticArm(1, 2, 3))))
+        error = await dispatcher.dispatch('{"type": "move_robotic_arm", "params": {}}')
+        self.assertIsInstance(error, ProtocolError)
+        self.assertIsNone(await dispatcher.dispatch(encode(DisplayQr())))
+
+        self.assertEqual(moves, [MoveRoboticArm(1, 2, 3)])
+        self.assertEqual(dispatcher.stats["move_robotic_arm"]["handled"], 1)
+        self.assertEqual(dispatcher.stats["move_robotic_arm"]["rejected"], 1)
+        self.assertEqual(dispatcher.stats["display_qr"]["unhandled"], 1)
+        print("\n[TEST] Control messages are dispatched through the table.")
+
+    async def test_handler_errors_are_counted_as_failed(self):
+        """Tests that a raising handler is logged and counted, not propagated."""
+
+        async def on_move(message):
+            raise RuntimeError("arm offline")
+
+        dispatcher = Dispatcher({MoveRoboticArm: on_move})
+        with self.assertLogs(level="ERROR"):
+            error = await dispatcher.dispatch(encode(MoveRoboticArm(1, 2, 3)))
+
+        self.assertIsInstance(error, RuntimeError)
+        self.assertEqual(dispatcher.stats["move_robotic_arm"]["failed"], 1)
+        print("\n[TEST] Failing control handlers are counted, not raised.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,10 @@
+import asyncio
+import threading
 import unittest
 from unittest.mock import patch, AsyncMock
 import os
 import sys
-from src.hardware_controller import HardwareManager
+from src.hardware_controller import HardwareManager, SerialCommunicator
 
 # Add the src directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -78,6 +80,14 @@ class TestHardwareManager(unittest.IsolatedAsyncioTestCase):
         self.assertIn("[HARDWARE] VALIDATION_ERROR: Invalid p1 position", result)
         print("\n[TEST] Invalid robotic arm position is handled correctly.")
 
+    async def test_jog_robotic_arm_sends_move_position(self):
+        """Tests that a jog sends command 4 without the settle delay."""
+        await self.hardware_manager.jog_robotic_arm(1000, 2000, 3000)
+        self.mock_arm_controller.send_command.assert_called_once_with(
+            "4 1000 2000 3000", settle=0, discard_stale=True
+        )
+        print("\n[TEST] Robotic arm jog sends a Move Position command.")
+
     async def test_close_all_ports(self):
         """Tests that close_all_ports calls close on both controllers."""
         await self.hardware_manager.close_all_ports()
@@ -131,5 +141,135 @@ class TestHardwareManagerValidation(unittest.TestCase):
         print("\n[TEST] _validate_params handles a subset of valid inputs.")
 
 
+class TestSerialCommunicatorSupervisor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Speed up the supervisor and fake the serial port for each test."""
+        self.port_present = True
+        patch(
+            "src.hardware_controller.os.path.exists",
+            side_effect=lambda _: self.port_present,
+        ).start()
+        patch("src.hardware_controller.PORT_WATCH_INTERVAL", 0.01).start()
+        patch("src.hardware_controller.RECONNECT_BASE_DELAY", 0.01).start()
+        self.mock_serial_class = patch("src.hardware_controller.serial.Serial").start()
+        self.mock_serial_class.return_value.readline.return_value = b"ok\n"
+        self.communicator = SerialCommunicator("./test_arm_port", 57600, "Test Arm")
+
+    async def asyncTearDown(self):
+        await self.communicator.close()
+        patch.stopall()
+
+    async def _wait_for_state(self, state):
+        for _ in range(200):
+            if self.communicator.state == state:
+                return
+            await asyncio.sleep(0.01)
+        self.fail(f"Communicator never reached state '{state}'.")
+
+    async def test_reconnects_and_replays_state_after_unplug(self):
+        """Tests that a hot-unplugged port is reopened and the last state replayed."""
+        await self.communicator._connect()
+        self.communicator.start_supervisor()
+        await self.communicator.send_command("3 50 50 50 5 5 5 100 200 300")
+        self.communicator.replay_command = "3 50 50 50 5 5 5 100 200 300"
+
+        self.port_present = False
+        await self._wait_for_state("disconnected")
+        self.mock_serial_class.return_value.write.reset_mock()
+
+        self.port_present = True
+        await self._wait_for_state("connected")
+
+        stats = self.communicator.connection_stats()
+        self.assertEqual(stats["disconnects"], 1)
+        self.assertEqual(stats["reconnects"], 1)
+        self.assertGreater(stats["total_downtime_s"], 0)
+        self.mock_serial_class.return_value.write.assert_called_once_with(
+            b"3 50 50 50 5 5 5 100 200 300\n"
+        )
+        print("\n[TEST] Supervisor reconnects and replays the last state.")
+
+    async def test_write_failure_marks_port_disconnected(self):
+        """Tests that a failed write hands the port over to the supervisor."""
+        await self.communicator._connect()
+        self.mock_serial_class.return_value.write.side_effect = OSError("EIO")
+        result = await self.communicator.send_command("1")
+        self.assertIn("[HARDWARE] ERROR", result)
+        self.assertEqual(self.communicator.state, "disconnected")
+        self.assertEqual(self.communicator.connection_stats()["disconnects"], 1)
+        print("\n[TEST] Write failures mark the port as disconnected.")
+
+    def test_backoff_delay_is_bounded(self):
+        """Tests that the jittered backoff never exceeds the configured ceiling."""
+        from src import hardware_controller
+
+        for attempt in range(20):
+            delay = hardware_controller._backoff_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, hardware_controller.RECONNECT_MAX_DELAY)
+        print("\n[TEST] Reconnect backoff stays within bounds.")
+
+
 if __name__ == "__main__":
     unittest.main()
+
+    async def test_sends_on_one_port_do_not_interleave(self):
+        """Tests that concurrent commands write and read one at a time."""
+        await self.communicator._connect()
+        port = self.mock_serial_class.return_value
+        calls = []
+        port.write.side_effect = lambda data: calls.append(("write", data))
+        port.readline.side_effect = lambda: calls.append(("read",)) or b"ok\n"
+
+        await asyncio.gather(
+            self.communicator.send_command("1", settle=0.01),
+            self.communicator.send_command("2", settle=0.01),
+        )
+
+        self.assertEqual(
+            calls, [("write", b"1\n"), ("read",), ("write", b"2\n"), ("read",)]
+        )
+        print("\n[TEST] Commands on one port are serialized.")
+
+    async def test_port_dropped_during_send(self):
+        """Tests that a send finishes on its port if the supervisor drops it meanwhile."""
+        await self.communicator._connect()
+
+        def write(data):
+            self.communicator.ser = None  # The supervisor marked it disconnected.
+
+        self.mock_serial_class.return_value.write.side_effect = write
+        result = await self.communicator.send_command("1")
+        self.assertEqual(result, "Command '1' sent to Test Arm.")
+        print("\n[TEST] A send survives the port being dropped mid-command.")
+
+    async def test_retry_waits_for_the_abandoned_read(self):
+        """Tests that a command cancelled mid-read keeps the port until the read ends."""
+        await self.communicator._connect()
+        port = self.mock_serial_class.return_value
+        read_started = threading.Event()
+        finish_read = threading.Event()
+        calls = []
+
+        def readline():
+            calls.append("read")
+            if len(calls) == 1:
+                read_started.set()
+                finish_read.wait(5)
+                return b"late\n"
+            return b"ok\n"
+
+        port.readline.side_effect = readline
+        port.write.side_effect = lambda data: calls.append(data)
+        first = asyncio.create_task(self.communicator.send_command("1", settle=0))
+        await asyncio.to_thread(read_started.wait, 5)
+        first.cancel()
+        retry = asyncio.create_task(self.communicator.send_command("1", settle=0))
+        await asyncio.sleep(0.05)
+        self.assertEqual(calls, [b"1\n", "read"])
+
+        finish_read.set()
+        await retry
+        self.assertEqual(calls, [b"1\n", "read", b"1\n", "read"])
+        self.assertEqual(self.communicator.last_response, "ok")
+        print("\n[TEST] A retry waits for the abandoned read to finish.")
@@ -0,0 +1,201 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.hardware_controller import HardwareManager
+from src.hardware_emulator import (
+    JointMotion,
+    MainSceneEmulator,
+    RoboticArmEmulator,
+    VirtualSerialPair,
+    start_kiosks,
+)
+
+
+class TestEventDrivenEmulator(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Create a pty pair; the emulator opens the device end, the test is the host."""
+        self.host_fd, device_fd = os.openpty()
+        self.device_path = os.ttyname(device_fd)
+        self.device_fd = device_fd
+        os.set_blocking(self.host_fd, False)
+        self.emulators = []
+
+    async def asyncTearDown(self):
+        for emulator in self.emulators:
+            emulator.close()
+        os.close(self.host_fd)
+        os.close(self.device_fd)
+
+    def _start(self, emulator_class, **profile):
+        emulator = emulator_class(self.device_path, profile=profile)
+        emulator.start()
+        self.emulators.append(emulator)
+        return emulator
+
+    async def _read_lines(self, count, timeout=1.0):
+        """Reads `count` lines from the host side of the pty."""
+        loop = asyncio.get_running_loop()
+        buffer = b""
+        deadline = loop.time() + timeout
+        while buffer.count(b"\n") < count and loop.time() < deadline:
+            try:
+                buffer += os.read(self.host_fd, 1024)
+            except BlockingIOError:
+                await asyncio.sleep(0.005)
+        # Split on newlines only: garbage lines may contain other line breaks.
+        lines = buffer.replace(b"\r\n", b"\n").split(b"\n")
+        return [line.decode("utf-8", "replace") for line in lines if line]
+
+    async def test_scene_emulator_answers_with_profile_latency(self):
+        """Tests that responses are delayed by the configured latency and counted."""
+        emulator = self._start(MainSceneEmulator, latency=0.05, jitter=0.0)
+
+        sent_at = time.monotonic()
+        os.write(self.host_fd, b"5\n")
+        lines = await self._read_lines(1)
+        elapsed = time.monotonic() - sent_at
+
+        self.assertEqual(lines, ["OK"])
+        self.assertGreaterEqual(elapsed, 0.05)
+        stats = emulator.stats()
+        self.assertEqual(stats["commands_handled"], 1)
+        self.assertGreaterEqual(stats["mean_latency_ms"], 50)
+        print("\n[TEST] Emulator applies its latency profile.")
+
+    async def test_arm_emulator_simulates_the_move(self):
+        """Tests that a move is acknowledged at once, then completes after its profile."""
+        emulator = self._start(RoboticArmEmulator, latency=0.0, jitter=0.0)
+
+        os.write(self.host_fd, b"3 1000 1000 1000 200 200 200 2148 100 3860\n")
+        lines = await self._read_lines(2)
+        self.assertEqual(lines, ["angle:2048|0|3960", "ok"])
+        self.assertTrue(emulator.moving)
+
+        lines = await self._read_lines(2)
+        self.assertEqual(lines, ["angle:2148|100|3860", "done"])
+        self.assertEqual(emulator.position, [2148, 100, 3860])
+        stats = emulator.stats()
+        self.assertEqual(stats["moves_completed"], 1)
+        # 100 ticks at 48,828 ticks/s^2 is a triangular profile of ~90 ms.
+        self.assertAlmostEqual(stats["last_move_ms"], 90.5, delta=15)
+        print("\n[TEST] Arm emulator simulates move timing.")
+
+    async def test_dropped_responses_are_counted(self):
+        """Tests that a drop probability of 1 suppresses every response."""
+        emulator = self._start(MainSceneEmulator, latency=0.0, drop=1.0)
+
+        os.write(self.host_fd, b"2\n")
+        lines = await self._read_lines(1, timeout=0.1)
+
+        self.assertEqual(lines, [])
+        self.assertEqual(emulator.stats()["responses_dropped"], 1)
+        print("\n[TEST] Emulator drops responses per its profile.")
+
+    async def test_stall_fault_holds_responses(self):
+        """Tests that an injected stall delays responses until it ends."""
+        emulator = self._start(MainSceneEmulator, latency=0.0, jitter=0.0)
+        emulator.inject_fault("stall", duration=0.1)
+
+        sent_at = time.monotonic()
+        os.write(self.host_fd, b"2\n")
+        lines = await self._read_lines(1)
+
+        self.assertEqual(lines, ["OK"])
+        self.assertGreaterEqual(time.monotonic() - sent_at, 0.1)
+        print("\n[TEST] Stall faults hold responses.")
+
+    async def test_garbage_fault_sends_a_corrupted_line(self):
+        """Tests that an injected garbage fault writes a junk line to the host."""
+        emulator = self._start(MainSceneEmulator)
+        emulator.inject_fault("garbage", count=1)
+
+        lines = await self._read_lines(1)
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(emulator.stats()["garbage_sent"], 1)
+        print("\n[TEST] Garbage faults send corrupted lines.")
+
+
+class TestJointMotion(unittest.TestCase):
+    def test_trapezoidal_profile_matches_dynamixel_units(self):
+        """Tests the profile timing for the director's default velocity 50 / acceleration 5."""
+        joint = JointMotion(0, 4096, velocity=50, acceleration=5)
+        # 50 * 0.229 rpm = 781.6 ticks/s; 5 * 214.577 rpm^2 = 1220.7 ticks/s^2.
+        self.assertAlmostEqual(joint.peak_velocity, 781.65, places=2)
+        self.assertAlmostEqual(joint.t_accel, 0.64, places=2)
+        self.assertAlmostEqual(joint.duration, 4096 / 781.65 + 0.64, places=2)
+        self.assertAlmostEqual(joint.position_at(joint.duration / 2), 2048, places=3)
+        self.assertEqual(joint.position_at(joint.duration + 1), 4096)
+        print("\n[TEST] Joint profile follows the Dynamixel units.")
+
+    def test_short_move_is_triangular_and_monotonic(self):
+        """Tests that a short move never reaches full speed and never overshoots."""
+        joint = JointMotion(3000, 2900, velocity=1000, acceleration=10)
+        self.assertEqual(joint.t_cruise, 0.0)
+        positions = [joint.position_at(i * 0.01) for i in range(100)]
+        self.assertEqual(positions, sorted(positions, reverse=True))
+        self.assertGreaterEqual(min(positions), 2900)
+        print("\n[TEST] Short moves use a triangular profile.")
+
+
+class TestVirtualKiosks(unittest.IsolatedAsyncioTestCase):
+    async def test_parallel_kiosks_are_independent(self):
+        """Tests that several in-process kiosks each serve their own HardwareManager."""
+        kiosks = await start_kiosks(3)
+        managers = [HardwareManager(**kiosk.ports) for kiosk in kiosks]
+        try:
+            await asyncio.gather(*(manager.connect_all() for manager in managers))
+            await asyncio.gather(
+                *(
+                    manager.trigger_diorama_scene(i + 1)
+                    for i, manager in enumerate(managers)
+                )
+            )
+            for manager in managers:
+                self.assertEqual(
+                    manager.main_scene_controller.connection_stats()["state"],
+                    "connected",
+                )
+            for kiosk in kiosks:
+                self.assertEqual(kiosk.scene.commands_handled, 1)
+                self.assertGreater(kiosk.stats()["SCENE_EMU"]["commands_per_s"], 0)
+        finally:
+            for manager in managers:
+                await manager.close_all_ports()
+            for kiosk in kiosks:
+                kiosk.close()
+        print("\n[TEST] Parallel virtual kiosks run independently.")
+
+    async def test_disconnect_keeps_the_virtual_port_path(self):
+        """Tests that a virtual disconnect drops the link but reopens on the same pty."""
+        link = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), "port")
+        pair = VirtualSerialPair(link)
+        emulator = MainSceneEmulator(pair, profile={"latency": 0.0, "jitter": 0.0})
+        emulator.start()
+        self.addCleanup(emulator.close)
+        host_fd = os.open(pair.path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        self.addCleanup(os.close, host_fd)
+        path = pair.path
+
+        emulator.inject_fault("disconnect", duration=0.05)
+        self.assertFalse(os.path.lexists(link))
+        os.write(host_fd, b"3\n")  # Lost while unplugged.
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(pair.path, path)
+        self.assertEqual(os.path.realpath(link), os.path.realpath(path))
+        os.write(host_fd, b"2\n")
+        await asyncio.sleep(0.05)
+        self.assertEqual(os.read(host_fd, 1024), b"OK\n")
+        self.assertEqual(emulator.commands_handled, 1)
+        print("\n[TEST] Virtual disconnects reopen on the same pty path.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import sys
+import time
+import tempfile
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.hardware_journal import HardwareJournal, pair_exchanges, read_journal
+from src.journal_replay import _replay_device, build_report
+
+
+class TestHardwareJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "test.aumj")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write_sample(self):
+        journal = HardwareJournal(self.path)
+        journal.record_command("Main Scene Controller", "3\n")
+        journal.record_command("Robotic Arm Controller", "3 50 50 50 5 5 5 1 2 3\n")
+        journal.record_response("Main Scene Controller", b"OK\n")
+        journal.record_response("Robotic Arm Controller", b"")
+        journal.close()
+
+    def test_existing_journal_is_not_overwritten(self):
+        """Tests that a second run on the same path keeps the first recording."""
+        self._write_sample()
+        size = os.path.getsize(self.path)
+
+        journal = HardwareJournal(self.path)
+        journal.close()
+
+        self.assertNotEqual(journal.path, self.path)
+        self.assertTrue(journal.path.endswith(".aumj"))
+        self.assertEqual(os.path.getsize(self.path), size)
+        print("\n[TEST] An existing hardware journal is never truncated.")
+
+    def test_round_trip(self):
+        """Tests that records are read back in order with monotonic timestamps."""
+        self._write_sample()
+        records = list(read_journal(self.path))
+
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[0].device, "Main Scene Controller")
+        self.assertEqual(records[0].kind, "command")
+        self.assertEqual(records[2].payload, b"OK\n")
+        timestamps = [record.timestamp for record in records]
+        self.assertEqual(timestamps, sorted(timestamps))
+        print("\n[TEST] Journal records round-trip.")
+
+    def test_truncated_record_is_ignored(self):
+        """Tests that a record cut short by a crash doesn't break reading."""
+        self._write_sample()
+        with open(self.path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+        self.assertEqual(len(list(read_journal(self.path))), 4)
+        print("\n[TEST] Truncated journal records are ignored.")
+
+    def test_pair_exchanges_matches_responses_per_device(self):
+        """Tests that responses are paired with the command sent to the same device."""
+        self._write_sample()
+        exchanges = pair_exchanges(read_journal(self.path))
+
+        self.assertEqual(
+            [e["command"] for e in exchanges], ["3", "3 50 50 50 5 5 5 1 2 3"]
+        )
+        self.assertEqual(exchanges[0]["response"], "OK")
+        self.assertEqual(exchanges[1]["response"], "")
+        self.assertGreaterEqual(exchanges[0]["latency"], 0)
+        print("\n[TEST] Journal exchanges are paired per device.")
+
+    def test_build_report_compares_timings(self):
+        """Tests that the replay report shows the latency delta and mismatches."""
+        results = [
+            {
+                "device": "Arm",
+                "latency": 0.100,
+                "replay_latency": 0.150,
+                "response": "ok",
+                "replay_response": "angle:1|2|3",
+            }
+        ]
+        report = build_report(results)
+        self.assertEqual(report["Arm"]["mean_delta_ms"], 50.0)
+        self.assertEqual(report["Arm"]["response_mismatches"], 1)
+        print("\n[TEST] Replay report compares timings.")
+
+
+class _FakeController:
+    last_response = "ok"
+
+    async def send_command(self, command):
+        pass
+
+
+class TestJournalReplay(unittest.IsolatedAsyncioTestCase):
+    async def test_replay_skips_idle_time_before_the_first_command(self):
+        """Tests that replay timing starts at the first command, not the journal start."""
+        exchanges = [
+            {"device": "Arm", "command": "1", "sent_at": 60.0},
+            {"device": "Arm", "command": "2", "sent_at": 60.05},
+        ]
+        started = time.monotonic()
+        results = await _replay_device(
+            _FakeController(), exchanges, 1.0, started, first_sent_at=60.0
+        )
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual([r["command"] for r in results], ["1", "2"])
+        print("\n[TEST] Replay skips the idle time before the first command.")
+
+
+if __name__ == "__main__":
+    unittest.main()
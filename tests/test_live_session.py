@@ -0,0 +1,280 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+from google.genai import types
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import live_session
+from src.live_director import AumDirectorApp
+from src.live_session import LiveSessionManager
+from src.local_genai import LocalGenaiClient, load_script
+
+RECAP = "You were talking with a visitor."
+
+
+class FakeOrchestrator:
+    """Finishes the story on the first visitor turn."""
+
+    hardware = None
+
+    def resume_context(self):
+        return None
+
+    async def process_user_input(self, command, director):
+        return {"narrative": "Goodbye, visitor!", "is_story_finished": True}
+
+
+class TestLiveSessionManager(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        script = load_script()
+        script["time_scale"] = 0
+        self.client = LocalGenaiClient(script)
+        self.context = None
+
+    async def asyncTearDown(self):
+        await self.manager.close()
+
+    async def _begin(self, **kwargs):
+        self.manager = LiveSessionManager(
+            self.client,
+            types.LiveConnectConfig(
+                response_modalities=["AUDIO"],
+                context_window_compression=types.ContextWindowCompressionConfig(
+                    trigger_tokens=400,
+                    sliding_window=types.SlidingWindow(target_tokens=200),
+                ),
+            ),
+            resume_context=lambda: self.context,
+            **kwargs,
+        )
+        self.manager.system_prompt = "You are Bob."
+        session = await self.manager.open()
+        await self.manager.begin(session)
+        return session
+
+    async def _wait_for_standby(self):
+        for _ in range(100):
+            if self.manager.standby:
+                return self.manager.standby
+            await asyncio.sleep(0.01)
+        self.fail("no standby session")
+
+    async def _play_turn(self, session):
+        """Answers one scripted tool call and reads the spoken reply."""
+        async for message in session.receive():
+            self.manager.on_message(session, message)
+            if message.tool_call:
+                call = message.tool_call.function_calls[0]
+                await session.send_tool_response(
+                    function_responses=[
+                        types.FunctionResponse(
+                            id=call.id,
+                            name=call.name,
+                            response={"narrative": "Tell me more about that place!"},
+                        )
+                    ]
+                )
+                return call
+
+    async def _read_handle(self, session):
+        async for message in session.receive():
+            self.manager.on_message(session, message)
+            if self.manager.handle:
+                return self.manager.handle
+
+    async def test_failure_promotes_the_standby(self):
+        """Tests that a dropped session is replaced by the prepared standby."""
+        first = await self._begin(standby=True, resumption=True)
+        standby = await self._wait_for_standby()
+
+        self.context = RECAP
+        first.drop()
+        session = await self.manager.failover(first)
+
+        self.assertIs(session, standby)
+        self.assertIs(self.manager.session, standby)
+        (switch,) = self.manager.switches
+        self.assertEqual(
+            (switch.reason, switch.via, switch.context), ("closed", "standby", "recap")
+        )
+        self.assertLess(switch.gap_s, 0.05)
+        # A second report of the same failure is a no-op.
+        self.assertIs(await self.manager.failover(first), standby)
+        self.assertEqual(len(self.manager.switches), 1)
+        print("\n[TEST] A failed Live session is replaced by the standby.")
+
+    async def test_failure_resumes_from_the_handle(self):
+        """Tests that without a standby the session is resumed from its handle."""
+        first = await self._begin(standby=False, resumption=True)
+        self.assertEqual(first.system_instruction.parts[0].text, "You are Bob.")
+        handle = await self._read_handle(first)
+
+        first.drop()
+        session = await self.manager.failover(first)
+
+        self.assertIs(session.resumed_from, first)
+        self.assertEqual(self.manager.switches[-1].via, "resume")
+        self.assertEqual(self.manager.switches[-1].context, "server")
+        self.assertNotEqual(await self._read_handle(session), handle)
+        print("\n[TEST] A failed Live session is resumed from its handle.")
+
+    async def test_failure_without_standby_or_handle_reconnects(self):
+        """Tests the fallback: a new session with the system prompt, no second kickoff."""
+        first = await self._begin(standby=False, resumption=False)
+        self.assertTrue(first.started)
+
+        first.drop()
+        session = await self.manager.failover(first)
+
+        self.assertIsNot(session, first)
+        self.assertIsNone(session.resumed_from)
+        self.assertEqual(self.manager.switches[-1].via, "connect")
+        # No recap: the new session waits for the visitor instead of greeting.
+        self.assertEqual(self.manager.switches[-1].context, "fresh")
+        self.assertFalse(session.started)
+        print("\n[TEST] Without a standby or handle, a new session is connected.")
+
+    async def test_settings_are_read_from_the_env_when_built(self):
+        """Tests that AUM_LIVE_* values set after import configure a new manager."""
+        env = {
+            "AUM_LIVE_STANDBY": "0",
+            "AUM_LIVE_RESUMPTION": "0",
+            "AUM_LIVE_STANDBY_MAX_AGE": "60",
+            "AUM_LIVE_FRESH_CONTEXT": "0",
+        }
+        with patch.dict(os.environ, env):
+            self.manager = LiveSessionManager(self.client, types.LiveConnectConfig())
+        self.assertFalse(self.manager.standby_enabled)
+        self.assertFalse(self.manager.resumption)
+        self.assertFalse(self.manager.fresh_context_enabled)
+        self.assertEqual(self.manager.standby_max_age, 60.0)
+        print("\n[TEST] Live session settings are read from the env when built.")
+
+    async def test_go_away_hands_over_to_a_resumed_session(self):
+        """Tests that a GoAway notice moves to a resumed session before the deadline."""
+        first = await self._begin(standby=False, resumption=True)
+        await self._read_handle(first)
+
+        first.go_away(time_left=5.0)
+        async for message in first.receive():
+            self.manager.on_message(first, message)
+            if message.go_away:
+                break
+        for _ in range(100):
+            if self.manager.session is not first:
+                break
+            await asyncio.sleep(0.01)
+
+        self.assertIs(self.manager.session.resumed_from, first)
+        switch = self.manager.switches[-1]
+        self.assertEqual((switch.reason, switch.via), ("go_away", "resume"))
+        print("\n[TEST] GoAway hands over to a resumed session.")
+
+    async def test_finished_story_moves_to_a_fresh_session(self):
+        """Tests that after the goodbye turn the standby takes over without a kickoff."""
+        first = await self._begin(standby=True, resumption=True)
+        standby = await self._wait_for_standby()
+        await self._play_turn(first)
+
+        self.manager.fresh_context(first)
+        async for message in first.receive():
+            self.manager.on_message(first, message)
+        for _ in range(100):
+            if self.manager.session is not first:
+                break
+            await asyncio.sleep(0.01)
+
+        self.assertIs(self.manager.session, standby)
+        switch = self.manager.switches[-1]
+        self.assertEqual(
+            (switch.reason, switch.via, switch.context),
+            ("visitor_done", "standby", "fresh"),
+        )
+        self.assertFalse(standby.started)
+        self.assertEqual(self.manager.handle, None)
+        self.assertEqual(self.manager.context_tokens, 0)
+        print("\n[TEST] A finished story moves Bob to a fresh Live session.")
+
+    async def test_director_keeps_reading_after_the_old_session_is_closed(self):
+        """Tests that closing the replaced session does not stop the receive loop."""
+        script = load_script()
+        script["time_scale"] = 0
+        # One visitor turn, so the loop is left waiting on the old session.
+        script["utterances"] = ["START_CONVERSATION"]
+        self.client = LocalGenaiClient(script)
+        director = AumDirectorApp(orchestrator=FakeOrchestrator(), client=self.client)
+        first = await self._begin(standby=True, resumption=True, fresh_context=True)
+        director.live = self.manager
+        standby = await self._wait_for_standby()
+
+        receiver = asyncio.create_task(director.receive_and_process())
+        try:
+            # Closing the replaced session is expected, not a connection failure.
+            with self.assertNoLogs(level="WARNING"):
+                for _ in range(200):
+                    if first.closed and director.session is standby:
+                        break
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.05)  # Let the loop see the closed session
+
+            self.assertIsNotNone(first.closed)
+            self.assertIs(director.session, standby)
+            self.assertFalse(receiver.done())
+        finally:
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
+        print("\n[TEST] The director survives the close of a replaced session.")
+
+    async def test_turn_tokens_are_tracked(self):
+        """Tests that usage metadata is counted and the sliding window trims it."""
+        first = await self._begin(standby=False, resumption=False)
+        prompts = []
+        for _ in range(6):
+            await self._play_turn(first)
+            async for message in first.receive():
+                self.manager.on_message(first, message)
+            prompts.append(self.manager.context_tokens)
+            # Five seconds of the visitor talking: 125 audio tokens.
+            await first.send_realtime_input(
+                audio={"data": bytes(2 * 16000 * 5), "mime_type": "audio/pcm"}
+            )
+
+        self.assertGreater(prompts[1], prompts[0])
+        # The window is trimmed to 200 tokens once a turn takes it past 400.
+        self.assertTrue(any(b < a for a, b in zip(prompts, prompts[1:])))
+        self.assertLess(max(prompts), 400 + 250)
+        self.assertEqual(
+            live_session.CONTEXT_TOKENS.labels().value, self.manager.context_tokens
+        )
+        print("\n[TEST] Live turn tokens are tracked and compressed.")
+
+
+class TestContextWindowCompression(unittest.TestCase):
+    def test_compression_config(self):
+        """Tests the sliding-window config and that a trigger of 0 disables it."""
+        config = live_session.context_window_compression()
+        self.assertEqual(config.trigger_tokens, live_session.COMPRESSION_TRIGGER_TOKENS)
+        self.assertEqual(
+            config.sliding_window.target_tokens,
+            live_session.COMPRESSION_TARGET_TOKENS,
+        )
+        env = {
+            "AUM_LIVE_COMPRESSION_TRIGGER_TOKENS": "2000",
+            "AUM_LIVE_COMPRESSION_TARGET_TOKENS": "1000",
+        }
+        with patch.dict(os.environ, env):
+            config = live_session.context_window_compression()
+        self.assertEqual(config.trigger_tokens, 2000)
+        self.assertEqual(config.sliding_window.target_tokens, 1000)
+        with patch.dict(os.environ, {"AUM_LIVE_COMPRESSION_TRIGGER_TOKENS": "0"}):
+            self.assertIsNone(live_session.context_window_compression())
+        print("\n[TEST] Context window compression is configured from the env.")
+
+
+if __name__ == "__main__":
+    unittest.main()
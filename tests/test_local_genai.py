@@ -0,0 +1,116 @@
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+from google.genai import types
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.local_genai import (
+    LocalGenaiClient,
+    create_client,
+    load_script,
+    sample_latency,
+)
+
+
+def _fast_script(**overrides):
+    script = load_script()
+    script["time_scale"] = 0
+    script.update(overrides)
+    return script
+
+
+class TestLocalLiveSession(unittest.IsolatedAsyncioTestCase):
+    async def test_scripted_turn_round_trip(self):
+        """Tests that an utterance becomes a tool call and the tool response is spoken."""
+        client = LocalGenaiClient(
+            _fast_script(utterances=["START_CONVERSATION", "I like the market."])
+        )
+        async with client.aio.live.connect(model="local") as session:
+            await session.send_client_content(
+                turns={"role": "user", "parts": []}, turn_complete=True
+            )
+            commands = []
+            audio_chunks = 0
+            for _ in range(2):
+                async for message in session.receive():
+                    if message.tool_call:
+                        call = message.tool_call.function_calls[0]
+                        commands.append(call.args["command"])
+                        await session.send_tool_response(
+                            function_responses=[
+                                types.FunctionResponse(
+                                    id=call.id,
+                                    name=call.name,
+                                    response={"narrative": "Hello there, visitor!"},
+                                )
+                            ]
+                        )
+                    elif message.server_content.model_turn:
+                        audio_chunks += 1
+            await session.finished.wait()
+
+        self.assertEqual(commands, ["START_CONVERSATION", "I like the market."])
+        # 3 words at 2.5 words/s in 40 ms chunks.
+        self.assertEqual(audio_chunks, 2 * 30)
+        stages = [stage for turn, stage, _ in session.timeline if turn == 1]
+        self.assertEqual(
+            stages,
+            [
+                "utterance_end",
+                "tool_call_sent",
+                "tool_response_received",
+                "first_audio_sent",
+            ],
+        )
+        print("\n[TEST] Local Live session plays the scripted visitor.")
+
+    async def test_realtime_audio_is_counted(self):
+        """Tests that microphone audio is accepted and counted."""
+        client = LocalGenaiClient(_fast_script())
+        async with client.aio.live.connect(model="local") as session:
+            await session.send_realtime_input(
+                audio={"data": b"\x00" * 2048, "mime_type": "audio/pcm"}
+            )
+        self.assertEqual(session.audio_bytes_received, 2048)
+        print("\n[TEST] Local Live session accepts realtime audio.")
+
+
+class TestLocalModels(unittest.TestCase):
+    def test_generate_content_returns_scripted_json(self):
+        """Tests that the Storyteller replies are returned in order as JSON text."""
+        client = LocalGenaiClient(_fast_script())
+        first = json.loads(client.models.generate_content(model="local").text)
+        second = json.loads(client.models.generate_content(model="local").text)
+        self.assertEqual(first["scene_to_trigger"], "MARKET")
+        self.assertEqual(second["scene_to_trigger"], "STALL")
+        print("\n[TEST] Local generate_content returns scripted replies.")
+
+    def test_sample_latency_specs(self):
+        """Tests fixed, uniform, normal and log-normal latency specs."""
+        self.assertEqual(sample_latency(0.25), 0.25)
+        self.assertEqual(sample_latency(None), 0.0)
+        self.assertTrue(0.1 <= sample_latency({"min": 0.1, "max": 0.2}) <= 0.2)
+        self.assertGreaterEqual(sample_latency({"mean": 0.0, "stddev": 1.0}), 0.0)
+        self.assertEqual(sample_latency({"median": 0.5, "sigma": 0.0}), 0.5)
+        print("\n[TEST] Latency specs are sampled correctly.")
+
+    def test_create_client_honours_backend(self):
+        """Tests that AUM_GENAI_BACKEND=local selects the stand-in."""
+        with patch.dict(os.environ, {"AUM_GENAI_BACKEND": "local"}):
+            self.assertIsInstance(create_client(), LocalGenaiClient)
+        with (
+            patch.dict(os.environ, {"AUM_GENAI_BACKEND": "gemini"}),
+            patch("src.local_genai.genai.Client") as client_class,
+        ):
+            self.assertIs(create_client("key"), client_class.return_value)
+            client_class.assert_called_once_with(api_key="key")
+        print("\n[TEST] Client factory honours AUM_GENAI_BACKEND.")
+
+
+if __name__ == "__main__":
+    unittest.main()
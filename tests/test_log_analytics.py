@@ -0,0 +1,107 @@
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.log_analytics import LatencyHistogram, analyze, write_csv
+
+
+def _line(clock, message, level="INFO"):
+    """A record as python-json-logger writes it, `clock` seconds after 12:00."""
+    seconds, ms = divmod(round(clock * 1000), 1000)
+    asctime = f"2026-10-18 12:{seconds // 60:02d}:{seconds % 60:02d},{ms:03d}"
+    return json.dumps(
+        {"asctime": asctime, "name": "root", "levelname": level, "message": message}
+    )
+
+
+TURN = [
+    (0.0, '[DIRECTOR] ---> User speech detected: "I like the "market""'),
+    (0.1, "[ORCHESTRATOR] ---> Calling Gemini API."),
+    (1.3, "[ORCHESTRATOR] <--- Storyteller replied in 1200 ms."),
+    (1.4, "[ORCHESTRATOR] ---> Executing actions for scene 'MARKET'..."),
+    (1.5, '[HARDWARE] ---> Sent to Main Scene Controller: "3"'),
+    (1.6, '[HARDWARE] <--- Received from Main Scene Controller: "ok"'),
+    (1.6, "[HARDWARE] Action trigger_diorama_scene on scene ok in 110 ms."),
+    (1.7, "[HARDWARE] ---> Executing ADB command: adb shell am start"),
+    (2.5, "[HARDWARE] <--- ADB command successful: Starting"),
+    (2.5, "[HARDWARE] Action play_video on tablet ok in 800 ms."),
+    (2.6, "[ORCHESTRATOR] <--- Scene 'MARKET' done in 1200 ms."),
+]
+
+
+class TestLogAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, name, lines, mtime):
+        path = os.path.join(self.root, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "wt") as f:
+            f.write("\n".join(lines) + "\n")
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_turns_scenes_and_errors_across_rotated_files(self):
+        """Tests rebuilding turns from a gzipped rotated file and the live file."""
+        first = [_line(clock, message) for clock, message in TURN]
+        second = [_line(60 + clock, message) for clock, message in TURN[:3]] + [
+            _line(62.0, "[ORCHESTRATOR] CRITICAL_ERROR: timeout", "ERROR"),
+            _line(63.0, "not json"),
+            _line(64.0, '[DIRECTOR] ---> User speech detected: "stop"'),
+            _line(64.1, "[ORCHESTRATOR] Stop command detected. Ending conversation."),
+        ]
+        paths = [
+            self._write("app.log", second, mtime=2000),
+            self._write("app.log.1.gz", first, mtime=1000),
+        ]
+
+        turns = []
+        report = analyze(paths, on_turn=turns.append)
+
+        self.assertEqual([turn.outcome for turn in turns], ["ok", "error", "stop"])
+        self.assertEqual(turns[0].command, 'I like the "market"')
+        self.assertEqual(turns[0].turn_ms, 1400)
+        self.assertEqual(turns[0].storyteller_ms, 1200)
+        self.assertEqual(turns[0].scene, "MARKET")
+        self.assertEqual(turns[1].turn_ms, 2000)
+        self.assertEqual(report["latency"]["turn"]["count"], 3)
+        self.assertEqual(report["latency"]["adb"]["count"], 1)
+        self.assertEqual(report["scenes"]["MARKET"]["count"], 1)
+        self.assertEqual(report["serial"]["Main Scene Controller"]["count"], 1)
+        self.assertEqual(report["outcomes"]["action.play_video"], {"ok": 1})
+        self.assertEqual(report["error_rates"]["ORCHESTRATOR"]["errors"], 1)
+        self.assertEqual(report["lines"], len(first) + len(second))
+
+        out = io.StringIO()
+        write_csv(report, out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertIn(("scenes", "MARKET"), [(r["group"], r["name"]) for r in rows])
+        print("\n[TEST] Turns and scenes are rebuilt from rotated logs.")
+
+    def test_histogram_percentiles(self):
+        """Tests that bucketed percentiles stay within one bucket of the truth."""
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.observe(ms / 1000)
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 1000)
+        self.assertAlmostEqual(summary["mean_ms"], 500.5)
+        self.assertEqual(summary["max_ms"], 1000.0)
+        self.assertLessEqual(abs(summary["p95_ms"] - 950) / 950, 0.13)
+        print("\n[TEST] Latency percentiles come from fixed buckets.")
+
+
+if __name__ == "__main__":
+    unittest.main()
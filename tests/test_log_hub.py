@@ -0,0 +1,160 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from web.log_hub import LogFilter, LogHub
+
+
+class FakeWebSocket:
+    """Collects sent lines; a blocked socket never finishes sending."""
+
+    def __init__(self, blocked=False):
+        self.sent = []
+        self.closed_with = None
+        self.blocked = blocked
+
+    async def send_text(self, text):
+        if self.blocked:
+            await asyncio.Event().wait()
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+class TestLogHub(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "app.log")
+        open(self.path, "w").close()
+        self.hub = LogHub(self.path, queue_size=5, poll_interval=0.01)
+        self.tasks = []
+
+    async def asyncTearDown(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        await self.hub.close()
+        self.tmp_dir.cleanup()
+
+    def _connect(self, websocket, log_filter=None, backfill=0):
+        subscriber = self.hub.subscribe(websocket, log_filter, backfill=backfill)
+        self.tasks.append(asyncio.create_task(self.hub.serve(subscriber)))
+        return subscriber
+
+    def _append(self, *lines):
+        with open(self.path, "a") as f:
+            f.write("".join(f"{line}\n" for line in lines))
+
+    async def _wait_for(self, condition, timeout=1.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not condition():
+            if asyncio.get_running_loop().time() > deadline:
+                self.fail("Condition not met in time.")
+            await asyncio.sleep(0.01)
+
+    async def test_each_line_is_read_once_and_sent_to_every_client(self):
+        """Tests that one tailer fans each line out exactly once per client."""
+        first, second = FakeWebSocket(), FakeWebSocket()
+        self._connect(first)
+        self._connect(second)
+        await asyncio.sleep(0.05)  # Let the tailer seek to the end
+        self._append('{"message": "one"}', '{"message": "two"}')
+
+        await self._wait_for(lambda: len(first.sent) == 2 and len(second.sent) == 2)
+        self.assertEqual(first.sent, ['{"message": "one"}', '{"message": "two"}'])
+        stats = self.hub.stats()
+        self.assertEqual(stats["lines_read"], 2)
+        self.assertEqual(stats["messages_sent"], 4)
+        print("\n[TEST] Log lines are read once and fanned out.")
+
+    async def test_slow_client_is_dropped(self):
+        """Tests that a client that stops reading is evicted without stalling others."""
+        fast, slow = FakeWebSocket(), FakeWebSocket(blocked=True)
+        self._connect(fast)
+        slow_subscriber = self._connect(slow)
+        await asyncio.sleep(0.05)
+        self._append(*(f"line {i}" for i in range(10)))
+
+        await self._wait_for(lambda: len(fast.sent) == 10)
+        self.assertTrue(slow_subscriber.evicted)
+        await self._wait_for(lambda: slow.closed_with == 1013)
+        stats = self.hub.stats()
+        self.assertEqual(stats["clients_dropped"], 1)
+        self.assertGreater(stats["messages_dropped"], 0)
+        self.assertEqual(stats["clients"], 1)
+        print("\n[TEST] Slow log clients are dropped.")
+
+    async def test_new_client_gets_filtered_backfill(self):
+        """Tests that a new client is backfilled from the ring buffer, filtered by prefix."""
+        self._append(
+            '{"levelname": "INFO", "message": "[HARDWARE] ---> Sent"}',
+            '{"levelname": "INFO", "message": "[DIRECTOR] ---> User speech"}',
+            '{"levelname": "ERROR", "message": "[HARDWARE] ERROR: timeout"}',
+        )
+        self.hub.start()
+        await self._wait_for(lambda: len(self.hub.buffer) == 3)
+
+        websocket = FakeWebSocket()
+        self._connect(websocket, LogFilter(exclude_prefix="HARDWARE"), backfill=10)
+        await self._wait_for(lambda: len(websocket.sent) == 1)
+        self.assertIn("[DIRECTOR]", websocket.sent[0])
+        print("\n[TEST] New log clients get a filtered backfill.")
+
+    async def test_live_lines_are_filtered_per_client(self):
+        """Tests that level and text filters apply to live lines per subscriber."""
+        errors, everything = FakeWebSocket(), FakeWebSocket()
+        self._connect(errors, LogFilter(level="error"))
+        self._connect(everything, LogFilter(q="scene"))
+        await asyncio.sleep(0.05)
+        self._append(
+            '{"levelname": "INFO", "message": "[ORCHESTRATOR] Executing scene"}',
+            '{"levelname": "ERROR", "message": "[HARDWARE] Port lost"}',
+        )
+
+        await self._wait_for(
+            lambda: len(errors.sent) == 1 and len(everything.sent) == 1
+        )
+        self.assertIn("Port lost", errors.sent[0])
+        self.assertIn("Executing scene", everything.sent[0])
+        self.assertEqual(self.hub.stats()["messages_filtered"], 2)
+        print("\n[TEST] Live log lines are filtered per client.")
+
+    async def test_tailer_follows_a_rotated_file(self):
+        """Tests that the tailer reopens the log after it is rotated."""
+        client = FakeWebSocket()
+        self._connect(client)
+        await asyncio.sleep(0.05)
+        self._append('{"message": "before"}')
+        await self._wait_for(lambda: len(client.sent) == 1)
+
+        os.rename(self.path, self.path + ".1")
+        self._append('{"message": "after"}')
+
+        await self._wait_for(lambda: len(client.sent) == 2)
+        self.assertEqual(client.sent[1], '{"message": "after"}')
+        print("\n[TEST] The tailer follows a rotated log file.")
+
+    async def test_sizes_are_read_from_the_env_when_built(self):
+        """Tests that AUM_LOG_* sizes set after import still configure a new hub."""
+        env = {
+            "AUM_LOG_CLIENT_QUEUE": "7",
+            "AUM_LOG_BUFFER_SIZE": "9",
+            "AUM_LOG_BACKFILL": "3",
+        }
+        with patch.dict(os.environ, env):
+            hub = LogHub(self.path)
+        self.assertEqual(
+            (hub.queue_size, hub.buffer.maxlen, hub.default_backfill), (7, 9, 3)
+        )
+        print("\n[TEST] Log hub sizes are read from the env when it is built.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import logging
+import os
+import queue
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.log_pipeline import (
+    BoundedQueueHandler,
+    LogPipeline,
+    RateLimitFilter,
+    load_rate_limits,
+    rotating_file_handler,
+)
+
+
+def _record(message, level=logging.INFO, name="root"):
+    return logging.LogRecord(name, level, __file__, 1, message, None, None)
+
+
+class TestLogPipeline(unittest.TestCase):
+    def test_rate_limit_suppresses_bursts_per_prefix(self):
+        """Tests that a prefix is limited to its burst while others pass."""
+        rate_filter = RateLimitFilter({"HARDWARE": 5.0})
+        passed = sum(
+            rate_filter.filter(_record(f"[HARDWARE] ---> Sent {i}")) for i in range(50)
+        )
+        self.assertEqual(passed, 10)  # Burst of twice the rate
+        self.assertEqual(rate_filter.suppressed, {"root:HARDWARE": 40})
+        self.assertTrue(rate_filter.filter(_record("[DIRECTOR] Hello")))
+        self.assertTrue(
+            rate_filter.filter(_record("[HARDWARE] ERROR: lost", logging.ERROR))
+        )
+        print("\n[TEST] High-frequency log prefixes are rate limited.")
+
+    def test_rate_limits_from_environment(self):
+        """Tests that AUM_LOG_RATE_LIMITS overrides and extends the defaults."""
+        limits = load_rate_limits("HARDWARE=20, [EMULATOR]=5, bad")
+        self.assertEqual(limits, {"HARDWARE": 20.0, "EMULATOR": 5.0})
+        print("\n[TEST] Rate limits are read from the environment.")
+
+    def test_full_queue_drops_records(self):
+        """Tests that a full queue drops records instead of blocking the caller."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+        for i in range(5):
+            handler.handle(_record(f"record {i}"))
+        self.assertEqual(handler.records_dropped, 3)
+        self.assertEqual(handler.max_queue_depth, 2)
+        print("\n[TEST] Full log queues drop records.")
+
+    def test_pipeline_writes_and_rotates_in_background(self):
+        """Tests that records reach a size-rotated file through the listener."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "app.log")
+            with patch.dict(
+                os.environ, {"AUM_LOG_MAX_BYTES": "200", "AUM_LOG_BACKUP_COUNT": "2"}
+            ):
+                file_handler = rotating_file_handler(path)
+            pipeline = LogPipeline([file_handler], rate_limits={})
+            logger = logging.getLogger("test_log_pipeline")
+            logger.propagate = False
+            logger.addHandler(pipeline.handler)
+            pipeline.start()
+            for i in range(20):
+                logger.warning(f"[TEST] record number {i}")
+            pipeline.stop()
+            logger.removeHandler(pipeline.handler)
+
+            self.assertTrue(os.path.exists(path + ".1"))
+            self.assertFalse(os.path.exists(path + ".3"))
+            with open(path) as f:
+                self.assertIn("record number 19", f.read())
+            self.assertEqual(pipeline.stats()["records_dropped"], 0)
+        print("\n[TEST] Queued log records are written and rotated.")
+
+
+if __name__ == "__main__":
+    unittest.main()
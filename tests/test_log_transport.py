@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.log_transport import SocketLogHandler
+from web.log_hub import LogHub
+
+
+class TestLogTransport(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp_dir.name, "logs.sock")
+        self.hub = LogHub(None, source="socket", socket_path=self.socket_path)
+        self.logger = logging.getLogger("test_log_transport")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.handler = None
+
+    async def asyncTearDown(self):
+        if self.handler:
+            self.logger.removeHandler(self.handler)
+            await asyncio.to_thread(self.handler.close)
+        await self.hub.close()
+        self.tmp_dir.cleanup()
+
+    def _attach_handler(self, **kwargs):
+        self.handler = SocketLogHandler(self.socket_path, **kwargs)
+        self.handler.setFormatter(logging.Formatter('{"message": "%(message)s"}'))
+        self.logger.addHandler(self.handler)
+
+    async def _wait_for(self, condition, timeout=2.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not condition():
+            if asyncio.get_running_loop().time() > deadline:
+                self.fail("Condition not met in time.")
+            await asyncio.sleep(0.01)
+
+    async def test_records_arrive_in_batches(self):
+        """Tests that logged records reach the hub's buffer in batched frames."""
+        self.hub.start()
+        await self._wait_for(lambda: os.path.exists(self.socket_path))
+        self._attach_handler(batch_size=10)
+
+        for i in range(25):
+            self.logger.info(f"[DIRECTOR] record {i}")
+        await self._wait_for(lambda: len(self.hub.buffer) == 25)
+
+        self.assertEqual(self.hub.buffer[0][1]["message"], "[DIRECTOR] record 0")
+        stats = self.hub.stats()["transport"]
+        self.assertGreaterEqual(stats["frames_received"], 3)
+        self.assertEqual(stats["frames_lost"], 0)
+        self.assertEqual(self.handler.stats()["records_dropped"], 0)
+        print("\n[TEST] Log records are streamed in batches.")
+
+    async def test_records_are_buffered_while_server_is_down(self):
+        """Tests that records wait for the server, up to the buffer limit."""
+        self._attach_handler(batch_size=5, buffer_limit=8)
+        for i in range(10):
+            self.logger.info(f"record {i}")
+        self.assertEqual(self.handler.stats()["records_dropped"], 2)
+        self.assertEqual(self.handler.stats()["pending"], 8)
+
+        self.hub.start()
+        await self._wait_for(lambda: len(self.hub.buffer) == 8, timeout=3.0)
+        self.assertEqual(self.hub.buffer[0][1]["message"], "record 0")
+        self.assertEqual(self.handler.stats()["records_dropped"], 2)
+        print("\n[TEST] Log records are held until the server is reachable.")
+
+    async def test_sequence_gaps_are_counted(self):
+        """Tests that the receiver counts batches lost between frames."""
+        self.hub._receive_frame({"seq": 1, "sent_at": 0, "records": ["a"]})
+        self.hub._receive_frame({"seq": 4, "sent_at": 0, "records": ["b"]})
+        self.hub._receive_frame({"seq": 1, "sent_at": 0, "records": ["c"]})
+        self.assertEqual(self.hub.frames_lost, 2)
+        self.assertEqual(self.hub.lines_read, 3)
+        print("\n[TEST] Lost log batches are detected.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.loop_monitor import LoopMonitor
+
+
+def blocking_denoise(seconds):
+    """Stands in for synchronous work on the event loop."""
+    time.sleep(seconds)
+
+
+class TestLoopMonitor(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.monitor = LoopMonitor(
+            interval=0.02, slow_threshold=0.05, profile_dir=self.tmp_dir.name
+        )
+        self.monitor.start()
+
+    async def asyncTearDown(self):
+        await self.monitor.stop()
+        self.tmp_dir.cleanup()
+
+    async def test_slow_callback_is_reported_with_task_and_stack(self):
+        """Tests that a blocking call is caught with its task name and stack."""
+
+        async def capture_audio():
+            await asyncio.sleep(0.05)
+            blocking_denoise(0.2)
+
+        with self.assertLogs(level="WARNING") as logs:
+            await asyncio.create_task(capture_audio(), name="capture")
+            await asyncio.sleep(0.1)
+
+        stall = self.monitor.stats()["recent_stalls"][-1]
+        self.assertEqual(stall["task"], "capture")
+        self.assertIn("capture_audio", stall["coroutine"])
+        self.assertIn("blocking_denoise", stall["stack"])
+        self.assertGreaterEqual(stall["duration_ms"], 100)
+        self.assertTrue(
+            any("[LOOP_MONITOR] Event loop blocked" in line for line in logs.output)
+        )
+        self.assertGreaterEqual(self.monitor.stats()["max_lag_ms"], 100)
+        print("\n[TEST] A blocked event loop is reported with the culprit.")
+
+    async def test_profiler_writes_folded_stacks(self):
+        """Tests that the profiler samples the loop thread into a folded file."""
+
+        async def busy_scene():
+            for _ in range(10):
+                blocking_denoise(0.02)
+                await asyncio.sleep(0)
+
+        self.assertTrue(self.monitor.start_profiler(rate=200))
+        self.assertFalse(self.monitor.start_profiler())
+        await asyncio.create_task(busy_scene(), name="scene")
+        path = self.monitor.stop_profiler()
+
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+        self.assertTrue(any("blocking_denoise" in line for line in lines))
+        self.assertTrue(any(line.startswith("task:scene;") for line in lines))
+        self.assertIsNone(self.monitor.stop_profiler())
+        print("\n[TEST] The profiler writes flamegraph-compatible stacks.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import os
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.metrics import MetricsRegistry, render_prometheus
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counters_and_gauges(self):
+        """Tests labelled children, the no-label shortcuts and re-registration."""
+        turns = self.registry.counter(
+            "aum_turns_total", "Turns.", labelnames=("outcome",)
+        )
+        turns.labels("ok").inc()
+        turns.labels("ok").inc(2)
+        turns.labels("error").inc()
+        depth = self.registry.gauge("aum_depth", "Depth.")
+        depth.set(5)
+        depth.dec()
+
+        self.assertIs(self.registry.counter("aum_turns_total", "Turns."), turns)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("aum_turns_total", "Turns.")
+        with self.assertRaises(ValueError):
+            turns.labels("ok", "extra")
+
+        snapshot = self.registry.snapshot()
+        self.assertEqual(
+            snapshot["aum_turns_total"]["samples"],
+            [
+                {"labels": {"outcome": "ok"}, "value": 3},
+                {"labels": {"outcome": "error"}, "value": 1},
+            ],
+        )
+        self.assertEqual(snapshot["aum_depth"]["samples"][0]["value"], 4)
+        json.dumps(snapshot)  # Pushed to the web server as JSON
+        print("\n[TEST] Counters and gauges are recorded per label set.")
+
+    def test_histogram_and_prometheus_rendering(self):
+        """Tests bucket placement and the cumulative Prometheus exposition."""
+        latency = self.registry.histogram(
+            "aum_rtt_seconds",
+            "Round trip.",
+            labelnames=("device",),
+            buckets=(0.1, 1.0),
+        )
+        arm = latency.labels('Arm "A"')
+        for value in (0.05, 0.1, 0.5, 3.0):
+            arm.observe(value)
+        self.registry.register_collector(
+            lambda: self.registry.gauge("aum_clients", "Clients.").set(2)
+        )
+
+        text = render_prometheus(self.registry.snapshot())
+        for line in (
+            "# TYPE aum_rtt_seconds histogram",
+            'aum_rtt_seconds_bucket{device="Arm \\"A\\"",le="0.1"} 2',
+            'aum_rtt_seconds_bucket{device="Arm \\"A\\"",le="1.0"} 3',
+            'aum_rtt_seconds_bucket{device="Arm \\"A\\"",le="+Inf"} 4',
+            'aum_rtt_seconds_sum{device="Arm \\"A\\""} 3.65',
+            'aum_rtt_seconds_count{device="Arm \\"A\\""} 4',
+            "# TYPE aum_clients gauge",
+            "aum_clients 2",
+        ):
+            self.assertIn(line, text.splitlines())
+        self.assertTrue(text.endswith("\n"))
+        print("\n[TEST] Histograms render as cumulative Prometheus buckets.")
+
+
+if __name__ == "__main__":
+    unittest.main()
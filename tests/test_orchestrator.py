@@ -24,7 +24,7 @@ class TestOrchestratorConversation(unittest.IsolatedAsyncioTestCase):
         self.mock_hw_manager_class = self.mock_hw_manager_patcher.start()
         self.mock_hw_manager_instance = self.mock_hw_manager_class.return_value
 
-        self.mock_genai_client_patcher = patch("src.orchestrator.genai.Client")
+        self.mock_genai_client_patcher = patch("src.local_genai.genai.Client")
         self.mock_genai_client_class = self.mock_genai_client_patcher.start()
         self.mock_genai_client_instance = self.mock_genai_client_class.return_value
         self.mock_genai_client_instance.models.generate_content = MagicMock()
@@ -0,0 +1,135 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.port_discovery import PortDiscovery, match_device
+
+
+def make_port(device, vid, pid, serial_number=None):
+    """Builds a stand-in for pyserial's ListPortInfo."""
+    return SimpleNamespace(
+        device=device,
+        vid=vid,
+        pid=pid,
+        serial_number=serial_number,
+        location="1-1",
+    )
+
+
+MEGA = make_port("/dev/ttyACM0", 0x2341, 0x0042, "MEGA123")
+OPENCR = make_port("/dev/ttyACM1", 0x0483, 0x5740, "OPENCR456")
+UNKNOWN = make_port("/dev/ttyUSB0", 0x1234, 0x5678)
+
+
+class TestPortDiscovery(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Point the cache at a temporary file and isolate the environment."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp_dir.name, "ports.json")
+        patch.dict(os.environ, {}, clear=False).start()
+        os.environ.pop("MAIN_CONTROLLER_SERIAL", None)
+        os.environ.pop("ROBOTIC_ARM_SERIAL", None)
+        self.mock_comports = patch(
+            "src.port_discovery.serial.tools.list_ports.comports",
+            return_value=[UNKNOWN, OPENCR, MEGA],
+        ).start()
+        # Only the device nodes we pretend exist are visible.
+        patch(
+            "src.port_discovery.os.path.exists",
+            side_effect=lambda path: path in {MEGA.device, OPENCR.device},
+        ).start()
+        # As on macOS: no cheap per-device lookup.
+        self.mock_describe = patch(
+            "src.port_discovery._describe_device", return_value=None
+        ).start()
+
+    def tearDown(self):
+        patch.stopall()
+        self.tmp_dir.cleanup()
+
+    def test_match_by_vid_pid(self):
+        """Tests that each board is matched by its USB VID/PID."""
+        ports = [UNKNOWN, OPENCR, MEGA]
+        self.assertIs(match_device("main_scene", ports), MEGA)
+        self.assertIs(match_device("robotic_arm", ports), OPENCR)
+        print("\n[TEST] Boards are matched by VID/PID.")
+
+    def test_match_by_serial_number(self):
+        """Tests that a configured serial number takes precedence over VID/PID."""
+        other_mega = make_port("/dev/ttyACM2", 0x2341, 0x0042, "MEGA999")
+        os.environ["MAIN_CONTROLLER_SERIAL"] = "MEGA999"
+        self.assertIs(match_device("main_scene", [MEGA, other_mega]), other_mega)
+        print("\n[TEST] Boards are matched by serial number.")
+
+    async def test_cold_start_scans_once_and_writes_cache(self):
+        """Tests that a cold start shares one scan across devices and fills the cache."""
+        resolved = await PortDiscovery(self.cache_path).discover()
+
+        self.assertEqual(
+            resolved, {"main_scene": MEGA.device, "robotic_arm": OPENCR.device}
+        )
+        self.mock_comports.assert_called_once()
+        with open(self.cache_path) as f:
+            cache = json.load(f)
+        self.assertEqual(cache["main_scene"]["serial_number"], "MEGA123")
+        print("\n[TEST] Cold start discovery scans once and writes the cache.")
+
+    async def test_warm_start_uses_cache_without_scanning(self):
+        """Tests that a warm start resolves both ports from the cache via sysfs."""
+        await PortDiscovery(self.cache_path).discover()
+        self.mock_comports.reset_mock()
+        self.mock_describe.side_effect = {MEGA.device: MEGA, OPENCR.device: OPENCR}.get
+
+        discovery = PortDiscovery(self.cache_path)
+        resolved = await discovery.discover()
+
+        self.assertEqual(resolved["robotic_arm"], OPENCR.device)
+        self.mock_comports.assert_not_called()
+        self.assertIn("main_scene.cache_hit", discovery.timings)
+        print("\n[TEST] Warm start discovery resolves from the cache.")
+
+    async def test_swapped_nodes_are_detected_without_sysfs(self):
+        """Tests that boards swapped between existing nodes are found by a scan."""
+        await PortDiscovery(self.cache_path).discover()
+        # Re-enumeration: both nodes still exist but the boards traded places.
+        swapped_mega = make_port(OPENCR.device, 0x2341, 0x0042, "MEGA123")
+        swapped_opencr = make_port(MEGA.device, 0x0483, 0x5740, "OPENCR456")
+        self.mock_comports.return_value = [swapped_opencr, swapped_mega]
+
+        discovery = PortDiscovery(self.cache_path)
+        resolved = await discovery.discover()
+
+        self.assertEqual(
+            resolved, {"main_scene": OPENCR.device, "robotic_arm": MEGA.device}
+        )
+        self.assertFalse(await discovery.verify("main_scene", MEGA.device))
+        self.assertTrue(await discovery.verify("robotic_arm", MEGA.device))
+        print("\n[TEST] Swapped device nodes are re-identified.")
+
+    async def test_refresh_ignores_the_cache(self):
+        """Tests that a refresh scans even for valid entries and rewrites the cache."""
+        await PortDiscovery(self.cache_path).discover()
+        self.mock_comports.reset_mock()
+        self.mock_describe.side_effect = {MEGA.device: MEGA, OPENCR.device: OPENCR}.get
+        self.mock_comports.return_value = [MEGA]
+
+        discovery = PortDiscovery(self.cache_path)
+        resolved = await discovery.discover(refresh=True)
+
+        self.assertEqual(resolved, {"main_scene": MEGA.device, "robotic_arm": None})
+        self.mock_comports.assert_called_once()
+        self.assertNotIn("main_scene.cache_hit", discovery.timings)
+        with open(self.cache_path) as f:
+            self.assertEqual(list(json.load(f)), ["main_scene"])
+        print("\n[TEST] Refreshing discovery rewrites the port cache.")
+
+
+if __name__ == "__main__":
+    unittest.main()
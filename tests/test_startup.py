@@ -0,0 +1,104 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import startup
+from src.startup import StartupPlan
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class TestStartupPlan(unittest.IsolatedAsyncioTestCase):
+    async def test_phases_run_concurrently(self):
+        """Tests that ready() waits for blocking phases only, run side by side."""
+        plan = StartupPlan()
+        port_found = asyncio.Event()
+        plan.add("gemini_connect", asyncio.sleep(0.2, result="session"))
+        plan.add("audio_devices", asyncio.sleep(0.1))
+        plan.add("hardware", port_found.wait(), blocking=False)
+
+        report = await plan.ready()
+
+        self.assertLess(report["ready_s"], 0.3)
+        self.assertEqual(report["critical_path"], "gemini_connect")
+        self.assertEqual(report["pending"], ["hardware"])
+        self.assertEqual(await plan.result("gemini_connect"), "session")
+
+        port_found.set()
+        await plan.result("hardware")
+        (hardware,) = [p for p in plan.report()["phases"] if p["name"] == "hardware"]
+        self.assertFalse(hardware["blocking"])
+        self.assertEqual(hardware["status"], "ok")
+        print("\n[TEST] Startup phases run concurrently and are timed.")
+
+    async def test_failures(self):
+        """Tests that a blocking failure reaches ready() and a background one does not."""
+
+        async def fail(message):
+            raise OSError(message)
+
+        plan = StartupPlan()
+        plan.add("web_socket", fail("connection refused"), blocking=False)
+        with self.assertLogs(level="ERROR"):
+            await asyncio.sleep(0)
+        plan.add("audio_devices", fail("no default input device"))
+        with self.assertRaises(OSError):
+            await plan.ready()
+
+        statuses = {p["name"]: p["status"] for p in plan.report()["phases"]}
+        self.assertEqual(
+            statuses,
+            {
+                "web_socket": "failed",
+                "audio_devices": "failed",
+            },
+        )
+        await plan.cancel()
+        print("\n[TEST] Failed phases are reported; only blocking ones stop startup.")
+
+    async def test_import_module_runs_in_the_background(self):
+        """Tests that heavy modules are imported on the import thread."""
+        imported_on = []
+        real_import = startup.importlib.import_module
+
+        def import_module(name):
+            imported_on.append(threading.current_thread().name)
+            return real_import(name)
+
+        startup.importlib.import_module = import_module
+        try:
+            (colorsys,) = await startup.import_modules("colorsys")
+        finally:
+            startup.importlib.import_module = real_import
+        self.assertEqual(colorsys.__name__, "colorsys")
+        self.assertTrue(imported_on[0].startswith("aum-import"))
+        print("\n[TEST] Modules are imported off the event loop thread.")
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_director_does_not_import_audio_stack(self):
+        """Tests that importing the director leaves pyaudio and SciPy unloaded."""
+        code = (
+            "import sys, src.live_director; "
+            "print(sorted(m for m in ('pyaudio', 'noisereduce', 'scipy') if m in sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            env={**os.environ, "GEMINI_API_KEY": "x"},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output.strip(), "[]")
+        print("\n[TEST] The director imports its audio stack lazily.")
+
+
+if __name__ == "__main__":
+    unittest.main()
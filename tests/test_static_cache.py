@@ -0,0 +1,102 @@
+import gzip
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from web.static_cache import CachedPage, CompressedStaticFiles, choose_encoding
+
+TEXT = "# Scene notes\n" + "Bob looks at the diorama and waves.\n" * 200
+
+
+class TestStaticCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        for name, data in {
+            "notes.md": TEXT.encode(),
+            "logo.3f9a1c2b.svg": b"<svg>" + b"<g/>" * 500 + b"</svg>",
+            "photo.png": os.urandom(4096),
+        }.items():
+            with open(os.path.join(self.root, name), "wb") as f:
+                f.write(data)
+        self.static_files = CompressedStaticFiles(directory=self.root)
+        app = Starlette()
+        app.mount("/static", self.static_files)
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_choose_encoding(self):
+        """Tests content negotiation, including q=0 and the smallest variant."""
+        variants = {"gzip": b"12345", "br": b"123"}
+        self.assertEqual(choose_encoding("gzip, deflate, br", variants), "br")
+        self.assertEqual(choose_encoding("gzip, br;q=0", variants), "gzip")
+        self.assertIsNone(choose_encoding("identity", variants))
+        print("\n[TEST] Accept-Encoding picks the smallest accepted variant.")
+
+    def test_text_files_are_served_compressed_with_validators(self):
+        """Tests gzip responses, their ETag and the 304 on revalidation."""
+        response = self.client.get(
+            "/static/notes.md", headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.text, TEXT)  # The client decodes it
+        self.assertLess(int(response.headers["content-length"]), len(TEXT) // 10)
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+        etag = response.headers["etag"]
+        self.assertTrue(etag.endswith('-gzip"'))
+
+        revalidated = self.client.get(
+            "/static/notes.md",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(self.static_files.stats["compressions"], 1)
+        print("\n[TEST] Text files are served compressed with ETags.")
+
+    def test_images_and_fingerprinted_assets(self):
+        """Tests that PNGs aren't recompressed and hashed names are immutable."""
+        png = self.client.get("/static/photo.png", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", png.headers)
+        self.assertIn("etag", png.headers)
+        svg = self.client.get("/static/logo.3f9a1c2b.svg")
+        self.assertIn("immutable", svg.headers["cache-control"])
+        print("\n[TEST] Images skip compression; fingerprinted assets are immutable.")
+
+
+class TestCachedPage(unittest.TestCase):
+    def test_page_is_read_once_and_reloaded_on_change(self):
+        """Tests that the page is cached, compressed and reloaded in dev mode."""
+        with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False) as f:
+            f.write("<html>" + "<p>Bob</p>" * 300 + "</html>")
+        try:
+            page = CachedPage(f.name, reload=True)
+            first = page.response({"accept-encoding": "gzip"})
+            page.response({})
+            self.assertEqual(page.loads, 1)
+            self.assertIn(b"<p>Bob</p>", gzip.decompress(first.body))
+            not_modified = page.response({"if-none-match": first.headers["etag"]})
+            self.assertEqual(not_modified.status_code, 304)
+
+            with open(f.name, "w") as changed:
+                changed.write("<html>Updated</html>")
+            future = time.time() + 5
+            os.utime(f.name, (future, future))
+            self.assertEqual(page.response({}).body, b"<html>Updated</html>")
+            self.assertEqual(page.loads, 2)
+        finally:
+            os.unlink(f.name)
+        print("\n[TEST] The admin page is cached and reloaded on change.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.metrics import MetricsRegistry
+from web.timeseries import Resolution, TimeSeriesStore
+
+
+class TestTimeSeriesStore(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.turns = self.registry.histogram("aum_turn_seconds", "Turns.")
+        self.actions = self.registry.histogram(
+            "aum_hardware_action_seconds", "Actions.", labelnames=("action",)
+        )
+        self.queue = self.registry.gauge("aum_audio_queue_depth", "Queue.")
+        self.store = TimeSeriesStore(
+            resolutions=[Resolution(step=5, size=12), Resolution(step=60, size=10)]
+        )
+
+    def test_histogram_deltas_and_gauges(self):
+        """Tests that each snapshot adds the mean of new observations only."""
+        self.turns.observe(1.0)
+        self.turns.observe(3.0)
+        self.actions.labels("play_video").observe(0.5)
+        self.actions.labels("move_robotic_arm").observe(9.0)
+        self.queue.set(4)
+        self.store.ingest(self.registry.snapshot(), timestamp=1000)
+        self.store.ingest(self.registry.snapshot(), timestamp=1005)  # Nothing new
+        self.turns.observe(6.0)
+        self.store.ingest(self.registry.snapshot(), timestamp=1010)
+
+        series = self.store.query(60, now=1012)["series"]
+        self.assertEqual(
+            series["turn_latency"]["points"], [[1000, 2.0, 2.0], [1010, 6.0, 6.0]]
+        )
+        self.assertEqual(series["adb_latency"]["points"], [[1000, 0.5, 0.5]])
+        self.assertEqual(len(series["audio_queue_depth"]["points"]), 3)
+        self.assertEqual(series["event_loop_lag"]["points"], [])
+        print("\n[TEST] Snapshots become per-interval series points.")
+
+    def test_downsampling_and_bounded_memory(self):
+        """Tests coarser resolutions for long windows and ring buffer reuse."""
+        size = self.store.nbytes()
+        for i in range(200):
+            self.turns.observe(float(i % 3))
+            self.store.ingest(self.registry.snapshot(), timestamp=5 * i)
+        self.assertEqual(self.store.nbytes(), size)
+
+        now = 5 * 199
+        fine = self.store.query(60, ["turn_latency"], now=now)
+        self.assertEqual(fine["step"], 5)
+        self.assertEqual(len(fine["series"]["turn_latency"]["points"]), 12)
+        coarse = self.store.query(600, ["turn_latency"], now=now)
+        self.assertEqual(coarse["step"], 60)
+        points = coarse["series"]["turn_latency"]["points"]
+        self.assertEqual(points[-1][0], 960)
+        self.assertEqual([p[1] for p in points[:-1]], [1.0] * (len(points) - 1))
+        self.assertEqual({p[2] for p in points}, {2.0})
+        print("\n[TEST] Long windows are served from downsampled buffers.")
+
+    def test_director_restart(self):
+        """Tests that counters starting again from zero are not read as negative."""
+        for value in (1.0, 1.0, 1.0):
+            self.turns.observe(value)
+        self.store.ingest(self.registry.snapshot(), timestamp=0)
+        restarted = MetricsRegistry()
+        restarted.histogram("aum_turn_seconds", "Turns.").observe(5.0)
+        self.store.ingest(restarted.snapshot(), timestamp=5)
+        points = self.store.query(60, ["turn_latency"], now=10)["series"]
+        self.assertEqual(points["turn_latency"]["points"][-1], [5, 5.0, 5.0])
+        print("\n[TEST] A director restart starts a new baseline.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import tracing
+
+
+class TestTracing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "traces.jsonl")
+        self.previous = tracing.set_exporter(tracing.TraceExporter(self.path))
+
+    def tearDown(self):
+        tracing.set_exporter(self.previous)
+        self.tmp_dir.cleanup()
+
+    async def _turn(self):
+        async def scene_actions():
+            with tracing.span("execute_scene", scene="MARKET"):
+                with tracing.span("serial.send_command", device="Arm"):
+                    await asyncio.sleep(0.06)
+
+        with tracing.start_trace("turn", command="a market") as turn:
+            with tracing.span("process_user_input"):
+                with tracing.span("storyteller"):
+                    await asyncio.sleep(0.03)
+                # Scene actions run in the background and outlive the turn.
+                background = asyncio.create_task(scene_actions())
+            with tracing.span("send_tool_response"):
+                await asyncio.sleep(0.01)
+        await background
+        return turn
+
+    async def test_spans_follow_the_turn_into_tasks(self):
+        """Tests parent links across awaits and tasks, and the OTLP output."""
+        turn = await self._turn()
+        with tracing.span("outside a turn") as span:
+            self.assertIs(span, tracing.NOOP_SPAN)
+        tracing.flush()
+
+        spans = {span.name: span for span in tracing.read_spans([self.path])}
+        self.assertEqual(len(spans), 6)
+        self.assertEqual({span.trace_id for span in spans.values()}, {turn.trace_id})
+        self.assertIsNone(spans["turn"].parent_id)
+        self.assertEqual(
+            spans["execute_scene"].parent_id, spans["process_user_input"].span_id
+        )
+        self.assertEqual(spans["execute_scene"].attributes, {"scene": "MARKET"})
+
+        with open(self.path) as f:
+            document = json.loads(f.readline())
+        scope = document["resourceSpans"][0]["scopeSpans"][0]
+        self.assertIn("startTimeUnixNano", scope["spans"][0])
+        print("\n[TEST] Spans are linked across tasks and written as OTLP/JSON.")
+
+    async def test_critical_path(self):
+        """Tests the critical path and the background work reported beside it."""
+        await self._turn()
+        tracing.flush()
+
+        (summary,) = tracing.summarize_traces(tracing.read_spans([self.path]))
+        path = [(hop["name"], hop["depth"]) for hop in summary["critical_path"]]
+        self.assertEqual(
+            path,
+            [
+                ("turn", 0),
+                ("process_user_input", 1),
+                ("storyteller", 2),
+                ("send_tool_response", 1),
+            ],
+        )
+        storyteller = summary["critical_path"][2]
+        self.assertGreaterEqual(storyteller["duration_ms"], 30)
+        self.assertAlmostEqual(storyteller["self_ms"], storyteller["duration_ms"])
+
+        (background,) = summary["background"]
+        self.assertEqual(background["name"], "execute_scene")
+        self.assertEqual(
+            [hop["name"] for hop in background["critical_path"]],
+            ["execute_scene", "serial.send_command"],
+        )
+        self.assertGreater(summary["total_ms"], summary["turn_ms"])
+        self.assertEqual(summary["attributes"], {"command": "a market"})
+        print("\n[TEST] The critical path of a turn is reconstructed.")
+
+    async def test_errors_are_recorded(self):
+        """Tests that an exception marks the span and still propagates."""
+        with self.assertRaises(ValueError):
+            with tracing.start_trace("turn"):
+                with tracing.span("storyteller"):
+                    raise ValueError("bad JSON")
+        tracing.flush()
+
+        (summary,) = tracing.summarize_traces(tracing.read_spans([self.path]))
+        self.assertEqual(summary["errors"], ["storyteller", "turn"])
+        print("\n[TEST] Failed spans are marked as errors.")
+
+    async def test_tracing_can_be_disabled_after_import(self):
+        """Tests that AUM_TRACING is read per trace, so a loaded .env applies."""
+        with patch.dict(os.environ, {"AUM_TRACING": "0"}):
+            with tracing.start_trace("turn") as turn:
+                self.assertIs(turn, tracing.NOOP_SPAN)
+        print("\n[TEST] Tracing is disabled by AUM_TRACING set after import.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,10 +10,12 @@ def test_websocket_ui_to_director_forwarding():
     2. A second 'ui' client sends a command.
     3. The director client receives the command from the ui client.
     """
-    client = TestClient(app)
-    with client.websocket_connect(
-        "/ws/control"
-    ) as director_ws, client.websocket_connect("/ws/control") as ui_ws:
+    # Entering the client runs every websocket on the one portal event loop.
+    with (
+        TestClient(app) as client,
+        client.websocket_connect("/ws/control") as director_ws,
+        client.websocket_connect("/ws/control") as ui_ws,
+    ):
         # 1. Director identifies itself
         director_ws.send_text(json.dumps({"type": "identify", "client": "director"}))
 
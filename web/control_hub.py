@@ -0,0 +1,297 @@
+import asyncio
+import collections
+import logging
+import os
+import time
+
+# --- Control Hub Configuration ---
+# Every control client (UI tablets and the director) gets a bounded outbox and
+# its own sender task, so sends happen concurrently and one slow client can't
+# hold up the others. A UI client that falls behind or times out is dropped.
+# The director is never dropped for a full outbox: it sheds queued commands
+# instead (see _make_room), since without it no command reaches the hardware.
+# Defaults; AUM_CONTROL_OUTBOX and AUM_CONTROL_SEND_TIMEOUT override them when
+# the hub is built.
+CONTROL_OUTBOX_SIZE = 64
+CONTROL_SEND_TIMEOUT = 2.0
+SLOW_CLIENT_CLOSE_CODE = 1013  # "Try again later"
+# Director messages where only the newest queued one matters (a jog target
+# replaces the previous one). A full director outbox discards the older ones
+# first.
+LATEST_ONLY_TYPES = {"jog_arm"}
+
+UI = "ui"
+DIRECTOR = "director"
+
+# --- Message Registry ---
+# Where each control message type may come from and where it goes. New
+# broadcast types only need an entry here (or a register_route call).
+ControlRoute = collections.namedtuple("ControlRoute", "source target")
+CONTROL_ROUTES = {
+    "display_qr": ControlRoute(source=DIRECTOR, target=UI),
+    "reset_conversation": ControlRoute(source=UI, target=DIRECTOR),
+    "trigger_scene": ControlRoute(source=UI, target=DIRECTOR),
+    "move_robotic_arm": ControlRoute(source=UI, target=DIRECTOR),
+    "command_rejected": ControlRoute(source=DIRECTOR, target=UI),
+    "jog_arm": ControlRoute(source=UI, target=DIRECTOR),
+    "arm_telemetry": ControlRoute(source=DIRECTOR, target=UI),
+    "profiler_control": ControlRoute(source=UI, target=DIRECTOR),
+    "profiler_status": ControlRoute(source=DIRECTOR, target=UI),
+}
+
+
+def register_route(message_type, source, target):
+    """Adds (or replaces) the route for a control message type."""
+    CONTROL_ROUTES[message_type] = ControlRoute(source=source, target=target)
+
+
+class ControlClient:
+    """One control websocket with its outbox and sender task."""
+
+    def __init__(self, websocket, outbox_size):
+        self.websocket = websocket
+        self.role = UI
+        self.outbox = asyncio.Queue(maxsize=outbox_size)
+        self.task = None
+        self.closed = False
+
+
+class _Fanout:
+    """Tracks one broadcast until every recipient has been sent it (or dropped)."""
+
+    def __init__(self, hub, message_type, recipients):
+        self.hub = hub
+        self.message_type = message_type
+        self.started = time.monotonic()
+        self.remaining = recipients
+
+    def done(self, delivered):
+        self.hub._count(self.message_type, "delivered" if delivered else "failed")
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.hub._record_fanout(self.message_type, time.monotonic() - self.started)
+
+
+class ControlHub:
+    """Routes control messages between UI clients and the director."""
+
+    def __init__(
+        self,
+        outbox_size=None,
+        send_timeout=None,
+        routes=None,
+    ):
+        self.outbox_size = outbox_size or int(
+            os.getenv("AUM_CONTROL_OUTBOX", str(CONTROL_OUTBOX_SIZE))
+        )
+        self.send_timeout = send_timeout or float(
+            os.getenv("AUM_CONTROL_SEND_TIMEOUT", str(CONTROL_SEND_TIMEOUT))
+        )
+        self.routes = CONTROL_ROUTES if routes is None else routes
+        self.clients = set()
+        self.director = None
+        self.message_stats = {}
+        self._closing = set()
+
+    # --- Clients ---
+    @property
+    def ui_clients(self):
+        return [client for client in self.clients if client.role == UI]
+
+    def connect(self, websocket):
+        client = ControlClient(websocket, self.outbox_size)
+        client.task = asyncio.create_task(self._sender(client))
+        self.clients.add(client)
+        logging.info(
+            f"[WEB_SERVER] A control client connected. Total UIs: {len(self.ui_clients)}"
+        )
+        return client
+
+    def identify_director(self, client):
+        """Registers the client as the director; returns False if one is already connected."""
+        if self.director is not None and self.director is not client:
+            logging.warning(
+                "[WEB_SERVER] A second director tried to identify. Ignoring."
+            )
+            return False
+        client.role = DIRECTOR
+        self.director = client
+        logging.info("[WEB_SERVER] Director identified and registered.")
+        return True
+
+    def disconnect(self, client):
+        if client not in self.clients:
+            return
+        self.clients.discard(client)
+        client.closed = True
+        if client.task:
+            client.task.cancel()
+        # Messages still queued for this client will never be sent.
+        while not client.outbox.empty():
+            _, fanout = client.outbox.get_nowait()
+            if fanout:
+                fanout.done(delivered=False)
+        if client is self.director:
+            self.director = None
+            logging.info("[WEB_SERVER] Director disconnected.")
+        else:
+            logging.info(
+                f"[WEB_SERVER] UI client disconnected. Total UIs: {len(self.ui_clients)}"
+            )
+
+    def _drop(self, client, reason):
+        logging.warning(f"[WEB_SERVER] Dropping {client.role} control client: {reason}")
+        self._count("_clients", "dropped")
+        self.disconnect(client)
+        task = asyncio.create_task(self._close(client.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close(websocket):
+        try:
+            await websocket.close(code=SLOW_CLIENT_CLOSE_CODE)
+        except Exception:
+            pass
+
+    # --- Sending ---
+    def _enqueue(self, client, text, fanout=None):
+        try:
+            client.outbox.put_nowait((text, fanout))
+        except asyncio.QueueFull:
+            if client is self.director:
+                self._make_room(client, fanout.message_type if fanout else None)
+                client.outbox.put_nowait((text, fanout))
+                return True
+            if fanout:
+                fanout.done(delivered=False)
+            self._drop(client, "outbox full")
+            return False
+        return True
+
+    def _make_room(self, client, message_type):
+        """
+        Frees a slot in a full director outbox: queued messages superseded by a
+        newer one of a LATEST_ONLY_TYPES type go first, otherwise the oldest.
+        """
+        queued = [client.outbox.get_nowait() for _ in range(client.outbox.qsize())]
+        latest = {}
+        for index, (_, fanout) in enumerate(queued):
+            if fanout and fanout.message_type in LATEST_ONLY_TYPES:
+                latest[fanout.message_type] = index
+        if message_type in LATEST_ONLY_TYPES:
+            latest[message_type] = len(queued)  # The message being queued
+        kept = []
+        for index, (text, fanout) in enumerate(queued):
+            stale_type = fanout.message_type if fanout else None
+            if stale_type in latest and latest[stale_type] != index:
+                self._count(stale_type, "superseded")
+                fanout.done(delivered=False)
+            else:
+                kept.append((text, fanout))
+        if len(kept) == len(queued):
+            _, fanout = kept.pop(0)
+            oldest_type = fanout.message_type if fanout else None
+            logging.warning(
+                f"[WEB_CONTROL] Director outbox full, discarding '{oldest_type}'."
+            )
+            self._count(oldest_type, "discarded")
+            if fanout:
+                fanout.done(delivered=False)
+        for item in kept:
+            client.outbox.put_nowait(item)
+
+    async def _sender(self, client):
+        while True:
+            text, fanout = await client.outbox.get()
+            try:
+                await asyncio.wait_for(
+                    client.websocket.send_text(text), self.send_timeout
+                )
+            except asyncio.CancelledError:
+                if fanout:
+                    fanout.done(delivered=False)
+                raise
+            except Exception as e:
+                if fanout:
+                    fanout.done(delivered=False)
+                self._drop(client, f"send failed ({type(e).__name__})")
+                return
+            if fanout:
+                fanout.done(delivered=True)
+
+    def broadcast(self, message_type, text, exclude=None):
+        """Queues a message for every UI client; returns the number of recipients."""
+        recipients = [client for client in self.ui_clients if client is not exclude]
+        self._count(message_type, "broadcasts")
+        if not recipients:
+            return 0
+        fanout = _Fanout(self, message_type, len(recipients))
+        for client in recipients:
+            self._enqueue(client, text, fanout)
+        return len(recipients)
+
+    def send_to_director(self, message_type, text):
+        """Queues a message for the director; returns False if none is connected."""
+        if not self.director:
+            logging.warning(
+                "[WEB_CONTROL] No director connected to forward command to."
+            )
+            self._count(message_type, "undeliverable")
+            return False
+        fanout = _Fanout(self, message_type, 1)
+        return self._enqueue(self.director, text, fanout)
+
+    # --- Routing ---
+    def route(self, client, text, message_type):
+        """
+        Routes a raw message by its type (see control_protocol.peek_type) per
+        the registry; unknown UI messages go to the director, which validates them.
+        """
+        route = self.routes.get(message_type)
+        if route is None:
+            if client.role == UI:
+                logging.info(f"[WEB_CONTROL] Forwarding UI command to director: {text}")
+                self.send_to_director(message_type, text)
+            return
+        if route.source != client.role:
+            logging.warning(
+                f"[WEB_CONTROL] Ignoring '{message_type}' from a {client.role} client."
+            )
+            return
+        if route.target == UI:
+            logging.info(f"[WEB_SERVER] Broadcasting '{message_type}' to all UIs.")
+            self.broadcast(message_type, text, exclude=client)
+        else:
+            logging.info(f"[WEB_CONTROL] Forwarding '{message_type}' to director.")
+            self.send_to_director(message_type, text)
+
+    # --- Statistics ---
+    def _count(self, message_type, counter):
+        stats = self.message_stats.setdefault(message_type or "_unknown", {})
+        stats[counter] = stats.get(counter, 0) + 1
+
+    def _record_fanout(self, message_type, elapsed):
+        stats = self.message_stats.setdefault(message_type or "_unknown", {})
+        stats["fanouts"] = stats.get("fanouts", 0) + 1
+        stats["total_fanout_ms"] = stats.get("total_fanout_ms", 0.0) + 1000 * elapsed
+        stats["max_fanout_ms"] = max(stats.get("max_fanout_ms", 0.0), 1000 * elapsed)
+
+    def stats(self):
+        """Returns connected clients, outbox depths and per-type fan-out times."""
+        messages = {}
+        for message_type, stats in self.message_stats.items():
+            stats = dict(stats)
+            total = stats.pop("total_fanout_ms", None)
+            if total is not None:
+                stats["mean_fanout_ms"] = round(total / stats["fanouts"], 2)
+                stats["max_fanout_ms"] = round(stats["max_fanout_ms"], 2)
+            messages[message_type] = stats
+        return {
+            "ui_clients": len(self.ui_clients),
+            "director_connected": self.director is not None,
+            "outbox_depths": sorted(
+                (client.outbox.qsize() for client in self.clients), reverse=True
+            ),
+            "messages": messages,
+        }
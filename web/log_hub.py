@@ -0,0 +1,418 @@
+import asyncio
+import collections
+import json
+import logging
+import os
+import time
+
+from src.log_transport import decode_frame, log_socket_path
+
+# --- Log Hub Configuration ---
+# One tailer reads the log file; every /ws/logs client gets its own bounded
+# queue. A client whose queue fills up is dropped instead of slowing the rest.
+# The sizes are defaults; AUM_LOG_CLIENT_QUEUE, AUM_LOG_BUFFER_SIZE and
+# AUM_LOG_BACKFILL override them when the hub is built.
+LOG_POLL_INTERVAL = 0.1  # Seconds between reads when the file has no new lines
+LOG_CLIENT_QUEUE_SIZE = 500
+SLOW_CLIENT_CLOSE_CODE = 1013  # "Try again later"
+# Recent records are kept in memory so new clients get a backfill.
+LOG_BUFFER_SIZE = 2000
+LOG_BACKFILL = 200
+LOG_PRELOAD_BYTES = 256 * 1024  # How much of an existing file to load at startup
+TRANSPORT_FRAME_LIMIT = 4 * 1024 * 1024  # Largest accepted batch frame in bytes
+
+
+def log_source():
+    """Where lines come from: "socket" (see src/log_transport.py) or "file"."""
+    return os.getenv("AUM_LOG_TRANSPORT", "socket")
+
+
+def parse_record(line):
+    """Parses a JSON log line; plain text lines become a bare message record."""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        return {"message": line}
+    return record if isinstance(record, dict) else {"message": line}
+
+
+class LogFilter:
+    """
+    Server-side filter for one log client. All given criteria must match:
+    level (minimum), logger (name), prefix / exclude_prefix ("HARDWARE" or
+    "[HARDWARE]", comma-separated) and q (case-insensitive text match).
+    """
+
+    def __init__(
+        self, level=None, logger=None, prefix=None, exclude_prefix=None, q=None
+    ):
+        self.min_level = logging.getLevelName(level.upper()) if level else None
+        if not isinstance(self.min_level, int):
+            self.min_level = None
+        self.logger = logger or None
+        self.prefixes = self._prefixes(prefix)
+        self.excluded_prefixes = self._prefixes(exclude_prefix)
+        self.text = q.lower() if q else None
+
+    @staticmethod
+    def _prefixes(value):
+        if not value:
+            return ()
+        if isinstance(value, str):
+            value = value.split(",")
+        return tuple(
+            p if p.startswith("[") else f"[{p}]"
+            for p in (v.strip() for v in value)
+            if p
+        )
+
+    @classmethod
+    def from_params(cls, params):
+        return cls(
+            level=params.get("level"),
+            logger=params.get("logger"),
+            prefix=params.get("prefix"),
+            exclude_prefix=params.get("exclude_prefix"),
+            q=params.get("q"),
+        )
+
+    @property
+    def is_empty(self):
+        return not (
+            self.min_level
+            or self.logger
+            or self.prefixes
+            or self.excluded_prefixes
+            or self.text
+        )
+
+    def matches(self, record):
+        if self.min_level is not None:
+            level = logging.getLevelName(str(record.get("levelname", "")).upper())
+            if isinstance(level, int) and level < self.min_level:
+                return False
+        if self.logger and record.get("name") != self.logger:
+            return False
+        message = str(record.get("message", ""))
+        if self.prefixes and not message.startswith(self.prefixes):
+            return False
+        if self.excluded_prefixes and message.startswith(self.excluded_prefixes):
+            return False
+        if self.text and self.text not in message.lower():
+            return False
+        return True
+
+
+class LogSubscriber:
+    """One log websocket and its pending lines."""
+
+    def __init__(self, websocket, queue_size, log_filter=None):
+        self.websocket = websocket
+        self.filter = log_filter or LogFilter()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = False
+        self.sent = 0
+        self.task = None
+
+
+class LogHub:
+    """
+    Reads log lines once (from the director's socket transport or by tailing
+    the log file), keeps a ring buffer of recent records and fans every line
+    out to the subscribers whose filter matches it.
+    """
+
+    def __init__(
+        self,
+        path,
+        queue_size=None,
+        poll_interval=LOG_POLL_INTERVAL,
+        buffer_size=None,
+        source="file",
+        socket_path=None,
+        backfill=None,
+    ):
+        self.path = path
+        self.source = source
+        self.socket_path = socket_path or log_socket_path()
+        self.queue_size = queue_size or int(
+            os.getenv("AUM_LOG_CLIENT_QUEUE", str(LOG_CLIENT_QUEUE_SIZE))
+        )
+        self.default_backfill = (
+            backfill
+            if backfill is not None
+            else int(os.getenv("AUM_LOG_BACKFILL", str(LOG_BACKFILL)))
+        )
+        self.poll_interval = poll_interval
+        self.buffer = collections.deque(
+            maxlen=buffer_size
+            or int(os.getenv("AUM_LOG_BUFFER_SIZE", str(LOG_BUFFER_SIZE)))
+        )
+        self.subscribers = set()
+        self._tail_task = None
+        self.lines_read = 0
+        self.messages_sent = 0
+        self.messages_filtered = 0
+        self.messages_dropped = 0
+        self.clients_dropped = 0
+        self.total_fanout_latency = 0.0
+        self.max_fanout_latency = 0.0
+        # Socket transport counters
+        self.frames_received = 0
+        self.frames_lost = 0
+        self.invalid_frames = 0
+        self.total_transport_latency = 0.0
+        self.max_transport_latency = 0.0
+        self.sender_stats = None
+        self._last_seq = 0
+
+    # --- Subscribers ---
+    def start(self):
+        """Starts the shared reader (once) so the buffer fills even without clients."""
+        if self._tail_task is None or self._tail_task.done():
+            reader = self._serve_transport if self.source == "socket" else self._tail
+            self._tail_task = asyncio.create_task(reader())
+
+    def subscribe(self, websocket, log_filter=None, backfill=None):
+        """Registers a websocket and queues up to `backfill` matching recent lines."""
+        subscriber = LogSubscriber(websocket, self.queue_size, log_filter)
+        if backfill is None:
+            backfill = self.default_backfill
+        self.start()
+        self.backfill(subscriber, backfill)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def backfill(self, subscriber, count):
+        """Queues the last `count` buffered lines that match the subscriber's filter."""
+        count = min(count, self.queue_size)
+        if count <= 0:
+            return
+        matching = []
+        for line, record in reversed(self.buffer):
+            if subscriber.filter.matches(record):
+                matching.append(line)
+                if len(matching) == count:
+                    break
+        published_at = time.monotonic()
+        for line in reversed(matching):
+            subscriber.queue.put_nowait((line, published_at))
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, line):
+        """Buffers a line and queues it for every matching subscriber; full queues evict their client."""
+        record = parse_record(line)
+        self.buffer.append((line, record))
+        published_at = time.monotonic()
+        for subscriber in list(self.subscribers):
+            if not subscriber.filter.matches(record):
+                self.messages_filtered += 1
+                continue
+            try:
+                subscriber.queue.put_nowait((line, published_at))
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+
+    def _evict(self, subscriber):
+        self.unsubscribe(subscriber)
+        subscriber.evicted = True
+        if subscriber.task:
+            # The sender may be stuck in send_text; cancelling it closes the socket.
+            subscriber.task.cancel()
+        self.clients_dropped += 1
+        self.messages_dropped += subscriber.queue.qsize() + 1
+        logging.warning(
+            "[WEB_SERVER] Dropping slow log client "
+            f"({subscriber.queue.qsize()} lines pending)."
+        )
+
+    async def serve(self, subscriber):
+        """Sends a subscriber's queued lines until it disconnects or is evicted."""
+        subscriber.task = asyncio.current_task()
+        try:
+            while True:
+                line, published_at = await subscriber.queue.get()
+                await subscriber.websocket.send_text(line)
+                subscriber.sent += 1
+                self.messages_sent += 1
+                latency = time.monotonic() - published_at
+                self.total_fanout_latency += latency
+                self.max_fanout_latency = max(self.max_fanout_latency, latency)
+        except asyncio.CancelledError:
+            if subscriber.evicted:
+                try:
+                    await subscriber.websocket.close(code=SLOW_CLIENT_CLOSE_CODE)
+                except Exception:
+                    pass
+        except Exception as e:
+            logging.info(f"[WEB_SERVER] Log client send failed: {e}")
+        finally:
+            self.unsubscribe(subscriber)
+
+    # --- Tailer ---
+    def _preload(self, f):
+        """Loads the tail of an existing file into the buffer and leaves f at its end."""
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - LOG_PRELOAD_BYTES))
+        lines = f.read().splitlines()
+        if size > LOG_PRELOAD_BYTES:
+            lines = lines[1:]  # The first line is probably partial
+        for line in lines[-self.buffer.maxlen :]:
+            line = line.strip()
+            if line:
+                self.buffer.append((line, parse_record(line)))
+
+    def _open(self):
+        """Opens the log file and preloads its tail into the buffer."""
+        f = open(self.path, "r")
+        try:
+            self._preload(f)
+        except OSError:
+            f.close()
+            raise
+        return f
+
+    def _reopen_if_rotated(self, f):
+        """Returns the file to keep reading: a fresh one if the log was rotated."""
+        try:
+            st = os.stat(self.path)
+            if st.st_ino != os.fstat(f.fileno()).st_ino:
+                f.close()
+                return open(self.path, "r")
+            if st.st_size < f.tell():
+                f.seek(0)
+        except OSError:
+            pass
+        return f
+
+    async def _tail(self):
+        """
+        Follows the log file from its current end, surviving rotation. File
+        access runs in a worker thread so a slow disk never stalls the loop.
+        """
+        f = None
+        try:
+            while True:
+                if f is None:
+                    try:
+                        f = await asyncio.to_thread(self._open)
+                    except OSError:
+                        await asyncio.sleep(self.poll_interval * 10)
+                        continue
+                lines = await asyncio.to_thread(f.readlines)
+                if lines:
+                    for line in lines:
+                        line = line.strip()
+                        if line:
+                            self.lines_read += 1
+                            self.publish(line)
+                            # Let the senders drain between lines of a burst.
+                            await asyncio.sleep(0)
+                    continue
+                # Reopen if the file was rotated or truncated underneath us.
+                f = await asyncio.to_thread(self._reopen_if_rotated, f)
+                await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logging.error(f"[WEB_SERVER] Error reading log file: {e}")
+        finally:
+            if f:
+                f.close()
+
+    # --- Socket transport ---
+    async def _serve_transport(self):
+        """Accepts the director's log transport connections on a Unix socket."""
+        try:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            server = await asyncio.start_unix_server(
+                self._handle_transport, self.socket_path, limit=TRANSPORT_FRAME_LIMIT
+            )
+            logging.info(f"[WEB_SERVER] Receiving director logs on {self.socket_path}")
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        except OSError as e:
+            logging.error(f"[WEB_SERVER] Could not open log socket: {e}")
+        finally:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def _handle_transport(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                frame = decode_frame(line)
+                if frame is None:
+                    self.invalid_frames += 1
+                    continue
+                self._receive_frame(frame)
+                # Let the senders drain between batches.
+                await asyncio.sleep(0)
+        except (ConnectionError, ValueError) as e:
+            logging.info(f"[WEB_SERVER] Log transport connection lost: {e}")
+        finally:
+            writer.close()
+
+    def _receive_frame(self, frame):
+        seq = frame.get("seq", 0)
+        if seq > self._last_seq + 1 and self._last_seq:
+            self.frames_lost += seq - self._last_seq - 1
+        self._last_seq = seq  # A lower seq means the director restarted.
+        self.frames_received += 1
+        latency = max(0.0, time.time() - frame.get("sent_at", time.time()))
+        self.total_transport_latency += latency
+        self.max_transport_latency = max(self.max_transport_latency, latency)
+        self.sender_stats = frame.get("stats", self.sender_stats)
+        for line in frame["records"]:
+            if isinstance(line, str) and line:
+                self.lines_read += 1
+                self.publish(line)
+
+    async def close(self):
+        if self._tail_task:
+            self._tail_task.cancel()
+            await asyncio.gather(self._tail_task, return_exceptions=True)
+            self._tail_task = None
+
+    def stats(self):
+        """Returns fan-out counters and latency for the log websocket."""
+        return {
+            "clients": len(self.subscribers),
+            "lines_read": self.lines_read,
+            "messages_sent": self.messages_sent,
+            "messages_filtered": self.messages_filtered,
+            "buffered": len(self.buffer),
+            "messages_dropped": self.messages_dropped,
+            "clients_dropped": self.clients_dropped,
+            "mean_fanout_latency_ms": round(
+                1000 * self.total_fanout_latency / self.messages_sent, 2
+            )
+            if self.messages_sent
+            else 0.0,
+            "max_fanout_latency_ms": round(1000 * self.max_fanout_latency, 2),
+            "queue_depths": sorted(
+                (s.queue.qsize() for s in self.subscribers), reverse=True
+            ),
+            "source": self.source,
+            "transport": {
+                "frames_received": self.frames_received,
+                "frames_lost": self.frames_lost,
+                "invalid_frames": self.invalid_frames,
+                "mean_batch_size": round(self.lines_read / self.frames_received, 1)
+                if self.frames_received
+                else 0.0,
+                "mean_latency_ms": round(
+                    1000 * self.total_transport_latency / self.frames_received, 2
+                )
+                if self.frames_received
+                else 0.0,
+                "max_latency_ms": round(1000 * self.max_transport_latency, 2),
+                "sender": self.sender_stats,
+            }
+            if self.source == "socket"
+            else None,
+        }
@@ -1,69 +1,137 @@
 import asyncio
-import aiofiles
+import contextlib
 import json
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
 import logging
-from typing import List, Set
-from websockets.exceptions import ConnectionClosed
+import time
 
-app = FastAPI()
+from src.control_protocol import ProtocolError, decode, peek_type
+from src.metrics import MetricsRegistry, render_prometheus
 
-# --- WebSocket Connection Management ---
-# A more robust way to handle different client types.
-log_clients: List[WebSocket] = []
-director_socket: WebSocket = None
-ui_control_sockets: Set[WebSocket] = set()
-
-# Mount a static directory to serve images, CSS, etc.
-app.mount("/static", StaticFiles(directory="context"), name="static")
+from .control_hub import ControlHub
+from .log_hub import LogFilter, LogHub, log_source
+from .static_cache import CachedPage, CompressedStaticFiles
+from .timeseries import TimeSeriesStore
 
 html_path = "web/index.html"
+main_page = CachedPage(html_path)
+static_files = CompressedStaticFiles(directory="context")
 log_file_path = "app.log"
+log_hub = LogHub(log_file_path, source=log_source())
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start reading logs right away so the buffer has a backfill for the first client.
+    log_hub.start()
+    await asyncio.to_thread(static_files.precompress)
+    yield
+    await log_hub.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# --- WebSocket Connection Management ---
+# Control clients (UIs and the director) are tracked and routed by the hub.
+control_hub = ControlHub()
+
+# --- Metrics ---
+# The director pushes a snapshot of its metrics (src/metrics.py) over the
+# control websocket; /metrics serves it together with the web server's own.
+# The web server keeps a separate registry so the director's metric names,
+# registered on import, don't show up twice with the server's zero values.
+web_metrics = MetricsRegistry()
+director_metrics = {"snapshot": {}, "received_at": None}
+# Latency history for the dashboard panel, downsampled into fixed-size buffers.
+metric_series = TimeSeriesStore()
+CONTROL_UI_CLIENTS = web_metrics.gauge(
+    "aum_web_control_ui_clients", "Connected control UI clients."
+)
+DIRECTOR_CONNECTED = web_metrics.gauge(
+    "aum_web_director_connected", "1 if the director is connected to /ws/control."
+)
+DIRECTOR_SNAPSHOT_AGE = web_metrics.gauge(
+    "aum_web_director_snapshot_age_seconds",
+    "Seconds since the director last pushed its metrics (-1 if never).",
+)
+LOG_CLIENTS = web_metrics.gauge("aum_web_log_clients", "Connected log clients.")
+LOG_MESSAGES_DROPPED = web_metrics.gauge(
+    "aum_web_log_messages_dropped", "Log messages dropped for slow log clients."
+)
+STATIC_BYTES_SAVED = web_metrics.gauge(
+    "aum_web_static_bytes_saved", "Bytes saved by serving compressed static files."
+)
+
+
+def _collect_web_metrics():
+    control = control_hub.stats()
+    logs = log_hub.stats()
+    received_at = director_metrics["received_at"]
+    CONTROL_UI_CLIENTS.set(control["ui_clients"])
+    DIRECTOR_CONNECTED.set(int(control["director_connected"]))
+    DIRECTOR_SNAPSHOT_AGE.set(
+        round(time.monotonic() - received_at, 3) if received_at else -1
+    )
+    LOG_CLIENTS.set(logs["clients"])
+    LOG_MESSAGES_DROPPED.set(logs["messages_dropped"])
+    STATIC_BYTES_SAVED.set(static_files.stats["bytes_saved"])
+
+
+web_metrics.register_collector(_collect_web_metrics)
+
+# Mount a static directory to serve images, CSS, etc. Text files are served
+# precompressed; see web/static_cache.py for the caching headers.
+app.mount("/static", static_files, name="static")
 
 
 @app.get("/")
-async def get_main():
-    with open(html_path) as f:
-        return HTMLResponse(f.read())
+async def get_main(request: Request):
+    return main_page.response(request.headers)
 
 
-async def log_sender(websocket: WebSocket):
-    """Tails the log file and sends new lines to all connected log clients."""
-    log_clients.append(websocket)
-    try:
-        async with aiofiles.open(log_file_path, mode="r") as f:
-            await f.seek(0, 2)  # Go to the end of the file
-            while True:
-                line = await f.readline()
-                if not line:
-                    await asyncio.sleep(0.1)
-                    continue
-                # Use a copy of the list to avoid issues with concurrent modification
-                current_clients = list(log_clients)
-                for client in current_clients:
-                    await client.send_text(line.strip())
-    except asyncio.CancelledError:
-        pass  # Task was cancelled, expected behavior
-    except Exception as e:
-        logging.error(f"[WEB_SERVER] Error reading log file: {e}")
-    finally:
-        if websocket in log_clients:
-            log_clients.remove(websocket)
+@app.get("/static-cache/stats")
+async def get_static_cache_stats():
+    """Compression cache counters for the admin page and static files."""
+    return {"page_loads": main_page.loads, **static_files.stats}
+
+
+@app.get("/logs/stats")
+async def get_log_stats():
+    """Fan-out latency and drop counters for the log websocket."""
+    return log_hub.stats()
 
 
 @app.websocket("/ws/logs")
 async def websocket_logs_endpoint(websocket: WebSocket):
+    """
+    Streams log lines. Query parameters set the backfill size and filters
+    (level, logger, prefix, exclude_prefix, q). A client can change its
+    filters later by sending {"type": "subscribe", "filters": {...}}.
+    """
     await websocket.accept()
-    sender_task = asyncio.create_task(log_sender(websocket))
+    params = websocket.query_params
+    try:
+        backfill = int(params.get("backfill", log_hub.default_backfill))
+    except ValueError:
+        backfill = log_hub.default_backfill
+    subscriber = log_hub.subscribe(
+        websocket, LogFilter.from_params(params), backfill=backfill
+    )
+    sender_task = asyncio.create_task(log_hub.serve(subscriber))
     try:
         while True:
-            # Keep the connection alive, but we don't expect messages from the client
-            await websocket.receive_text()
+            data = await websocket.receive_text()
+            try:
+                message = json.loads(data)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(message, dict) and message.get("type") == "subscribe":
+                subscriber.filter = LogFilter.from_params(message.get("filters") or {})
+                logging.info("[WEB_SERVER] Log client updated its filters.")
     except WebSocketDisconnect:
         logging.info("[WEB_SERVER] Log client disconnected.")
     finally:
+        log_hub.unsubscribe(subscriber)
         sender_task.cancel()
         try:
             await sender_task
@@ -71,113 +139,83 @@ async def websocket_logs_endpoint(websocket: WebSocket):
             pass
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Director and web server metrics in the Prometheus text format."""
+    return Response(
+        render_prometheus(director_metrics["snapshot"], web_metrics.snapshot()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.get("/metrics.json")
+async def get_metrics_json():
+    """The same metrics as JSON snapshots, for the admin page."""
+    return {"director": director_metrics["snapshot"], "web": web_metrics.snapshot()}
+
+
+@app.get("/metrics/series")
+async def get_metric_series(window: float = 3600, series: str = ""):
+    """
+    Downsampled history of the dashboard series (turn, Storyteller, serial
+    and ADB latency, audio queue depth, event-loop lag) over the last
+    `window` seconds. `series` optionally selects a comma-separated subset.
+    """
+    names = [name for name in series.split(",") if name] or None
+    return {
+        **metric_series.query(max(window, 1.0), names),
+        "bytes": metric_series.nbytes(),
+    }
+
+
+@app.get("/control/stats")
+async def get_control_stats():
+    """Client counts, outbox depths and per-message fan-out times for /ws/control."""
+    return control_hub.stats()
+
+
 @app.websocket("/ws/control")
 async def websocket_control_endpoint(websocket: WebSocket):
     """
     Manages control commands. A client is initially treated as a UI.
     If it sends an 'identify' message, it's re-classified as the director.
+    Everything else is routed by type through the control hub's registry.
     """
-    global director_socket
     await websocket.accept()
-
-    # Initially, treat every connection as a potential UI client
-    client_socket = websocket
-    ui_control_sockets.add(client_socket)
-    logging.info(
-        f"[WEB_SERVER] A control client connected. Total UIs: {len(ui_control_sockets)}"
-    )
+    client = control_hub.connect(websocket)
 
     try:
         while True:
-            data = await client_socket.receive_text()
-
-            try:
-                message = json.loads(data)
-                # Check for the special identification message
-                if (
-                    message.get("type") == "identify"
-                    and message.get("client") == "director"
-                ):
-                    if director_socket is not None and director_socket != client_socket:
-                        logging.warning(
-                            "[WEB_SERVER] A second director tried to identify. Ignoring."
-                        )
-                        continue  # Don't process further
-
-                    # This is the director. Register it and remove from UI list.
-                    director_socket = client_socket
-                    if client_socket in ui_control_sockets:
-                        ui_control_sockets.remove(client_socket)
-                    logging.info("[WEB_SERVER] Director identified and registered.")
-                    # The director doesn't send other messages, so we just wait for disconnect
-                    # by continuing the loop but not processing other message types from it.
-                    continue
+            data = await websocket.receive_text()
+            # Only the type is read here; the director decodes and validates
+            # the messages it receives (see src/control_protocol.py).
+            message_type = peek_type(data)
 
-                # --- New QR Code Logic ---
-                # If the director sends a 'display_qr' command, broadcast it to all UIs
-                if (
-                    client_socket == director_socket
-                    and message.get("type") == "display_qr"
-                ):
-                    logging.info(
-                        "[WEB_SERVER] Received 'display_qr' command from director. Broadcasting to all UIs."
-                    )
-                    qr_message = json.dumps({"type": "display_qr"})
-                    # Create a copy of the set to safely iterate over it
-                    for ui_socket in list(ui_control_sockets):
-                        try:
-                            await ui_socket.send_text(qr_message)
-                        except ConnectionClosed:
-                            # Handle case where UI client disconnected between iterations
-                            ui_control_sockets.remove(ui_socket)
-                    continue  # Don't forward this message back to the director
-
-                if message.get("type") == "reset_conversation":
-                    logging.info(
-                        "[WEB_SERVER] Received 'reset_conversation' command from UI. Forwarding to director."
-                    )
-                    if director_socket:
-                        try:
-                            await director_socket.send_text(data)
-                        except ConnectionClosed:
-                            logging.error(
-                                "[WEB_SERVER] Director is not connected. Command not sent."
-                            )
-                            director_socket = None
-                    else:
-                        logging.warning(
-                            "[WEB_SERVER] No director connected to forward command to."
-                        )
-                    continue
-
-            except json.JSONDecodeError:
-                # Not a json message, treat as legacy or ignore
-                pass
-
-            # If we're here, it's a command from a UI client. Forward it.
-            if director_socket and director_socket != client_socket:
-                logging.info(f"[WEB_CONTROL] Forwarding UI command to director: {data}")
+            # Check for the special identification message
+            if message_type == "identify":
                 try:
-                    await director_socket.send_text(data)
-                except ConnectionClosed:
-                    logging.error(
-                        "[WEB_CONTROL] Director is not connected. Command not sent."
-                    )
-                    director_socket = None  # Clear stale socket
-            elif not director_socket:
-                logging.warning(
-                    "[WEB_CONTROL] No director connected to forward command to."
-                )
+                    decode(data)
+                except ProtocolError as e:
+                    logging.warning(f"[WEB_CONTROL] Invalid identify message: {e}")
+                    continue
+                control_hub.identify_director(client)
+                continue
+
+            # Metrics are for this server (/metrics), not for the UIs.
+            if message_type == "metrics_snapshot":
+                if client is control_hub.director:
+                    try:
+                        director_metrics["snapshot"] = decode(data).metrics
+                        director_metrics["received_at"] = time.monotonic()
+                        metric_series.ingest(director_metrics["snapshot"])
+                    except ProtocolError as e:
+                        logging.warning(f"[WEB_CONTROL] Invalid metrics snapshot: {e}")
+                continue
+
+            control_hub.route(client, data, message_type)
 
     except WebSocketDisconnect:
         logging.info("[WEB_SERVER] Control client disconnected.")
     finally:
         # Clean up on disconnect
-        if client_socket == director_socket:
-            director_socket = None
-            logging.info("[WEB_SERVER] Director disconnected.")
-        if client_socket in ui_control_sockets:
-            ui_control_sockets.remove(client_socket)
-            logging.info(
-                f"[WEB_SERVER] UI client disconnected. Total UIs: {len(ui_control_sockets)}"
-            )
+        control_hub.disconnect(client)
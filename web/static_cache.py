@@ -0,0 +1,234 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import threading
+from email.utils import formatdate
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip alone is understood by every browser
+    brotli = None
+
+# --- Static Cache Configuration ---
+# The admin page and text-like static files are compressed once and kept in
+# memory. Images are already compressed and are served from disk as they are.
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+    "text/css",
+    "text/html",
+    "text/javascript",
+    "text/markdown",
+    "text/plain",
+}
+MIN_COMPRESS_BYTES = 1024  # Smaller files aren't worth the Content-Encoding
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+# Assets whose name carries a content hash (e.g. "app.3f9a1c2b.css") never
+# change under the same URL, so browsers may keep them for a year without
+# asking. Everything else must be revalidated with its ETag on each use.
+FINGERPRINT_PATTERN = re.compile(r"[.-][0-9a-f]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# In dev the page and assets are re-checked on disk so edits show up on reload.
+RELOAD_ON_CHANGE = os.getenv("AUM_ENVIRONMENT", "prod") == "dev"
+
+
+def compress_variants(body):
+    """Returns {encoding: bytes} for every available encoding that saves space."""
+    variants = {"gzip": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return {
+        encoding: data for encoding, data in variants.items() if len(data) < len(body)
+    }
+
+
+def choose_encoding(accept_encoding, variants):
+    """Picks the smallest variant the client accepts, or None for identity."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        params = params.replace(" ", "")
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            quality = 1.0
+        if quality > 0:  # q=0 means "not acceptable"
+            accepted.add(coding.strip().lower())
+    candidates = [
+        encoding for encoding in variants if encoding in accepted or "*" in accepted
+    ]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda encoding: len(variants[encoding]))
+
+
+def _etag_matches(request_headers, etag):
+    if_none_match = request_headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+class CachedPage:
+    """
+    A single HTML page read once and served from memory, compressed, with an
+    ETag. With `reload` the file's mtime is checked on every request.
+    """
+
+    def __init__(self, path, reload=RELOAD_ON_CHANGE):
+        self.path = path
+        self.reload = reload
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._body = b""
+        self._variants = {}
+        self.etag = None
+        self.last_modified = None
+        self.loads = 0
+
+    def _load(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            with open(self.path, "rb") as f:
+                body = f.read()
+            self._variants = compress_variants(body)
+            self._body = body
+            self.etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            self.last_modified = formatdate(mtime / 1e9, usegmt=True)
+            self._mtime = mtime
+            self.loads += 1
+        logging.info(
+            f"[WEB_SERVER] Loaded {self.path} ({len(body)} bytes, "
+            f"variants: {sorted(self._variants) or 'none'})."
+        )
+
+    def response(self, request_headers):
+        """Returns the page (or a 304) for a request's headers."""
+        if self._mtime is None or self.reload:
+            self._load()
+        headers = {
+            "etag": self.etag,
+            "last-modified": self.last_modified,
+            "cache-control": REVALIDATE_CACHE_CONTROL,
+            "vary": "Accept-Encoding",
+        }
+        if _etag_matches(request_headers, self.etag):
+            return Response(status_code=304, headers=headers)
+        encoding = choose_encoding(
+            request_headers.get("accept-encoding", ""), self._variants
+        )
+        if encoding is None:
+            return Response(self._body, media_type="text/html", headers=headers)
+        headers["content-encoding"] = encoding
+        return Response(
+            self._variants[encoding], media_type="text/html", headers=headers
+        )
+
+
+class CompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves in-memory gzip/brotli variants of text-like files
+    and sets Cache-Control: immutable for fingerprinted names, revalidation
+    (ETag / Last-Modified) for the rest.
+    """
+
+    def __init__(self, *args, reload=RELOAD_ON_CHANGE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reload = reload
+        self._variants = {}  # full path -> ((mtime, size), {encoding: bytes})
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "compressions": 0, "bytes_saved": 0}
+
+    @staticmethod
+    def cache_control(path):
+        if FINGERPRINT_PATTERN.search(os.path.basename(path)):
+            return IMMUTABLE_CACHE_CONTROL
+        return REVALIDATE_CACHE_CONTROL
+
+    @staticmethod
+    def is_compressible(path, size):
+        media_type, _ = mimetypes.guess_type(path)
+        return size >= MIN_COMPRESS_BYTES and media_type in COMPRESSIBLE_TYPES
+
+    def variants_for(self, full_path, stat_result):
+        """Returns the compressed variants of a file, compressing it on first use."""
+        key = (stat_result.st_mtime_ns, stat_result.st_size)
+        cached = self._variants.get(full_path)
+        if cached and (cached[0] == key or not self.reload):
+            self.stats["hits"] += 1
+            return cached[1]
+        with self._lock:
+            cached = self._variants.get(full_path)
+            if cached and cached[0] == key:
+                return cached[1]
+            with open(full_path, "rb") as f:
+                variants = compress_variants(f.read())
+            self._variants[full_path] = (key, variants)
+            self.stats["compressions"] += 1
+        return variants
+
+    def precompress(self):
+        """Compresses every eligible file up front; returns how many were done."""
+        count = 0
+        for directory in self.all_directories:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    full_path = os.path.join(root, name)
+                    stat_result = os.stat(full_path)
+                    if self.is_compressible(full_path, stat_result.st_size):
+                        self.variants_for(full_path, stat_result)
+                        count += 1
+        logging.info(f"[WEB_SERVER] Precompressed {count} static files.")
+        return count
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        response = FileResponse(
+            full_path, status_code=status_code, stat_result=stat_result
+        )
+        response.headers["cache-control"] = self.cache_control(full_path)
+        if not self.is_compressible(full_path, stat_result.st_size):
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+
+        response.headers["vary"] = "Accept-Encoding"
+        variants = self.variants_for(full_path, stat_result)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), variants)
+        if encoding is None:
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+
+        # Each encoding is a different representation, so it gets its own ETag.
+        body = variants[encoding]
+        headers = {
+            "etag": response.headers["etag"][:-1] + f'-{encoding}"',
+            "last-modified": response.headers["last-modified"],
+            "cache-control": response.headers["cache-control"],
+            "vary": "Accept-Encoding",
+            "content-encoding": encoding,
+        }
+        if self.is_not_modified(Headers(headers), request_headers):
+            return NotModifiedResponse(Headers(headers))
+        self.stats["bytes_saved"] += stat_result.st_size - len(body)
+        return Response(
+            body,
+            status_code=status_code,
+            media_type=response.media_type,
+            headers=headers,
+        )
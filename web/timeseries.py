@@ -0,0 +1,177 @@
+"""
+Downsampled time series of the director's metrics for the admin dashboard.
+
+Each metrics snapshot the director pushes (see src/metrics.py) adds one
+point per series: the mean of a histogram's new observations since the
+previous snapshot, or a gauge's current value. Points are folded into
+fixed-size ring buffers at several resolutions, each slot holding the sum,
+count and max of one time bucket, so memory does not grow with uptime:
+
+    5 s x 720 (1 hour), 1 min x 1440 (1 day), 10 min x 1008 (1 week)
+
+A query picks the finest resolution that covers the requested window.
+"""
+
+import array
+import collections
+import time
+
+Resolution = collections.namedtuple("Resolution", "step size")
+RESOLUTIONS = (
+    Resolution(step=5, size=720),
+    Resolution(step=60, size=1440),
+    Resolution(step=600, size=1008),
+)
+
+# metric: name in the snapshot; kind: "histogram" (mean of new observations)
+# or "gauge" (current value); labels: samples to include (None for all).
+SeriesSource = collections.namedtuple("SeriesSource", "metric kind labels unit")
+SERIES = {
+    "turn_latency": SeriesSource("aum_turn_seconds", "histogram", None, "s"),
+    "storyteller_latency": SeriesSource(
+        "aum_storyteller_seconds", "histogram", None, "s"
+    ),
+    "serial_round_trip": SeriesSource(
+        "aum_serial_round_trip_seconds", "histogram", None, "s"
+    ),
+    "adb_latency": SeriesSource(
+        "aum_hardware_action_seconds", "histogram", {"action": "play_video"}, "s"
+    ),
+    "audio_queue_depth": SeriesSource("aum_audio_queue_depth", "gauge", None, "chunks"),
+    "event_loop_lag": SeriesSource(
+        "aum_event_loop_lag_seconds", "histogram", None, "s"
+    ),
+    "live_context_tokens": SeriesSource(
+        "aum_live_context_tokens", "gauge", None, "tokens"
+    ),
+}
+
+
+class RingSeries:
+    """One resolution of a series: `size` buckets of `step` seconds in flat arrays."""
+
+    def __init__(self, step, size):
+        self.step = step
+        self.size = size
+        self.buckets = array.array("q", [-1]) * size  # Bucket number, -1 if empty
+        self.sums = array.array("d", [0.0]) * size
+        self.counts = array.array("q", [0]) * size
+        self.maxes = array.array("d", [0.0]) * size
+
+    def add(self, timestamp, total, count, peak):
+        bucket = int(timestamp // self.step)
+        slot = bucket % self.size
+        if self.buckets[slot] != bucket:
+            # The slot still holds a bucket from one lap ago: overwrite it.
+            self.buckets[slot] = bucket
+            self.sums[slot] = 0.0
+            self.counts[slot] = 0
+            self.maxes[slot] = peak
+        self.sums[slot] += total
+        self.counts[slot] += count
+        self.maxes[slot] = max(self.maxes[slot], peak)
+
+    def points(self, since):
+        """Returns [bucket start, mean, max] for buckets starting at or after `since`."""
+        first = int(since // self.step)
+        points = [
+            (bucket, self.sums[slot] / self.counts[slot], self.maxes[slot])
+            for slot, bucket in enumerate(self.buckets)
+            if bucket >= first and self.counts[slot]
+        ]
+        points.sort()
+        return [[bucket * self.step, mean, peak] for bucket, mean, peak in points]
+
+    def nbytes(self):
+        return sum(
+            len(values) * values.itemsize
+            for values in (self.buckets, self.sums, self.counts, self.maxes)
+        )
+
+
+class TimeSeriesStore:
+    """Turns metrics snapshots into downsampled series and answers windowed queries."""
+
+    def __init__(self, sources=None, resolutions=RESOLUTIONS):
+        self.sources = SERIES if sources is None else sources
+        self.resolutions = tuple(resolutions)
+        self.series = {
+            name: [RingSeries(step, size) for step, size in self.resolutions]
+            for name in self.sources
+        }
+        self._totals = {}  # Histogram (sum, count) at the previous snapshot
+        self.snapshots = 0
+
+    def _samples(self, snapshot, source):
+        family = snapshot.get(source.metric)
+        if not family:
+            return []
+        return [
+            sample
+            for sample in family["samples"]
+            if not source.labels
+            or all(sample["labels"].get(k) == v for k, v in source.labels.items())
+        ]
+
+    def _point(self, name, source, samples):
+        """Returns (total, count, peak) for this snapshot, or None if nothing new."""
+        if source.kind == "gauge":
+            if not samples:
+                return None
+            value = sum(sample["value"] for sample in samples)
+            return value, 1, value
+        total = sum(sample["sum"] for sample in samples)
+        count = sum(sample["count"] for sample in samples)
+        last_total, last_count = self._totals.get(name, (0.0, 0))
+        self._totals[name] = (total, count)
+        if count < last_count:
+            # The director restarted and its counters began again from zero.
+            last_total, last_count = 0.0, 0
+        new = count - last_count
+        if new <= 0:
+            return None
+        mean = (total - last_total) / new
+        return mean * new, new, mean
+
+    def ingest(self, snapshot, timestamp=None):
+        """Adds one director metrics snapshot."""
+        timestamp = time.time() if timestamp is None else timestamp
+        self.snapshots += 1
+        for name, source in self.sources.items():
+            point = self._point(name, source, self._samples(snapshot, source))
+            if point is None:
+                continue
+            for ring in self.series[name]:
+                ring.add(timestamp, *point)
+
+    def query(self, window, names=None, now=None):
+        """
+        Returns points from the last `window` seconds at the finest resolution
+        that covers it. Each point is [bucket start, mean, max of the
+        per-snapshot values], so a max well above the mean marks a spike.
+        """
+        now = time.time() if now is None else now
+        level = next(
+            (
+                i
+                for i, (step, size) in enumerate(self.resolutions)
+                if step * size >= window
+            ),
+            len(self.resolutions) - 1,
+        )
+        names = [name for name in (names or self.sources) if name in self.sources]
+        return {
+            "window": window,
+            "step": self.resolutions[level].step,
+            "series": {
+                name: {
+                    "unit": self.sources[name].unit,
+                    "points": self.series[name][level].points(now - window),
+                }
+                for name in names
+            },
+        }
+
+    def nbytes(self):
+        """Bytes held by the ring buffers; fixed once the store is created."""
+        return sum(ring.nbytes() for rings in self.series.values() for ring in rings)